@@ -4,7 +4,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from sidebar import load_sidebar
-from data_loader import load_adiantamentos_data
+from adiantamentos_modelo import indexar_por_ug, carregar_cubo_adiantamentos
+from graficos import grafico_em_cache, versao_dataset, reduzir_categorias
+from calculos.adiantamentos import eficiencia_por, totais_comprovacao, fatiar_cubo
+from instrumentacao import medir, registrar_contexto
 
 # Ativar a configuração para evitar downcasting futuro no Pandas
 pd.set_option('future.no_silent_downcasting', True)
@@ -44,28 +47,31 @@ colunas_formatadas_adiantamentos = {
 }
 
 def run_dashboard():
-    # Carregar dados usando o módulo centralizado
-    df_adiantamentos = load_adiantamentos_data()
+    # Carregar dados (já tipados) ordenados por UG
+    with medir("carga dos dados"):
+        df_adiantamentos, _ = indexar_por_ug()
 
     if df_adiantamentos is None or df_adiantamentos.empty:
         st.error("Nenhum dado foi carregado. Por favor, verifique os arquivos de entrada.")
         return
 
     # Carregar o sidebar específico para adiantamentos
-    selected_ugs, selected_ug_sigla, selected_ano, selected_mes, selected_sigla = load_sidebar(df_adiantamentos, "Adiantamentos")
-
-    # Aplicar filtros ao dataframe de adiantamentos
-    if "TODAS" in selected_ug_sigla:
-        df_filtered = df_adiantamentos[
-            (df_adiantamentos["ANO"].between(selected_ano[0], selected_ano[1])) &
-            (df_adiantamentos["NUM_MES"].between(selected_mes[0], selected_mes[1]))
-        ].copy()
-    else:
-        df_filtered = df_adiantamentos[
-            (df_adiantamentos["ANO"].between(selected_ano[0], selected_ano[1])) &
-            (df_adiantamentos["NUM_MES"].between(selected_mes[0], selected_mes[1])) &
-            (df_adiantamentos["UG"].astype(str).isin(map(str, selected_ugs)))
-        ].copy()
+    with medir("sidebar"):
+        selected_ugs, selected_ug_sigla, selected_ano, selected_mes, selected_sigla = load_sidebar(df_adiantamentos, "Adiantamentos")
+
+    # Aplicar filtros ao cubo de adiantamentos (recortando apenas as linhas das UGs selecionadas)
+    # Todas as abas leem os totais já agregados por UG, ano e mês em vez de reagrupar a base completa
+    ugs_filtro = None if "TODAS" in selected_ug_sigla else selected_ugs
+    registrar_contexto(ugs=ugs_filtro, anos=selected_ano, meses=selected_mes)
+    with medir("filtro"):
+        cubo = carregar_cubo_adiantamentos()
+        df_filtered = fatiar_cubo(cubo, "base", ugs_filtro, selected_ano, selected_mes)
+        df_filtered_credores = fatiar_cubo(cubo, "credor", ugs_filtro, selected_ano, selected_mes)
+        df_filtered_produtos = fatiar_cubo(cubo, "produto", ugs_filtro, selected_ano, selected_mes)
+
+    # Chave do cache de gráficos: filtros aplicados ao cubo e versão do cubo carregado
+    filtros_graficos = (ugs_filtro, selected_ano, selected_mes)
+    versao_dados = versao_dataset(*(df for df, _ in cubo.values()))
 
     # Exibir o subtítulo com a sigla da UG selecionada ou "TODOS ÓRGÃOS"
     st.markdown(f'<h3 style="font-size:20px;"> {selected_sigla}</h3>', unsafe_allow_html=True)
@@ -75,49 +81,51 @@ def run_dashboard():
 
 
     # ========= TAB 1: VISÃO GERAL =========
-    with tab1:
+    with tab1, medir("aba Visão Geral"):
         st.subheader("Evolução dos Adiantamentos ao Longo dos Anos")
 
         if not df_filtered.empty:
-            # Convertendo valores para float
-            df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"] = df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"].astype(float)
-
-            # Agregar valores totais por ano
-            df_evolucao = df_filtered.groupby("ANO")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
-
-            # Aplicar formatação abreviada aos valores do eixo Y para exibição no gráfico
-            df_evolucao["VALOR_FORMATADO"] = df_evolucao["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(format_value_abbr)
-
-            # Criar coluna formatada para exibição no hover (tooltip)
-            df_evolucao["VALOR_HOVER"] = df_evolucao["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
-
-            # Criar gráfico de linha suavizado com cor amarela
-            fig1 = px.line(
-                df_evolucao, 
-                x="ANO", 
-                y="VALOR_ADIANTAMENTOS_COMPROVADOS",
-                markers=True, 
-                title="Total de Adiantamentos Comprovados por Ano",
-                line_shape='spline',
-                text="VALOR_FORMATADO",  # Exibir valores abreviados no gráfico
-                labels={"ANO": colunas_formatadas_adiantamentos["ANO"], "VALOR_ADIANTAMENTOS_COMPROVADOS": "Valor Total"},
-            )
+            def construir_evolucao():
+                # Agregar valores totais por ano
+                df_evolucao = df_filtered.groupby("ANO")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
+
+                # Aplicar formatação abreviada aos valores do eixo Y para exibição no gráfico
+                df_evolucao["VALOR_FORMATADO"] = df_evolucao["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(format_value_abbr)
+
+                # Criar coluna formatada para exibição no hover (tooltip)
+                df_evolucao["VALOR_HOVER"] = df_evolucao["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+
+                # Criar gráfico de linha suavizado com cor amarela
+                fig1 = px.line(
+                    df_evolucao, 
+                    x="ANO", 
+                    y="VALOR_ADIANTAMENTOS_COMPROVADOS",
+                    markers=True, 
+                    title="Total de Adiantamentos Comprovados por Ano",
+                    line_shape='spline',
+                    text="VALOR_FORMATADO",  # Exibir valores abreviados no gráfico
+                    labels={"ANO": colunas_formatadas_adiantamentos["ANO"], "VALOR_ADIANTAMENTOS_COMPROVADOS": "Valor Total"},
+                )
 
-            # Ajustar a suavização da linha e definir cor amarela
-            fig1.update_traces(
-                line=dict(smoothing=0.8, color="#FFD700"),  # Amarelo vibrante
-                marker=dict(color="#FFD700"),  # Cor dos pontos amarelos
-                textposition="top center",
-                hovertemplate="Ano: %{x}<br>Valor: %{customdata}"
-            )
+                # Ajustar a suavização da linha e definir cor amarela
+                fig1.update_traces(
+                    line=dict(smoothing=0.8, color="#FFD700"),  # Amarelo vibrante
+                    marker=dict(color="#FFD700"),  # Cor dos pontos amarelos
+                    textposition="top center",
+                    hovertemplate="Ano: %{x}<br>Valor: %{customdata}"
+                )
 
-            # Adicionar dados personalizados para hover (valores formatados em moeda)
-            fig1.update_traces(customdata=df_evolucao["VALOR_HOVER"])
+                # Adicionar dados personalizados para hover (valores formatados em moeda)
+                fig1.update_traces(customdata=df_evolucao["VALOR_HOVER"])
 
-            fig1.update_layout(
-                yaxis_title="Valor Total (abreviado)", 
-                xaxis_title="Ano"
-            )
+                fig1.update_layout(
+                    yaxis_title="Valor Total (abreviado)", 
+                    xaxis_title="Ano"
+                )
+
+                return fig1
+
+            fig1 = grafico_em_cache('adiantamentos', 'evolucao', filtros_graficos, versao_dados, construir_evolucao)
 
             # Exibir gráfico na primeira coluna
             col1, col2 = st.columns(2)  
@@ -125,38 +133,43 @@ def run_dashboard():
 
             # ========= GRÁFICO 2: Comparação Mensal dos Adiantamentos =========
 
-            # Agregar valores totais por mês (independente do ano)
-            df_mensal = df_filtered.groupby("NUM_MES")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
-
-            # Aplicar formatação abreviada para exibição no gráfico
-            df_mensal["VALOR_FORMATADO"] = df_mensal["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(format_value_abbr)
+            def construir_mensal():
+                # Agregar valores totais por mês (independente do ano)
+                df_mensal = df_filtered.groupby("NUM_MES")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
+
+                # Aplicar formatação abreviada para exibição no gráfico
+                df_mensal["VALOR_FORMATADO"] = df_mensal["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(format_value_abbr)
+
+                # Criar coluna formatada para exibição no hover (tooltip)
+                df_mensal["VALOR_HOVER"] = df_mensal["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+
+                # Criar gráfico de barras com cor laranja
+                fig2 = px.bar(
+                    df_mensal, 
+                    x="NUM_MES", 
+                    y="VALOR_ADIANTAMENTOS_COMPROVADOS",
+                    title="Total de Adiantamentos Comprovados por Mês",
+                    text="VALOR_FORMATADO",
+                    labels={"NUM_MES": colunas_formatadas_adiantamentos["NUM_MES"], "VALOR_ADIANTAMENTOS_COMPROVADOS": "Valor Total"},
+                    color_discrete_sequence=["#32CD32"]  # Laranja escuro
+                )
 
-            # Criar coluna formatada para exibição no hover (tooltip)
-            df_mensal["VALOR_HOVER"] = df_mensal["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+                # Atualizar tooltip (hover) para mostrar valores formatados como moeda
+                fig2.update_traces(
+                    hovertemplate="Mês: %{x}<br>Valor: %{customdata}",
+                    customdata=df_mensal["VALOR_HOVER"],
+                    textposition="outside"
+                )
 
-            # Criar gráfico de barras com cor laranja
-            fig2 = px.bar(
-                df_mensal, 
-                x="NUM_MES", 
-                y="VALOR_ADIANTAMENTOS_COMPROVADOS",
-                title="Total de Adiantamentos Comprovados por Mês",
-                text="VALOR_FORMATADO",
-                labels={"NUM_MES": colunas_formatadas_adiantamentos["NUM_MES"], "VALOR_ADIANTAMENTOS_COMPROVADOS": "Valor Total"},
-                color_discrete_sequence=["#32CD32"]  # Laranja escuro
-            )
+                fig2.update_layout(
+                    xaxis_title="Mês", 
+                    yaxis_title="Valor Total (abreviado)", 
+                    xaxis=dict(tickmode="linear")
+                )
 
-            # Atualizar tooltip (hover) para mostrar valores formatados como moeda
-            fig2.update_traces(
-                hovertemplate="Mês: %{x}<br>Valor: %{customdata}",
-                customdata=df_mensal["VALOR_HOVER"],
-                textposition="outside"
-            )
+                return fig2
 
-            fig2.update_layout(
-                xaxis_title="Mês", 
-                yaxis_title="Valor Total (abreviado)", 
-                xaxis=dict(tickmode="linear")
-            )
+            fig2 = grafico_em_cache('adiantamentos', 'mensal', filtros_graficos, versao_dados, construir_mensal)
 
             # Exibir gráfico na segunda coluna
             col2.plotly_chart(fig2, use_container_width=True)
@@ -212,24 +225,17 @@ def run_dashboard():
             st.warning("Selecione pelo menos um ano para visualizar a comparação.")
 
     # ========= TAB 2: EFICIÊNCIA =========
-    with tab2:
+    with tab2, medir("aba Eficiência"):
         st.subheader("Eficiência na Comprovação dos Adiantamentos")
 
         if not df_filtered.empty:
-            # Converter valores para float (caso ainda estejam como string)
-            df_filtered["VALOR_ADIANTAMENTOS_A_COMPROVAR"] = df_filtered["VALOR_ADIANTAMENTOS_A_COMPROVAR"].astype(float)
-            df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"] = df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"].astype(float)
-
             # Criar dataframe de comparação
             df_comprovacao = pd.DataFrame({
                 "Categoria": [
                     colunas_formatadas_adiantamentos["VALOR_ADIANTAMENTOS_A_COMPROVAR"],
                     colunas_formatadas_adiantamentos["VALOR_ADIANTAMENTOS_COMPROVADOS"]
                 ],
-                "Valor": [
-                    df_filtered["VALOR_ADIANTAMENTOS_A_COMPROVAR"].sum(),
-                    df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum()
-                ]
+                "Valor": list(totais_comprovacao(df_filtered))
             })
 
             # Criar colunas para exibir os gráficos lado a lado
@@ -269,14 +275,8 @@ def run_dashboard():
             # ========= GRÁFICO 2: Eficiência na Comprovação por Ano =========
             #st.subheader("Taxa de Eficiência na Comprovação por Ano")
 
-            # Agregar valores totais por ano
-            df_eficiencia = df_filtered.groupby("ANO")[["VALOR_ADIANTAMENTOS_COMPROVADOS", "VALOR_ADIANTAMENTOS_A_COMPROVAR"]].sum().reset_index()
-
-            # Calcular a taxa de eficiência (evita divisão por zero)
-            df_eficiencia["Taxa de Eficiência (%)"] = df_eficiencia.apply(
-                lambda row: (row["VALOR_ADIANTAMENTOS_COMPROVADOS"] / (row["VALOR_ADIANTAMENTOS_A_COMPROVAR"] + row["VALOR_ADIANTAMENTOS_COMPROVADOS"]) * 100)
-                if (row["VALOR_ADIANTAMENTOS_A_COMPROVAR"] + row["VALOR_ADIANTAMENTOS_COMPROVADOS"]) > 0 else 0, axis=1
-            )
+            # Agregar valores totais por ano e calcular a taxa de eficiência (evita divisão por zero)
+            df_eficiencia = eficiencia_por(df_filtered, "ANO", "Taxa de Eficiência (%)")
 
             # Formatar os valores para exibição no hover
             df_eficiencia["Taxa_Formatada"] = df_eficiencia["Taxa de Eficiência (%)"].apply(lambda x: f"{x:.1f}%")
@@ -313,14 +313,8 @@ def run_dashboard():
         # ========= GRÁFICO 3: Eficiência por Unidade Gestora =========
         #st.subheader("Eficiência na Comprovação por Unidade Gestora")
 
-        # Agregar valores por UG
-        df_eficiencia_ug = df_filtered.groupby(["UG", "DESCRICAO_UG"])[["VALOR_ADIANTAMENTOS_COMPROVADOS", "VALOR_ADIANTAMENTOS_A_COMPROVAR"]].sum().reset_index()
-
-        # Calcular a eficiência para cada UG (evita divisão por zero)
-        df_eficiencia_ug["Eficiência (%)"] = df_eficiencia_ug.apply(
-            lambda row: (row["VALOR_ADIANTAMENTOS_COMPROVADOS"] / (row["VALOR_ADIANTAMENTOS_A_COMPROVAR"] + row["VALOR_ADIANTAMENTOS_COMPROVADOS"]) * 100)
-            if (row["VALOR_ADIANTAMENTOS_A_COMPROVAR"] + row["VALOR_ADIANTAMENTOS_COMPROVADOS"]) > 0 else 0, axis=1
-        )
+        # Agregar valores por UG e calcular a eficiência de cada uma (evita divisão por zero)
+        df_eficiencia_ug = eficiencia_por(df_filtered, ["UG", "DESCRICAO_UG"])
 
         # Ordenar por eficiência em ordem decrescente
         df_eficiencia_ug = df_eficiencia_ug.sort_values(by="Eficiência (%)", ascending=False)
@@ -360,82 +354,89 @@ def run_dashboard():
         st.plotly_chart(fig_eficiencia_ug, use_container_width=True)
 
        
-    with tab3:
+    with tab3, medir("aba Órgãos & Credores"):
 
         if not df_filtered.empty:
-            # Converter colunas para float, se necessário
-            df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"] = df_filtered["VALOR_ADIANTAMENTOS_COMPROVADOS"].astype(float)
-
             # ==================== GRÁFICO 1: TOP 10 CREDORES ====================
             #st.subheader("Top 10 Credores que Mais Receberam Adiantamentos")
 
-            # Agregar valores por credor
-            df_credores = df_filtered.groupby("NOM_CREDOR")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
-
-            # Selecionar os 10 credores com maiores valores
-            df_top_credores = df_credores.nlargest(10, "VALOR_ADIANTAMENTOS_COMPROVADOS")
+            def construir_top_credores():
+                # Agregar valores por credor
+                df_credores = df_filtered_credores.groupby("NOM_CREDOR")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
+
+                # Selecionar os 10 credores com maiores valores
+                df_top_credores = df_credores.nlargest(10, "VALOR_ADIANTAMENTOS_COMPROVADOS")
+
+                # Formatar valores para exibição
+                df_top_credores["valor_formatado"] = df_top_credores["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+
+                # Definir altura dinâmica do gráfico
+                altura_grafico = max(400, min(1000, len(df_top_credores) * 40))
+
+                # Criar gráfico de barras horizontais
+                fig_credores = go.Figure(go.Bar(
+                    y=df_top_credores["NOM_CREDOR"],
+                    x=df_top_credores["VALOR_ADIANTAMENTOS_COMPROVADOS"],
+                    orientation="h",
+                    marker=dict(color="#042b4d"),
+                    text=df_top_credores["valor_formatado"],
+                    textposition="auto",  # Fica dentro da barra, mas sai se necessário
+                    insidetextfont=dict(size=12),
+                    outsidetextfont=dict(size=12)
+                ))
+
+                fig_credores.update_layout(
+                    title="Top 10 Credores com Maior Uso de Adiantamentos",
+                    xaxis_title="Valor Total (R$)",
+                    yaxis_title="Nome do Credor",
+                    height=altura_grafico,
+                    showlegend=False
+                )
 
-            # Formatar valores para exibição
-            df_top_credores["valor_formatado"] = df_top_credores["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+                return fig_credores
 
-            # Definir altura dinâmica do gráfico
-            altura_grafico = max(400, min(1000, len(df_top_credores) * 40))
-
-            # Criar gráfico de barras horizontais
-            fig_credores = go.Figure(go.Bar(
-                y=df_top_credores["NOM_CREDOR"],
-                x=df_top_credores["VALOR_ADIANTAMENTOS_COMPROVADOS"],
-                orientation="h",
-                marker=dict(color="#042b4d"),
-                text=df_top_credores["valor_formatado"],
-                textposition="auto",  # Fica dentro da barra, mas sai se necessário
-                insidetextfont=dict(size=12),
-                outsidetextfont=dict(size=12)
-            ))
-
-            fig_credores.update_layout(
-                title="Top 10 Credores com Maior Uso de Adiantamentos",
-                xaxis_title="Valor Total (R$)",
-                yaxis_title="Nome do Credor",
-                height=altura_grafico,
-                showlegend=False
-            )
+            fig_credores = grafico_em_cache('adiantamentos', 'top_credores', filtros_graficos, versao_dados, construir_top_credores)
 
             st.plotly_chart(fig_credores, use_container_width=True)
 
             # ==================== GRÁFICO 2: TOP 10 UNIDADES GESTORAS ====================
 
-            # Agregar valores por Unidade Gestora (UG)
-            df_ug = df_filtered.groupby("DESCRICAO_UG")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
+            def construir_top_ugs():
+                # Agregar valores por Unidade Gestora (UG)
+                df_ug = df_filtered.groupby("DESCRICAO_UG")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
+
+                # Selecionar as 10 UGs com maiores valores
+                df_top_ug = df_ug.nlargest(10, "VALOR_ADIANTAMENTOS_COMPROVADOS")
+
+                # Formatar valores para exibição
+                df_top_ug["valor_formatado"] = df_top_ug["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+
+                # Definir altura dinâmica do gráfico
+                altura_grafico_ug = max(400, min(1000, len(df_top_ug) * 40))
+
+                # Criar gráfico de barras horizontais
+                fig_ug = go.Figure(go.Bar(
+                    y=df_top_ug["DESCRICAO_UG"],
+                    x=df_top_ug["VALOR_ADIANTAMENTOS_COMPROVADOS"],
+                    orientation="h",
+                    marker=dict(color="#1f77b4"),
+                    text=df_top_ug["valor_formatado"],
+                    textposition="auto",
+                    insidetextfont=dict(size=12),
+                    outsidetextfont=dict(size=12)
+                ))
+
+                fig_ug.update_layout(
+                    title="Top 10 UGs com Maior Uso de Adiantamentos",
+                    xaxis_title="Valor Total (R$)",
+                    yaxis_title="Unidade Gestora",
+                    height=altura_grafico_ug,
+                    showlegend=False
+                )
 
-            # Selecionar as 10 UGs com maiores valores
-            df_top_ug = df_ug.nlargest(10, "VALOR_ADIANTAMENTOS_COMPROVADOS")
+                return fig_ug
 
-            # Formatar valores para exibição
-            df_top_ug["valor_formatado"] = df_top_ug["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
-
-            # Definir altura dinâmica do gráfico
-            altura_grafico_ug = max(400, min(1000, len(df_top_ug) * 40))
-
-            # Criar gráfico de barras horizontais
-            fig_ug = go.Figure(go.Bar(
-                y=df_top_ug["DESCRICAO_UG"],
-                x=df_top_ug["VALOR_ADIANTAMENTOS_COMPROVADOS"],
-                orientation="h",
-                marker=dict(color="#1f77b4"),
-                text=df_top_ug["valor_formatado"],
-                textposition="auto",
-                insidetextfont=dict(size=12),
-                outsidetextfont=dict(size=12)
-            ))
-
-            fig_ug.update_layout(
-                title="Top 10 UGs com Maior Uso de Adiantamentos",
-                xaxis_title="Valor Total (R$)",
-                yaxis_title="Unidade Gestora",
-                height=altura_grafico_ug,
-                showlegend=False
-            )
+            fig_ug = grafico_em_cache('adiantamentos', 'top_ugs', filtros_graficos, versao_dados, construir_top_ugs)
 
             st.plotly_chart(fig_ug, use_container_width=True)
 
@@ -443,45 +444,53 @@ def run_dashboard():
 
         # ==================== GRÁFICO 3: DISTRIBUIÇÃO PERCENTUAL POR ÓRGÃO ====================
 
-        # Agregar valores por UG para distribuição percentual
-        df_ug_percentual = df_filtered.groupby("DESCRICAO_UG")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
-
-        # Formatar os valores para exibição no hover
-        df_ug_percentual["VALOR_FORMATADO"] = df_ug_percentual["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
-
-        # Definir altura dinâmica do gráfico
-        num_ugs = len(df_ug_percentual)  # Quantidade de UGs
-        altura_minima = 400  # Altura mínima do gráfico
-        altura_maxima = 1600  # Altura máxima do gráfico
-        altura_por_ug = 30  # Espaço extra por UG
-
-        altura_grafico = min(altura_maxima, max(altura_minima, num_ugs * altura_por_ug))
-
-        # Criar gráfico de pizza com hover formatado
-        fig_pizza = px.pie(
-            df_ug_percentual, 
-            values="VALOR_ADIANTAMENTOS_COMPROVADOS", 
-            names="DESCRICAO_UG",
-            title="Distribuição Percentual de Adiantamentos por Órgão",
-            labels={"DESCRICAO_UG": colunas_formatadas_adiantamentos["DESCRICAO_UG"]},
-            hole=0.4,  # Formato de rosca
-            color_discrete_sequence=px.colors.sequential.Turbo
-        )
+        def construir_distribuicao_orgaos():
+            # Agregar valores por UG para distribuição percentual
+            df_ug_percentual = df_filtered.groupby("DESCRICAO_UG")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
 
-        # Ajustar tooltip para exibir valor formatado em moeda
-        fig_pizza.update_traces(
-            hovertemplate="<b>%{label}</b><br>Valor: %{customdata}",
-            customdata=df_ug_percentual["VALOR_FORMATADO"]
-        )
+            # Manter os órgãos com maiores valores e somar os demais em "Outros"
+            df_ug_percentual = reduzir_categorias(df_ug_percentual, "DESCRICAO_UG", "VALOR_ADIANTAMENTOS_COMPROVADOS")
+
+            # Formatar os valores para exibição no hover
+            df_ug_percentual["VALOR_FORMATADO"] = df_ug_percentual["VALOR_ADIANTAMENTOS_COMPROVADOS"].apply(formatar_moeda)
+
+            # Definir altura dinâmica do gráfico
+            num_ugs = len(df_ug_percentual)  # Quantidade de UGs
+            altura_minima = 400  # Altura mínima do gráfico
+            altura_maxima = 1600  # Altura máxima do gráfico
+            altura_por_ug = 30  # Espaço extra por UG
+
+            altura_grafico = min(altura_maxima, max(altura_minima, num_ugs * altura_por_ug))
+
+            # Criar gráfico de pizza com hover formatado
+            fig_pizza = px.pie(
+                df_ug_percentual, 
+                values="VALOR_ADIANTAMENTOS_COMPROVADOS", 
+                names="DESCRICAO_UG",
+                title="Distribuição Percentual de Adiantamentos por Órgão",
+                labels={"DESCRICAO_UG": colunas_formatadas_adiantamentos["DESCRICAO_UG"]},
+                hole=0.4,  # Formato de rosca
+                color_discrete_sequence=px.colors.sequential.Turbo
+            )
+
+            # Ajustar tooltip para exibir valor formatado em moeda
+            fig_pizza.update_traces(
+                hovertemplate="<b>%{label}</b><br>Valor: %{customdata}",
+                customdata=df_ug_percentual["VALOR_FORMATADO"]
+            )
+
+            # Ajustar altura do gráfico
+            fig_pizza.update_layout(height=altura_grafico)
+
+            return fig_pizza
 
-        # Ajustar altura do gráfico
-        fig_pizza.update_layout(height=altura_grafico)
+        fig_pizza = grafico_em_cache('adiantamentos', 'distribuicao_orgaos', filtros_graficos, versao_dados, construir_distribuicao_orgaos)
 
         st.plotly_chart(fig_pizza, use_container_width=True)
 
 
     # ========= TAB 4: COMPARATIVOS =========
-    with tab4:
+    with tab4, medir("aba Comparativos"):
         #st.subheader("Comparação de Adiantamentos com Outras Despesas")
 
         if not df_filtered.empty:
@@ -539,7 +548,7 @@ def run_dashboard():
             st.subheader("Participação Percentual das Categorias de Despesas nos Adiantamentos")
 
             # Agregar valores por categoria de despesa
-            df_categorias = df_filtered.groupby("EMPENHO_PRODUTO")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
+            df_categorias = df_filtered_produtos.groupby("EMPENHO_PRODUTO")["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum().reset_index()
 
             # Calcular participação percentual de cada categoria
             total_geral = df_categorias["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum()
@@ -0,0 +1,31 @@
+import pandas as pd
+import streamlit as st
+from data_loader import load_adiantamentos_data
+from cache_datasets import registrar_dependente, contabilizar_derivado
+from calculos.adiantamentos import ordenar_por_ug, montar_cubo
+
+# Função para obter os adiantamentos ordenados por UG com o índice de linhas de cada UG
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('adiantamentos')
+def indexar_por_ug():
+    """
+    Retorna (df, indice), onde df está ordenado por UG e indice mapeia cada UG
+    para o intervalo (inicio, fim) de suas linhas em df.
+    """
+    df = load_adiantamentos_data()
+    if df is None or df.empty:
+        return pd.DataFrame(), {}
+
+    return ordenar_por_ug(df)
+
+# Função para obter o cubo de adiantamentos, calculado uma única vez por carga
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('adiantamentos')
+def carregar_cubo_adiantamentos():
+    """Retorna {agrupamento: (df, indice)}, como em calculos.adiantamentos.montar_cubo."""
+    df, _ = indexar_por_ug()
+    return montar_cubo(df)
+
+# Cópia ordenada e cubo calculados sobre o dataset: liberados quando o dataset for descartado da memória
+registrar_dependente('adiantamentos', indexar_por_ug.clear)
+registrar_dependente('adiantamentos', carregar_cubo_adiantamentos.clear)
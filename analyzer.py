@@ -1,15 +1,12 @@
-import os
 import streamlit as st
-from langchain_groq import ChatGroq
-from dotenv import load_dotenv
+from llm_gateway import configurar_chave_api, obter_chat
 
-# Carregar a chave da API do arquivo .env
-def carregar_chave_api():
-    load_dotenv()
-    API_KEY = os.getenv("API_KEY")
+# Modelo usado nas análises de tabelas
+MODELO_ANALISE = 'llama3-8b-8192'
 
-    if API_KEY:
-        os.environ['GROQ_API_KEY'] = API_KEY  # Configura a chave globalmente
+# Verificar a chave da API (o .env é carregado apenas uma vez por processo pelo gateway)
+def carregar_chave_api():
+    if configurar_chave_api():
         return True
     else:
         st.error("API Key não encontrada. Verifique seu arquivo .env.")
@@ -32,8 +29,8 @@ def analisar_tabelas(titulo, tabelas, contexto_filtros=""):
         if not carregar_chave_api():
             return "Erro: Não foi possível carregar a chave da API."
 
-        # Criar o modelo LLM
-        chat = ChatGroq(model='llama3-8b-8192')
+        # Obter o modelo LLM reutilizável
+        chat = obter_chat(MODELO_ANALISE)
 
         # Preparar o prompt
         prompt = f"Contexto: {titulo}\n\n"
@@ -1,16 +1,12 @@
 import streamlit as st
 import time
-import base64
-import despesas_ug
-import diarias
-import contratos
-import servidores  # Novo dashboard de Servidores
-import adiantamentos  # Novo dashboard de Servidores
-import combustivel  # Novo dashboard de Servidores
-import orcamento  # Novo dashboard de Servidores
-import home  # Novo dashboard de Servidores
-from sidebar import load_sidebar, navigate_pages
+from sidebar import navigate_pages
+import paginas  # Registro das páginas, importadas apenas na primeira visita
 import auth_utils  # Importar o módulo de autenticação
+import assets  # Imagens estáticas codificadas uma única vez por processo
+import aquecimento  # Carregamento dos datasets em segundo plano
+import instrumentacao  # Tempo e memória de cada etapa da execução (ligado por INSTRUMENTACAO_ATIVA)
+import metricas  # Métricas do processo no formato do Prometheus
 
 # Configuração da página
 st.set_page_config(layout="wide",
@@ -18,15 +14,18 @@ st.set_page_config(layout="wide",
                     page_icon="./src/assets/logo-ogp-favicon.png"  
 )
 
+# Iniciar o carregamento dos datasets em segundo plano (apenas uma vez por processo, antes do login)
+if st.secrets.get("AQUECIMENTO_ATIVO", True):
+    aquecimento.iniciar_aquecimento()
+
+# Gravar as métricas periodicamente no arquivo lido pelo coletor do Prometheus (apenas uma vez por processo)
+if st.secrets.get("METRICAS_ATIVA", False):
+    metricas.iniciar_exportacao()
+
 # Criar um contêiner fixo no topo da página
 header = st.container()
 
-def get_image_as_base64(file_path):
-    with open(file_path, "rb") as file:
-        return base64.b64encode(file.read()).decode("utf-8")
-
-logo_path = "./src/assets/logo2.png"
-logo_base64 = get_image_as_base64(logo_path)
+logo_base64 = assets.imagem_base64(assets.LOGO_PATH)
 
 with st.container():
     col1, col2 = st.columns([1, 1])
@@ -52,20 +51,13 @@ if 'authenticated' not in st.session_state:
 if not st.session_state['authenticated']:
     auth_utils.login()
 else:
-    selected_page = navigate_pages()
-    if selected_page == 'Início':
-        home.run_dashboard()
-    elif selected_page == 'Despesas Detalhado':
-        despesas_ug.run_dashboard()
-    elif selected_page == 'Diárias':
-        diarias.run_dashboard()
-    elif selected_page == 'Contratos':
-        contratos.run_dashboard()
-    elif selected_page == 'Servidores': 
-        servidores.run_dashboard()
-    elif selected_page == 'Adiantamentos': 
-        adiantamentos.run_dashboard()
-    elif selected_page == 'Combustível': 
-        combustivel.run_dashboard()
-    elif selected_page == 'Orçamento': 
-        orcamento.run_dashboard()
+    instrumentacao.iniciar_execucao()
+
+    with instrumentacao.medir("navegação"):
+        selected_page = navigate_pages()
+    instrumentacao.registrar_contexto(pagina=selected_page)
+
+    with instrumentacao.medir(f"página {selected_page}"):
+        paginas.executar_pagina(selected_page)
+
+    instrumentacao.finalizar_execucao()
@@ -0,0 +1,98 @@
+import threading
+import time
+import streamlit as st
+from data_loader import (
+    load_parquet_data_from_drive, load_contracts_data, load_servidores_data,
+    load_dotacao_data, load_adiantamentos_data,
+    load_data, load_data_parcial
+)
+from orcamento_modelo import carregar_restos_anual
+
+# Datasets aquecidos na inicialização do processo, na ordem de prioridade
+DATASETS = {
+    'despesas': load_parquet_data_from_drive,
+    'contratos': load_contracts_data,
+    'servidores': load_servidores_data,
+    'dotacao': load_dotacao_data,
+    'restos': carregar_restos_anual,  # Carrega os restos a pagar e já prepara os totais anuais
+    'adiantamentos': load_adiantamentos_data,
+}
+
+# Estados possíveis do aquecimento de cada dataset (PRONTO indica que o aquecimento terminou, não que o dataset
+# continua em memória: o cache de datasets pode descartá-lo depois para respeitar o limite de memória)
+PENDENTE = 'pendente'
+CARREGANDO = 'carregando'
+PRONTO = 'pronto'
+ERRO = 'erro'
+
+_lock = threading.Lock()
+_status = {nome: {'estado': PENDENTE, 'inicio': None, 'fim': None, 'erro': None} for nome in DATASETS}
+
+# Função para atualizar o status de um dataset de forma segura entre threads
+def _atualizar_status(nome, **valores):
+    with _lock:
+        _status[nome].update(valores)
+
+# Função executada em cada thread: chama o loader com cache, deixando o dado pronto em memória
+def _aquecer_dataset(nome, carregar):
+    _atualizar_status(nome, estado=CARREGANDO, inicio=time.time())
+    try:
+        carregar()
+        _atualizar_status(nome, estado=PRONTO, fim=time.time())
+    except Exception as e:
+        _atualizar_status(nome, estado=ERRO, fim=time.time(), erro=str(e))
+
+# Função para iniciar o aquecimento dos datasets em segundo plano (executada uma única vez por processo)
+@st.cache_resource
+def iniciar_aquecimento():
+    threads = []
+    for nome, carregar in DATASETS.items():
+        thread = threading.Thread(target=_aquecer_dataset, args=(nome, carregar), name=f"aquecimento-{nome}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+# Função para consultar o estado de um dataset ('pendente', 'carregando', 'pronto' ou 'erro')
+def estado_dataset(nome):
+    with _lock:
+        return _status[nome]['estado']
+
+# Função para saber se um dataset está sendo carregado em segundo plano neste momento
+def em_carregamento(nome):
+    return estado_dataset(nome) == CARREGANDO
+
+# Função para obter os dados de despesas de forma progressiva
+def carregar_despesas_progressivo():
+    """
+    Retorna (df, completo). Enquanto o aquecimento ainda baixa os arquivos de despesas,
+    retorna apenas os anos já carregados (começando pelo mais recente) e completo=False.
+    Sem aquecimento em andamento, carrega o dataset completo normalmente.
+    """
+    if not em_carregamento('despesas'):
+        return load_data(), True
+
+    # Aguardar apenas a primeira partição (o ano mais recente)
+    with st.spinner("Carregando os dados do ano mais recente..."):
+        df_parcial, _, _ = load_data_parcial()
+        while df_parcial is None and em_carregamento('despesas'):
+            time.sleep(0.5)
+            df_parcial, _, _ = load_data_parcial()
+
+    # O carregamento terminou durante a espera: usar o dataset completo
+    if df_parcial is None:
+        return load_data(), True
+
+    return df_parcial, False
+
+# Fragmento que verifica periodicamente os datasets em carregamento e atualiza a página quando terminarem
+@st.fragment(run_every=3)
+def aguardar_datasets(nomes):
+    pendentes = [nome for nome in nomes if em_carregamento(nome)]
+    if not pendentes:
+        st.rerun()
+
+    _, carregadas, total = load_data_parcial()
+    if 'despesas' in pendentes and total:
+        st.caption(f"Carregando em segundo plano: {', '.join(pendentes)} ({carregadas} de {total} arquivos de despesas)...")
+    else:
+        st.caption(f"Carregando em segundo plano: {', '.join(pendentes)}...")
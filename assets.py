@@ -0,0 +1,23 @@
+import base64
+import streamlit as st
+
+# Caminhos das imagens estáticas usadas no painel
+LOGO_PATH = "./src/assets/logo2.png"
+
+MINIATURAS_PATHS = {
+    "Despesas Detalhado": "src/assets/despesas_capab.png",
+    "Diárias": "src/assets/diarias_capab.png",
+    "Contratos": "src/assets/contratos_capab.png",
+    "Servidores": "src/assets/servidores_capab.png"
+}
+
+# Função para ler e converter uma imagem para Base64, executada uma única vez por processo
+@st.cache_resource
+def imagem_base64(caminho):
+    with open(caminho, "rb") as file:
+        return base64.b64encode(file.read()).decode("utf-8")
+
+# Função para montar a tag <img> de uma imagem embutida em Base64, também uma única vez por processo
+@st.cache_resource
+def imagem_html(caminho, estilo="", alt=""):
+    return f'<img src="data:image/png;base64,{imagem_base64(caminho)}" style="{estilo}" alt="{alt}">'
@@ -0,0 +1,2 @@
+# Benchmarks do painel com dados sintéticos.
+# Executar a partir da raiz do projeto: python -m benchmarks --escalas 1 10 --saida resultados.json
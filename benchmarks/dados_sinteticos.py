@@ -0,0 +1,240 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Lista de UGs usada pelo painel (os dados sintéticos usam os mesmos códigos, descrições e siglas)
+ARQUIVO_UGS = os.path.join(os.path.dirname(__file__), "..", "database", "UGS-COD-NOME-SIGLA.csv")
+
+# Quantidade de linhas de cada dataset na escala 1x (ordem de grandeza dos dados atuais)
+VOLUMES_BASE = {
+    "despesas": 400_000,
+    "contratos": 15_000,
+    "aditivos": 30_000,
+    "folha": 120_000,
+    "dotacao": 60_000,
+    "restos": 80_000,
+    "adiantamentos": 50_000,
+}
+
+# Anos cobertos pelos datasets sintéticos
+ANOS = list(range(2018, 2025))
+
+NATUREZAS6 = ["DIARIAS - CIVIL", "DIARIAS - MILITAR", "MATERIAL DE CONSUMO", "SERVICOS DE TERCEIROS - PJ",
+              "VENCIMENTOS E VANTAGENS FIXAS", "OBRAS E INSTALACOES", "EQUIPAMENTOS E MATERIAL PERMANENTE"]
+FUNCOES = ["SAUDE", "EDUCACAO", "SEGURANCA PUBLICA", "ADMINISTRACAO", "ASSISTENCIA SOCIAL", "TRANSPORTE", "CULTURA"]
+SITUACOES = ["VIGENTE", "ENCERRADO", "RESCINDIDO", "SUSPENSO"]
+TIPOS_LICITACAO = ["PREGAO ELETRONICO", "DISPENSA", "INEXIGIBILIDADE", "CONCORRENCIA", "TOMADA DE PRECOS"]
+VINCULOS = ["EFETIVO", "COMISSIONADO", "CONTRATADO", "CEDIDO"]
+GRAUS_INSTRUCAO = ["FUNDAMENTAL", "MEDIO", "SUPERIOR", "ESPECIALIZACAO", "MESTRADO", "DOUTORADO"]
+PRODUTOS = ["COMBUSTIVEL", "MATERIAL DE EXPEDIENTE", "PASSAGENS", "MANUTENCAO", "ALIMENTACAO"]
+
+# Função para carregar as UGs de referência
+def carregar_ugs():
+    return pd.read_csv(ARQUIVO_UGS)[["UG", "DESCRICAO_UG", "SIGLA_UG"]].astype({"UG": "int64"})
+
+# Função para calcular a quantidade de linhas e de pessoas (favorecidos, credores, servidores) de uma escala
+def _tamanhos(dataset, escala, pessoas_base):
+    """
+    As linhas crescem linearmente com a escala; a quantidade de pessoas cresce com a raiz
+    da escala, pois volumes maiores trazem mais lançamentos por pessoa.
+    """
+    return int(VOLUMES_BASE[dataset] * escala), max(1, int(pessoas_base * np.sqrt(escala)))
+
+# Função para gerar nomes e documentos (CPF com 11 dígitos) de um conjunto de pessoas
+def _pessoas(rng, quantidade, prefixo):
+    nomes = np.char.add(f"{prefixo} ", np.arange(quantidade).astype(str))
+    documentos = np.char.zfill(rng.integers(0, 10**11, quantidade).astype(str), 11)
+    return nomes, documentos
+
+# Função para gerar valores monetários com cauda longa (poucos valores altos, muitos baixos)
+def _valores(rng, quantidade, escala_valor=5_000):
+    return np.round(rng.lognormal(np.log(escala_valor), 1.2, quantidade), 2)
+
+# Função para gerar a base de despesas detalhadas (load_parquet_data_from_drive), que inclui as diárias
+def gerar_despesas(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, pessoas = _tamanhos("despesas", escala, 20_000)
+    ugs = carregar_ugs()
+    nomes, documentos = _pessoas(rng, pessoas, "FAVORECIDO")
+
+    pos_ug = rng.integers(0, len(ugs), linhas)
+    pos_pessoa = rng.integers(0, pessoas, linhas)
+    natureza6 = rng.choice(NATUREZAS6, linhas, p=[0.15, 0.05, 0.2, 0.2, 0.2, 0.1, 0.1])
+    empenhado = _valores(rng, linhas)
+    liquidado = np.round(empenhado * rng.uniform(0.5, 1, linhas), 2)
+
+    return pd.DataFrame({
+        "ANO": rng.choice(ANOS, linhas),
+        "MES": rng.integers(1, 13, linhas),
+        "UG": ugs["UG"].to_numpy()[pos_ug],
+        "DESCRICAO_UG": ugs["DESCRICAO_UG"].to_numpy()[pos_ug],
+        "UG_EMITENTE": ugs["UG"].to_numpy()[pos_ug],
+        "PODER": rng.choice(["EXE", "LEG", "JUD"], linhas, p=[0.9, 0.05, 0.05]),
+        "DESCRICAO_FUNCAO": rng.choice(FUNCOES, linhas),
+        "DESCRICAO_SUB_FUNCAO": np.char.add("SUBFUNCAO ", rng.integers(0, 60, linhas).astype(str)),
+        "DESCRICAO_FONTE": np.char.add("FONTE ", rng.integers(0, 40, linhas).astype(str)),
+        "DESCRICAO_NATUREZA": natureza6,
+        **{f"DESCRICAO_NATUREZA{nivel}": np.char.add(f"NATUREZA{nivel} ", rng.integers(0, 5 * nivel, linhas).astype(str)) for nivel in range(1, 6)},
+        "DESCRICAO_NATUREZA6": natureza6,
+        "CODIGO_FAVORECIDO": documentos[pos_pessoa],
+        "NOME_FAVORECIDO": nomes[pos_pessoa],
+        "TIPO_LICITACAO": rng.choice(TIPOS_LICITACAO, linhas),
+        "NOTA_EMPENHO": np.char.add("2024NE", rng.integers(0, 10**6, linhas).astype(str)),
+        "COD_PROCESSO": np.char.add("E:", rng.integers(0, 10**8, linhas).astype(str)),
+        "NOME_CONTRATO": np.char.add("CONTRATO ", rng.integers(0, 5_000, linhas).astype(str)),
+        "OBSERVACAO_NE": np.char.add("PAGAMENTO REFERENTE AO PROCESSO ", rng.integers(0, 10**5, linhas).astype(str)),
+        "VALOR_EMPENHADO": empenhado,
+        "VALOR_LIQUIDADO": liquidado,
+        "VALOR_PAGO": np.round(liquidado * rng.uniform(0.8, 1, linhas), 2),
+    })
+
+# Função para gerar a lista de contratos já tipada (como devolvida por load_contracts_data)
+def gerar_contratos(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, pessoas = _tamanhos("contratos", escala, 3_000)
+    ugs = carregar_ugs()
+    nomes, documentos = _pessoas(rng, pessoas, "CONTRATADA")
+
+    pos_ug = rng.integers(0, len(ugs), linhas)
+    pos_pessoa = rng.integers(0, pessoas, linhas)
+    inicio = pd.to_datetime("2018-01-01") + pd.to_timedelta(rng.integers(0, 7 * 365, linhas), unit="D")
+
+    return pd.DataFrame({
+        "CODIGO_CONTRATO": np.arange(1, linhas + 1, dtype="int64"),
+        "UG": ugs["UG"].to_numpy()[pos_ug],
+        "NOME_CONTRATANTE": ugs["DESCRICAO_UG"].to_numpy()[pos_ug],
+        "CODIGO_CONTRATADA": documentos[pos_pessoa],
+        "NOME_CONTRATADA": nomes[pos_pessoa],
+        "NOME_CONTRATO": np.char.add("CONTRATO DE PRESTACAO DE SERVICOS ", np.arange(linhas).astype(str)),
+        "NATUREZA_CONTRATO": rng.choice(["SERVICO", "COMPRA", "OBRA", "LOCACAO"], linhas),
+        "NOM_TIPO_LICITACAO": rng.choice(TIPOS_LICITACAO, linhas),
+        "DSC_SITUACAO": rng.choice(SITUACOES, linhas, p=[0.5, 0.35, 0.1, 0.05]),
+        "DATA_INICIO_VIGENCIA": inicio,
+        "DATA_FIM_VIGENCIA": inicio + pd.to_timedelta(rng.integers(90, 5 * 365, linhas), unit="D"),
+        "DATA_PUBLICACAO": inicio - pd.to_timedelta(rng.integers(1, 30, linhas), unit="D"),
+        "VALOR_TOTAL": _valores(rng, linhas, 200_000),
+    })
+
+# Função para gerar os aditivos e reajustes dos contratos sintéticos
+def gerar_aditivos(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, _ = _tamanhos("aditivos", escala, 1)
+    contratos = _tamanhos("contratos", escala, 1)[0]
+    inicio = pd.to_datetime("2018-01-01") + pd.to_timedelta(rng.integers(0, 7 * 365, linhas), unit="D")
+
+    return pd.DataFrame({
+        "COD_CONTRATO": rng.integers(1, contratos + 1, linhas),
+        "TIPO": rng.choice(["ADITIVO", "REAJUSTE", "APOSTILAMENTO"], linhas),
+        "NUM_ORIGINAL": rng.integers(1, 10, linhas).astype(str),
+        "NUM_PROCESSO": np.char.add("E:", rng.integers(0, 10**8, linhas).astype(str)),
+        "DATA_VIGENCIA_INICIAL": inicio,
+        "DATA_VIGENCIA_FINAL": inicio + pd.to_timedelta(rng.integers(90, 730, linhas), unit="D"),
+        "DATA_PUBLICACAO": inicio,
+        "VALOR": _valores(rng, linhas, 30_000),
+        "DSC_OBJETO": np.char.add("ACRESCIMO DE QUANTITATIVO ", rng.integers(0, 100, linhas).astype(str)),
+    })
+
+# Função para gerar a folha de pagamento (load_servidores_data): várias verbas por servidor
+def gerar_folha(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, servidores = _tamanhos("folha", escala, 15_000)
+    ugs = pd.read_csv(ARQUIVO_UGS)
+    nomes, documentos = _pessoas(rng, servidores, "SERVIDOR")
+
+    pos_servidor = rng.integers(0, servidores, linhas)
+    unidade_servidor = rng.choice(ugs["Unidade"].to_numpy(), servidores)
+    # Data de nascimento no formato AAAAMMDD, como no arquivo da folha
+    nascimento = (pd.to_datetime("1960-01-01") + pd.to_timedelta(rng.integers(0, 40 * 365, servidores), unit="D")).strftime("%Y%m%d")
+
+    return pd.DataFrame({
+        "Unidade": unidade_servidor[pos_servidor],
+        "CPF": documentos[pos_servidor],
+        "Nome_Funcionario": nomes[pos_servidor],
+        "Vinculo": rng.integers(1, 4, linhas),
+        "Vinculo_Desc": rng.choice(VINCULOS, linhas),
+        "Funcao_Efetiva_Desc": np.char.add("CARGO ", rng.integers(0, 200, linhas).astype(str)),
+        "Funcao_Gratificada_Comissao_Desc": np.char.add("FUNCAO ", rng.integers(0, 50, linhas).astype(str)),
+        "Setor_Desc": np.char.add("SETOR ", rng.integers(0, 300, linhas).astype(str)),
+        "Carga_Horaria": rng.choice([20, 30, 40], linhas),
+        "Financ_Verba_Desc": rng.choice(["TOTAL VANTAGENS", "VENCIMENTO", "GRATIFICACAO", "ADICIONAL"], linhas),
+        "Financ_Valor_Calculado": _valores(rng, linhas, 4_000),
+        "Grau_Instrucao_Desc": rng.choice(GRAUS_INSTRUCAO, linhas),
+        "Sexo_Desc": rng.choice(["MASCULINO", "FEMININO"], linhas),
+        "Data_Nascimento": nascimento.to_numpy()[pos_servidor],
+    })
+
+# Função para gerar a dotação orçamentária (load_dotacao_data) já com as colunas normalizadas
+def gerar_dotacao(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, _ = _tamanhos("dotacao", escala, 1)
+    ugs = carregar_ugs()
+    inicial = _valores(rng, linhas, 100_000)
+
+    return pd.DataFrame({
+        "ANO": rng.choice(ANOS, linhas),
+        "MES": rng.integers(1, 13, linhas),
+        "UG": rng.choice(ugs["UG"].to_numpy(), linhas),
+        "PODER": "EXE",
+        "UO": rng.integers(10_000, 99_999, linhas),
+        "FUNCAO": rng.choice(FUNCOES, linhas),
+        "VALOR_DOTACAO_INICIAL": inicial,
+        "VALOR_CREDITO_ADICIONAL": np.round(inicial * rng.uniform(0, 0.2, linhas), 2),
+        "VALOR_REMANEJAMENTO": np.round(inicial * rng.uniform(-0.1, 0.1, linhas), 2),
+        "VALOR_ATUALIZADO": np.round(inicial * rng.uniform(0.9, 1.3, linhas), 2),
+        "VALOR_EMPENHADO": np.round(inicial * rng.uniform(0.5, 1, linhas), 2),
+        "VALOR_LIQUIDADO": np.round(inicial * rng.uniform(0.4, 0.9, linhas), 2),
+        "VALOR_PAGO": np.round(inicial * rng.uniform(0.3, 0.8, linhas), 2),
+    })
+
+# Função para gerar os restos a pagar (load_restos_data), com os meses 0 (abertura) a 12
+def gerar_restos(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, _ = _tamanhos("restos", escala, 1)
+    ugs = carregar_ugs()
+    inscrito = _valores(rng, linhas, 50_000)
+
+    return pd.DataFrame({
+        "ANO": rng.choice(ANOS, linhas),
+        "MES": rng.integers(0, 13, linhas),
+        "UG": rng.choice(ugs["UG"].to_numpy(), linhas),
+        "VALOR_INSCRITO": inscrito,
+        "VALOR_INSCRITO_EXE_ANTERIOR": np.round(inscrito * rng.uniform(0, 0.5, linhas), 2),
+        "VALOR_CANCELADO": np.round(inscrito * rng.uniform(0, 0.1, linhas), 2),
+        "VALOR_BLOQUEADO": np.round(inscrito * rng.uniform(0, 0.05, linhas), 2),
+        "VALOR_PAGO": np.round(inscrito * rng.uniform(0, 0.8, linhas), 2),
+        "VALOR_A_PAGAR": np.round(inscrito * rng.uniform(0, 0.3, linhas), 2),
+    })
+
+# Função para gerar os adiantamentos (load_adiantamentos_data) já tipados
+def gerar_adiantamentos(escala=1, semente=0):
+    rng = np.random.default_rng(semente)
+    linhas, credores = _tamanhos("adiantamentos", escala, 5_000)
+    ugs = carregar_ugs()
+    nomes, documentos = _pessoas(rng, credores, "CREDOR")
+
+    pos_ug = rng.integers(0, len(ugs), linhas)
+    pos_credor = rng.integers(0, credores, linhas)
+    comprovados = _valores(rng, linhas, 2_000)
+
+    return pd.DataFrame({
+        "UG": ugs["UG"].to_numpy()[pos_ug],
+        "DESCRICAO_UG": ugs["DESCRICAO_UG"].to_numpy()[pos_ug],
+        "ANO": rng.choice(ANOS, linhas),
+        "NUM_MES": rng.integers(1, 13, linhas),
+        "COD_CREDOR": documentos[pos_credor],
+        "NOM_CREDOR": nomes[pos_credor],
+        "EMPENHO_PRODUTO": rng.choice(PRODUTOS, linhas),
+        "VALOR_ADIANTAMENTOS_COMPROVADOS": comprovados,
+        "VALOR_ADIANTAMENTOS_A_COMPROVAR": np.round(comprovados * rng.uniform(0, 0.3, linhas), 2),
+    })
+
+# Geradores de cada dataset: nome -> função(escala, semente)
+GERADORES = {
+    "despesas": gerar_despesas,
+    "contratos": gerar_contratos,
+    "aditivos": gerar_aditivos,
+    "folha": gerar_folha,
+    "dotacao": gerar_dotacao,
+    "restos": gerar_restos,
+    "adiantamentos": gerar_adiantamentos,
+}
@@ -0,0 +1,120 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from benchmarks.cenarios import CENARIOS, CENARIOS_EXPLICITOS
+from benchmarks.dados_sinteticos import GERADORES
+
+# Aumento máximo de tempo (mediana) em relação ao resultado anterior antes de apontar regressão
+LIMIAR_REGRESSAO = 1.2
+
+# Função para obter o commit atual do repositório (quando disponível)
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Função para medir um cenário: uma execução de aquecimento seguida das repetições cronometradas
+def medir_cenario(funcao, dados, repeticoes):
+    resultado = funcao(dados)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(dados)
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, tempos
+
+# Função para executar os cenários escolhidos em cada escala e montar o relatório
+def executar(escalas, nomes_cenarios, repeticoes, semente=0):
+    resultados = []
+    for escala in escalas:
+        datasets = {}
+        for nome in nomes_cenarios:
+            necessarios, funcao = CENARIOS[nome]
+
+            # Gerar cada dataset uma única vez por escala
+            for dataset in necessarios:
+                if dataset not in datasets:
+                    datasets[dataset] = GERADORES[dataset](escala, semente)
+            dados = {dataset: datasets[dataset] for dataset in necessarios}
+
+            resultado, tempos = medir_cenario(funcao, dados, repeticoes)
+            resultados.append({
+                "cenario": nome,
+                "escala": escala,
+                "linhas_entrada": {dataset: len(df) for dataset, df in dados.items()},
+                "resultado": int(resultado),
+                "tempos_s": [round(tempo, 6) for tempo in tempos],
+                "minimo_s": round(min(tempos), 6),
+                "mediana_s": round(statistics.median(tempos), 6),
+            })
+            print(f"{nome:<32} {escala:>5}x  mediana {statistics.median(tempos):.4f}s", file=sys.stderr)
+
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "repeticoes": repeticoes,
+        "resultados": resultados,
+    }
+
+# Função para comparar com um relatório anterior e listar os cenários que ficaram mais lentos
+def comparar(relatorio, anterior, limiar=LIMIAR_REGRESSAO):
+    medianas = {(item["cenario"], item["escala"]): item["mediana_s"] for item in anterior["resultados"]}
+    regressoes = []
+    for item in relatorio["resultados"]:
+        referencia = medianas.get((item["cenario"], item["escala"]))
+        if referencia:
+            item["variacao"] = round(item["mediana_s"] / referencia, 3)
+            if item["variacao"] > limiar:
+                regressoes.append(item)
+    return regressoes
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Painel do Gestor com dados sintéticos.")
+    parser.add_argument("--escalas", type=float, nargs="+", default=[1], help="Escalas do volume atual (ex.: 1 10 100).")
+    parser.add_argument("--cenarios", nargs="+", default=None, help="Cenários (ou prefixos, ex.: despesas) a executar.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: saída padrão).")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para apontar regressões.")
+    args = parser.parse_args(argumentos)
+
+    nomes = [nome for nome in CENARIOS if nome not in CENARIOS_EXPLICITOS]
+    if args.cenarios:
+        nomes = [
+            nome for nome in CENARIOS
+            if nome in args.cenarios or (nome not in CENARIOS_EXPLICITOS and any(nome.startswith(f"{filtro}.") for filtro in args.cenarios))
+        ]
+        if not nomes:
+            parser.error(f"Nenhum cenário encontrado. Disponíveis: {', '.join(CENARIOS)}")
+
+    escalas = [int(escala) if float(escala).is_integer() else escala for escala in args.escalas]
+    relatorio = executar(escalas, nomes, args.repeticoes, args.semente)
+
+    regressoes = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo))
+        relatorio["regressoes"] = [f"{item['cenario']} ({item['escala']}x): {item['variacao']}x" for item in regressoes]
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+    # Código de saída diferente de zero quando houver regressão (útil na comparação entre versões)
+    if regressoes:
+        sys.exit(1)
@@ -0,0 +1,42 @@
+# Algoritmos anteriores às versões vetorizadas, mantidos como referência para os benchmarks e os testes
+
+# Algoritmo anterior da aba "Análise de Consecutividade" (um filtro por favorecido e por mês)
+def consecutivos_legado(df_diarias):
+    """
+    Retorna {'6_ou_mais': [...], '4_5': [...], '3': [...]}, com um dicionário
+    {'Nome do Servidor', 'Valor Total Pago'} por favorecido, como a página montava antes
+    de calculos.diarias.classificar_consecutivos.
+    """
+    ultimo_ano = df_diarias['ANO'].max()
+    ultimo_mes = df_diarias[df_diarias['ANO'] == ultimo_ano]['MES'].max()
+
+    def obter_servidores_consecutivos(meses, servidores_contabilizados):
+        servidores_detalhes = []
+        for servidor in df_diarias['NOME_FAVORECIDO'].unique():
+            if servidor in servidores_contabilizados:
+                continue
+            df_servidor = df_diarias[df_diarias['NOME_FAVORECIDO'] == servidor]
+            df_servidor = df_servidor.sort_values(by=['ANO', 'MES'], ascending=False)
+            consecutivos = 0
+            mes_atual, ano_atual = ultimo_mes, ultimo_ano
+            valor_total = 0
+            for _ in range(meses):
+                df_mes = df_servidor[(df_servidor['ANO'] == ano_atual) & (df_servidor['MES'] == mes_atual)]
+                if df_mes.shape[0] > 0:
+                    consecutivos += 1
+                    valor_total += df_mes['VALOR_PAGO'].sum()
+                else:
+                    break
+                mes_atual -= 1
+                if mes_atual == 0:
+                    mes_atual, ano_atual = 12, ano_atual - 1
+            if consecutivos == meses:
+                servidores_detalhes.append({'Nome do Servidor': servidor, 'Valor Total Pago': valor_total})
+                servidores_contabilizados.add(servidor)
+        return servidores_detalhes
+
+    contabilizados = set()
+    faixa_6 = obter_servidores_consecutivos(6, contabilizados)
+    faixa_4_5 = obter_servidores_consecutivos(4, contabilizados) + obter_servidores_consecutivos(5, contabilizados)
+    faixa_3 = obter_servidores_consecutivos(3, contabilizados)
+    return {'6_ou_mais': faixa_6, '4_5': faixa_4_5, '3': faixa_3}
@@ -0,0 +1,341 @@
+import contextlib
+import functools
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+import metricas
+
+# Limite de memória dos datasets mantidos pelo processo (CACHE_DATASETS_MB nos secrets)
+ORCAMENTO_MEMORIA_MB = 2048
+
+# Cópia local dos datasets em parquet, usada para recarregar um dataset descartado sem acessar o Google Drive
+# (ligada por CACHE_DATASETS_DISCO nos secrets; os arquivos são criados legíveis apenas pelo usuário do processo)
+PASTA_CACHE = "cache_datasets"
+VALIDADE_DISCO_HORAS = 24
+
+# Datasets com dados pessoais (folha de pagamento com CPFs), que nunca são copiados para o disco
+DATASETS_SEM_DISCO = {"servidores"}
+
+_logger = logging.getLogger("painelgestor.cache_datasets")
+
+# Datasets em memória, do menos para o mais usado recentemente: nome -> informações do dataset
+_lock = threading.Lock()
+_datasets = OrderedDict()
+
+# Um lock por dataset, para que sessões e o aquecimento não carreguem o mesmo dataset ao mesmo tempo
+_locks_carga = {}
+
+# Funções que limpam os caches derivados de cada dataset (cópias ordenadas, índices) quando ele é descartado
+# (a memória deles é registrada em contabilizar e conta no orçamento junto com a do dataset)
+# (as registradas com nome None são executadas no descarte de qualquer dataset)
+_dependentes = {}
+
+# Memória dos caches derivados de todos os datasets (ex.: gráficos), liberada no descarte de qualquer dataset
+_globais = {}
+
+# Contador de cargas e descartes: muda sempre que algum dataset entra ou sai da memória
+_geracao = 0
+
+# Função para obter as configurações do cache (secrets, com valores padrão)
+def _configuracao():
+    return (
+        float(st.secrets.get("CACHE_DATASETS_MB", ORCAMENTO_MEMORIA_MB)) * 1024 ** 2,
+        st.secrets.get("CACHE_DATASETS_PASTA", PASTA_CACHE),
+        float(st.secrets.get("CACHE_DATASETS_VALIDADE_HORAS", VALIDADE_DISCO_HORAS)) * 3600,
+        bool(st.secrets.get("CACHE_DATASETS_DISCO", False)),
+    )
+
+# Função para registrar a limpeza de um cache derivado, executada quando o dataset (ou qualquer um, com nome None) for descartado da memória
+def registrar_dependente(nome, limpar):
+    with _lock:
+        limpezas = _dependentes.setdefault(nome, [])
+        if limpar not in limpezas:
+            limpezas.append(limpar)
+
+# Função para obter a geração atual dos datasets em memória (usada como versão nas chaves de cache)
+def geracao():
+    with _lock:
+        return _geracao
+
+# Função para listar as limpezas a executar no descarte de um dataset (executada com _lock adquirido)
+def _limpezas(nome):
+    return list(_dependentes.get(nome, [])) + list(_dependentes.get(None, []))
+
+# Função para estimar a memória ocupada por um resultado em cache (DataFrames, arrays, dicionários, figuras)
+def memoria_objeto(valor, _vistos=None):
+    """
+    Estimativa conservadora: colunas compartilhadas com o dataset de origem (cópias
+    preguiçosas do pandas) são contadas de novo em cada resultado que as contém.
+    """
+    vistos = set() if _vistos is None else _vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+
+    if hasattr(valor, "memory_usage"):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum()) if hasattr(uso, "sum") else int(uso)
+    if hasattr(valor, "nbytes"):
+        return int(valor.nbytes)
+    if hasattr(valor, "to_plotly_json"):
+        return memoria_objeto(valor.to_plotly_json(), vistos)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(memoria_objeto(chave, vistos) + memoria_objeto(item, vistos) for chave, item in valor.items())
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(memoria_objeto(item, vistos) for item in valor)
+    return sys.getsizeof(valor)
+
+# Função para somar a memória dos datasets e dos caches derivados deles (executada com _lock adquirido)
+def _memoria_total():
+    return sum(_memoria_dataset(info) for info in _datasets.values()) + sum(_globais.values())
+
+# Função para somar a memória de um dataset e dos caches derivados dele
+def _memoria_dataset(info):
+    return info["memoria"] + sum(sum(memorias) for memorias in info["derivados"].values())
+
+# Função para registrar a memória de um cache derivado de um dataset (ou de todos, com nome None)
+def contabilizar(nome, chave, memoria, entradas=1):
+    """
+    A memória passa a contar no orçamento do cache de datasets junto com a do dataset de
+    origem e sai da conta quando ele é descartado. entradas é o limite de resultados que o
+    cache derivado mantém ao mesmo tempo (max_entries), somados até esse limite.
+    """
+    orcamento, _, _, _ = _configuracao()
+    with _lock:
+        if nome is None:
+            _globais[chave] = memoria
+        elif nome in _datasets:
+            # O dataset de origem acabou de ser usado: não deve ser descartado para abrir espaço ao próprio derivado
+            _datasets.move_to_end(nome)
+            memorias = _datasets[nome]["derivados"].setdefault(chave, [])
+            memorias.append(memoria)
+            del memorias[:-entradas]
+        else:
+            # O dataset já saiu da memória: o resultado será descartado pelas limpezas registradas
+            return
+        descartados = _descartar_excedentes(orcamento)
+        memoria_total = _memoria_total()
+    _limpar_descartados(descartados)
+    metricas.definir("painelgestor_cache_datasets_bytes", memoria_total)
+
+# Decorador para contabilizar no orçamento os resultados de um cache derivado de um dataset
+def contabilizar_derivado(nome, entradas=1):
+    """Aplicado abaixo de st.cache_resource, mede apenas os resultados realmente calculados."""
+    def decorador(calcular):
+        @functools.wraps(calcular)
+        def calcular_contabilizado(*args, **kwargs):
+            resultado = calcular(*args, **kwargs)
+            contabilizar(nome, calcular.__qualname__, memoria_objeto(resultado), entradas)
+            return resultado
+        return calcular_contabilizado
+    return decorador
+
+# Função para obter o lock de carga de um dataset
+def _lock_carga(nome):
+    with _lock:
+        return _locks_carga.setdefault(nome, threading.Lock())
+
+# Função para ler a cópia local de um dataset (None quando não existir ou estiver vencida)
+def _ler_disco(nome, pasta, validade_s):
+    caminho_info = os.path.join(pasta, f"{nome}.json")
+    try:
+        if time.time() - os.path.getmtime(caminho_info) > validade_s:
+            return None
+        with open(caminho_info, encoding="utf-8") as arquivo:
+            info = json.load(arquivo)
+        partes = [pd.read_parquet(os.path.join(pasta, f"{nome}.{indice}.parquet")) for indice in range(info["partes"])]
+    except (OSError, ValueError, KeyError):
+        return None
+    return tuple(partes) if info.get("tupla") else partes[0]
+
+# Função para abrir um arquivo para gravação com permissão apenas para o usuário do processo (0600)
+def _abrir_privado(caminho):
+    descritor = os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+    # O modo do os.open vale apenas para arquivos novos: um .tmp antigo pode ter outra permissão
+    os.chmod(caminho, 0o600)
+    return os.fdopen(descritor, "wb")
+
+# Função para gravar a cópia local de um dataset (DataFrame ou tupla de DataFrames)
+def _gravar_disco(nome, valor, pasta):
+    """
+    Cada DataFrame vai para um arquivo parquet e o arquivo .json, que marca a cópia como
+    válida, é gravado por último. Datasets vazios (falha na carga) não são gravados.
+    """
+    partes = valor if isinstance(valor, tuple) else (valor,)
+    if not all(isinstance(df, pd.DataFrame) and not df.empty for df in partes):
+        return False
+
+    caminho_info = os.path.join(pasta, f"{nome}.json")
+    temporarios = [os.path.join(pasta, f"{nome}.{indice}.parquet.tmp") for indice in range(len(partes))] + [f"{caminho_info}.tmp"]
+    try:
+        os.makedirs(pasta, mode=0o700, exist_ok=True)
+        # Invalidar a cópia anterior antes de substituir as partes
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(caminho_info)
+        for indice, df in enumerate(partes):
+            caminho = os.path.join(pasta, f"{nome}.{indice}.parquet")
+            with _abrir_privado(f"{caminho}.tmp") as arquivo:
+                df.to_parquet(arquivo)
+            os.replace(f"{caminho}.tmp", caminho)
+
+        with _abrir_privado(f"{caminho_info}.tmp") as arquivo:
+            arquivo.write(json.dumps({"partes": len(partes), "tupla": isinstance(valor, tuple)}).encode("utf-8"))
+        os.replace(f"{caminho_info}.tmp", caminho_info)
+        return True
+    except (OSError, ValueError, pa.ArrowException):
+        # Falta de espaço ou permissão (OSError) e colunas que o parquet não aceita: o dataset continua apenas em memória
+        _logger.warning("Cópia em disco do dataset %s não gravada", nome, exc_info=True)
+        for caminho in temporarios:
+            with contextlib.suppress(OSError):
+                os.remove(caminho)
+        return False
+
+# Função para apagar a cópia local de um dataset (o .json, que marca a cópia como válida, é apagado primeiro)
+def _apagar_disco(nome, pasta):
+    caminhos = [os.path.join(pasta, f"{nome}.json")] + sorted(glob.glob(os.path.join(glob.escape(pasta), f"{glob.escape(nome)}.*.parquet*")))
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            _logger.warning("Cópia em disco do dataset %s não apagada: %s", nome, caminho, exc_info=True)
+
+# Função para descartar os datasets menos usados até a memória ocupada caber no orçamento
+def _descartar_excedentes(orcamento):
+    """Executada com _lock adquirido. O dataset mais recente nunca é descartado."""
+    global _geracao
+    descartados = []
+    while len(_datasets) > 1 and _memoria_total() > orcamento:
+        nome, _ = _datasets.popitem(last=False)
+        _geracao += 1
+        # Os caches derivados de todos os datasets são limpos em qualquer descarte
+        _globais.clear()
+        descartados.append((nome, _limpezas(nome)))
+    return descartados
+
+# Função para executar as limpezas dos datasets descartados (fora do lock, pois elas podem voltar a pedir o dataset)
+def _limpar_descartados(descartados):
+    for _, limpezas in descartados:
+        metricas.incrementar("painelgestor_cache_descartes_total", cache="datasets")
+        for limpar in limpezas:
+            limpar()
+
+# Função para obter um dataset: da memória, da cópia local em disco ou, por fim, do loader informado
+def obter_dataset(nome, carregar):
+    """
+    carregar é a função que baixa o dataset do Google Drive. O resultado (DataFrame ou tupla
+    de DataFrames) não deve ser alterado por quem o recebe, pois é compartilhado entre as sessões.
+    """
+    global _geracao
+    with _lock:
+        if nome in _datasets:
+            _datasets.move_to_end(nome)
+            _datasets[nome]["acessos"] += 1
+            metricas.registrar_cache("datasets", acerto=True)
+            return _datasets[nome]["valor"]
+
+    orcamento, pasta, validade_s, disco = _configuracao()
+    # Cópia em disco apenas quando ligada e para datasets sem dados pessoais
+    disco = disco and nome not in DATASETS_SEM_DISCO
+
+    with _lock_carga(nome):
+        # Outra sessão pode ter carregado o dataset enquanto esperávamos o lock
+        with _lock:
+            if nome in _datasets:
+                _datasets.move_to_end(nome)
+                _datasets[nome]["acessos"] += 1
+                metricas.registrar_cache("datasets", acerto=True)
+                return _datasets[nome]["valor"]
+
+        metricas.registrar_cache("datasets", acerto=False)
+        inicio = time.perf_counter()
+        valor = _ler_disco(nome, pasta, validade_s) if disco else None
+        origem = "disco"
+        if valor is None:
+            valor = carregar()
+            origem = "drive"
+            if disco:
+                _gravar_disco(nome, valor, pasta)
+            else:
+                # Remover cópias gravadas antes de o disco ser desligado para o dataset
+                _apagar_disco(nome, pasta)
+
+        informacoes = {
+            "valor": valor,
+            "memoria": metricas.memoria_dataframes(valor),
+            "origem": origem,
+            "carga_s": time.perf_counter() - inicio,
+            "carregado_em": time.time(),
+            "acessos": 1,
+            "derivados": {},
+        }
+
+        with _lock:
+            _geracao += 1
+            _datasets[nome] = informacoes
+            descartados = _descartar_excedentes(orcamento)
+            memoria_total = _memoria_total()
+
+    _limpar_descartados(descartados)
+    metricas.definir("painelgestor_cache_datasets_bytes", memoria_total)
+    metricas.definir("painelgestor_dataset_memoria_bytes", informacoes["memoria"], dataset=nome)
+    return valor
+
+# Função para descartar um dataset da memória (a cópia em disco é mantida, exceto com apagar_disco)
+def descartar_dataset(nome, apagar_disco=False):
+    """
+    Com apagar_disco, a próxima carga vai ao Google Drive mesmo que a cópia local ainda
+    esteja dentro da validade (usado para obter dados novos antes do prazo).
+    """
+    global _geracao
+    if apagar_disco:
+        _, pasta, _, _ = _configuracao()
+        # Apagar antes de liberar a memória: uma sessão que peça o dataset em seguida não lê a cópia antiga
+        with _lock_carga(nome):
+            _apagar_disco(nome, pasta)
+    with _lock:
+        informacoes = _datasets.pop(nome, None)
+        limpezas = _limpezas(nome)
+        if informacoes is not None:
+            _geracao += 1
+            _globais.clear()
+        memoria_total = _memoria_total()
+    if informacoes is not None:
+        metricas.incrementar("painelgestor_cache_descartes_total", cache="datasets")
+        metricas.definir("painelgestor_cache_datasets_bytes", memoria_total)
+        for limpar in limpezas:
+            limpar()
+
+# Função para listar os datasets já pedidos neste processo (em memória ou não)
+def datasets_conhecidos():
+    with _lock:
+        return sorted(_locks_carga)
+
+# Função para listar os datasets mantidos em memória, do mais para o menos usado recentemente
+def resumo_cache():
+    """Retorna (df, memória total em MB, orçamento em MB); o total inclui os caches derivados."""
+    orcamento, _, _, _ = _configuracao()
+    with _lock:
+        linhas = [
+            {
+                "Dataset": nome,
+                "Memória (MB)": info["memoria"] / 1024 ** 2,
+                "Derivados (MB)": (_memoria_dataset(info) - info["memoria"]) / 1024 ** 2,
+                "Origem": info["origem"],
+                "Carga (s)": info["carga_s"],
+                "Acessos": info["acessos"],
+                "Carregado em": time.strftime("%d/%m/%Y %H:%M", time.localtime(info["carregado_em"])),
+            }
+            for nome, info in reversed(_datasets.items())
+        ]
+        memoria_total = _memoria_total()
+    return pd.DataFrame(linhas), memoria_total / 1024 ** 2, orcamento / 1024 ** 2
@@ -0,0 +1,3 @@
+# Cálculos das páginas do painel, sem dependência do Streamlit.
+# Cada função recebe DataFrames já tipados e devolve resultados pequenos (totais, agrupamentos,
+# indicadores), que podem ser reaproveitados em cache, nos benchmarks ou fora do painel.
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+VALORES_COMPROVACAO = ["VALOR_ADIANTAMENTOS_COMPROVADOS", "VALOR_ADIANTAMENTOS_A_COMPROVAR"]
+
+# Chaves comuns a todos os agrupamentos do cubo (permitem filtrar por UG, ano e mês)
+CHAVES_CUBO = ["UG", "DESCRICAO_UG", "ANO", "NUM_MES"]
+
+# Agrupamentos do cubo: nome -> dimensões adicionais às chaves comuns
+AGRUPAMENTOS_CUBO = {
+    "base": [],                      # Totais por ano, mês e UG
+    "credor": ["NOM_CREDOR"],        # Totais por credor
+    "produto": ["EMPENHO_PRODUTO"],  # Totais por categoria de despesa
+}
+
+# Função para ordenar um DataFrame por UG, ano e mês e montar o índice UG -> (inicio, fim) de suas linhas
+def ordenar_por_ug(df, ordem=("UG", "ANO", "NUM_MES")):
+    df = df.sort_values(list(ordem), kind="stable").reset_index(drop=True)
+
+    ugs, inicios = np.unique(df["UG"].to_numpy(), return_index=True)
+    fins = np.append(inicios[1:], len(df))
+    indice = {int(ug): (int(inicio), int(fim)) for ug, inicio, fim in zip(ugs, inicios, fins)}
+    return df, indice
+
+# Função para montar o cubo de adiantamentos a partir dos adiantamentos (ordenados ou não)
+def montar_cubo(df):
+    """
+    Retorna {agrupamento: (df, indice)} com os valores somados por CHAVES_CUBO mais as
+    dimensões de cada agrupamento. Cada df é ordenado e indexado por UG como em ordenar_por_ug.
+    """
+    if df.empty:
+        return {nome: (pd.DataFrame(columns=CHAVES_CUBO + dimensoes + VALORES_COMPROVACAO), {}) for nome, dimensoes in AGRUPAMENTOS_CUBO.items()}
+
+    cubo = {}
+    for nome, dimensoes in AGRUPAMENTOS_CUBO.items():
+        df_agrupado = df.groupby(CHAVES_CUBO + dimensoes, dropna=False, sort=False)[VALORES_COMPROVACAO].sum().reset_index()
+        cubo[nome] = ordenar_por_ug(df_agrupado)
+    return cubo
+
+# Função para filtrar os adiantamentos por UG, ano e mês usando o índice por UG
+def fatiar_por_ug(df, indice, ugs, anos, meses):
+    """
+    Com ugs=None (opção "TODAS") considera todas as linhas; caso contrário,
+    recorta apenas os intervalos das UGs informadas antes de aplicar ano e mês.
+    """
+    if ugs is not None:
+        intervalos = [indice[int(ug)] for ug in ugs if int(ug) in indice]
+        if not intervalos:
+            return df.iloc[0:0]
+        posicoes = np.concatenate([np.arange(inicio, fim) for inicio, fim in intervalos])
+        df = df.iloc[posicoes]
+
+    return df[
+        (df["ANO"].between(anos[0], anos[1])) &
+        (df["NUM_MES"].between(meses[0], meses[1]))
+    ]
+
+# Função para obter um agrupamento do cubo já filtrado por UG, ano e mês
+def fatiar_cubo(cubo, agrupamento, ugs, anos, meses):
+    df, indice = cubo[agrupamento]
+    return fatiar_por_ug(df, indice, ugs, anos, meses)
+
+# Função para calcular a taxa de eficiência na comprovação: comprovados / (comprovados + a comprovar), em %
+def taxa_eficiencia(comprovados, a_comprovar):
+    total = np.asarray(comprovados + a_comprovar, dtype=float)
+    comprovados = np.asarray(comprovados, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, comprovados / total * 100, 0.0)
+
+# Função para calcular a eficiência na comprovação agrupada pelas colunas informadas
+def eficiencia_por(df, colunas, coluna_taxa="Eficiência (%)"):
+    df_eficiencia = df.groupby(colunas)[VALORES_COMPROVACAO].sum().reset_index()
+    df_eficiencia[coluna_taxa] = taxa_eficiencia(
+        df_eficiencia["VALOR_ADIANTAMENTOS_COMPROVADOS"], df_eficiencia["VALOR_ADIANTAMENTOS_A_COMPROVAR"]
+    )
+    return df_eficiencia
+
+# Função para obter os totais a comprovar e comprovados do período
+def totais_comprovacao(df):
+    return df["VALOR_ADIANTAMENTOS_A_COMPROVAR"].sum(), df["VALOR_ADIANTAMENTOS_COMPROVADOS"].sum()
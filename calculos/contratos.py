@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+# Faixas de vencimento monitoradas: nome da coluna -> dias a partir da data de referência
+FAIXAS_VENCIMENTO = {
+    "VENCE_30_DIAS": 30,
+    "VENCE_60_DIAS": 60,
+    "VENCE_90_DIAS": 90,
+}
+
+# Função para calcular a quantidade e o valor total dos contratos
+def metricas_contratos(df_contratos):
+    return len(df_contratos), df_contratos['VALOR_TOTAL'].sum()
+
+# Função para contar os contratos e somar seus valores por uma coluna (situação, licitação, natureza, UG)
+def totais_por_categoria(df_contratos, coluna):
+    return df_contratos.groupby(coluna).agg(
+        quantidade=('CODIGO_CONTRATO', 'count'),
+        valor_total=('VALOR_TOTAL', 'sum')
+    ).reset_index()
+
+# Função para obter os totais por UG com a sigla de cada UG (apenas UGs com contratos)
+def totais_por_ug(df_contratos, df_ugs):
+    df_ug = totais_por_categoria(df_contratos, 'UG')
+    df_ug = df_ug[df_ug['quantidade'] > 0]
+    return df_ug.merge(df_ugs[['UG', 'SIGLA_UG']], on='UG', how='left')
+
+# Função para somar os valores dos contratos por tipo de licitação
+def valores_por_licitacao(df_contratos):
+    return df_contratos.groupby('NOM_TIPO_LICITACAO')['VALOR_TOTAL'].sum().reset_index()
+
+# Função para ordenar os aditivos por código do contrato e montar o índice e o resumo de cada contrato
+def indexar_aditivos(df_aditivos, df_contratos):
+    """
+    Retorna (df_aditivos, indice, resumo):
+    - df_aditivos: aditivos e reajustes ordenados por COD_CONTRATO;
+    - indice: COD_CONTRATO -> intervalo (inicio, fim) de suas linhas em df_aditivos;
+    - resumo: por COD_CONTRATO, QTD_ADITIVOS, VALOR_ADITIVOS, VALOR_ORIGINAL (VALOR_TOTAL
+      da lista de contratos) e PERCENTUAL_ADITIVOS (valor acrescido sobre o valor original).
+    """
+    if df_aditivos.empty:
+        return df_aditivos, {}, pd.DataFrame()
+
+    df_aditivos = df_aditivos.dropna(subset=['COD_CONTRATO']).sort_values('COD_CONTRATO', kind='stable').reset_index(drop=True)
+
+    codigos, inicios = np.unique(df_aditivos['COD_CONTRATO'].to_numpy(), return_index=True)
+    fins = np.append(inicios[1:], len(df_aditivos))
+    indice = {int(codigo): (int(inicio), int(fim)) for codigo, inicio, fim in zip(codigos, inicios, fins)}
+
+    resumo = df_aditivos.groupby('COD_CONTRATO').agg(
+        QTD_ADITIVOS=('COD_CONTRATO', 'size'),
+        VALOR_ADITIVOS=('VALOR', 'sum')
+    )
+    resumo.index = resumo.index.astype('int64')
+
+    if not df_contratos.empty:
+        valor_original = df_contratos.dropna(subset=['CODIGO_CONTRATO']).drop_duplicates('CODIGO_CONTRATO')
+        valor_original = valor_original.set_index(valor_original['CODIGO_CONTRATO'].astype('int64'))['VALOR_TOTAL']
+        resumo['VALOR_ORIGINAL'] = valor_original.reindex(resumo.index)
+    else:
+        resumo['VALOR_ORIGINAL'] = np.nan
+
+    resumo['PERCENTUAL_ADITIVOS'] = resumo['VALOR_ADITIVOS'] / resumo['VALOR_ORIGINAL'].where(resumo['VALOR_ORIGINAL'] != 0) * 100
+    return df_aditivos, indice, resumo
+
+# Função para obter os aditivos de um único contrato (consulta direta no índice)
+def aditivos_do_contrato(df_aditivos, indice, codigo):
+    inicio, fim = indice.get(int(codigo), (0, 0))
+    return df_aditivos.iloc[inicio:fim]
+
+# Função para obter os aditivos de uma lista de contratos
+def aditivos_dos_contratos(df_aditivos, indice, codigos):
+    intervalos = [indice[int(codigo)] for codigo in pd.unique(codigos) if pd.notnull(codigo) and int(codigo) in indice]
+    if not intervalos:
+        return df_aditivos.iloc[0:0]
+    posicoes = np.concatenate([np.arange(inicio, fim) for inicio, fim in sorted(intervalos)])
+    return df_aditivos.iloc[posicoes]
+
+# Função para ordenar os contratos por início e por fim da vigência (índice para buscas binárias)
+def indexar_vigencia(df_contratos):
+    """
+    Retorna {coluna: (ordem, datas)} para DATA_INICIO_VIGENCIA e DATA_FIM_VIGENCIA, onde
+    ordem são as posições das linhas da lista de contratos ordenadas pela data e datas
+    são os valores já ordenados (linhas sem data ficam de fora).
+    """
+    indice = {}
+    for coluna in ['DATA_INICIO_VIGENCIA', 'DATA_FIM_VIGENCIA']:
+        datas = df_contratos[coluna].to_numpy(dtype='datetime64[ns]')
+        validas = np.flatnonzero(~np.isnat(datas))
+        ordem = validas[np.argsort(datas[validas], kind='stable')]
+        indice[coluna] = (ordem, datas[ordem])
+    return indice
+
+# Função para obter a menor e a maior data de uma coluna de vigência (usadas nos sliders)
+def extremos_vigencia(indice, coluna):
+    """Retorna None quando nenhum contrato tem data válida na coluna."""
+    _, datas = indice[coluna]
+    if len(datas) == 0:
+        return None
+    return pd.Timestamp(datas[0]).date(), pd.Timestamp(datas[-1]).date()
+
+# Função para obter as posições dos contratos com a data de vigência dentro do intervalo [inicio, fim]
+def posicoes_no_intervalo(indice, coluna, inicio, fim):
+    ordem, datas = indice[coluna]
+    primeiro = np.searchsorted(datas, np.datetime64(pd.Timestamp(inicio), 'ns'), side='left')
+    ultimo = np.searchsorted(datas, np.datetime64(pd.Timestamp(fim), 'ns'), side='right')
+    return ordem[primeiro:ultimo]
+
+# Função para filtrar a lista de contratos pelos períodos de início e de fim da vigência
+def filtrar_vigencia(df_contratos, indice, periodo_inicio, periodo_fim):
+    posicoes = np.intersect1d(
+        posicoes_no_intervalo(indice, 'DATA_INICIO_VIGENCIA', *periodo_inicio),
+        posicoes_no_intervalo(indice, 'DATA_FIM_VIGENCIA', *periodo_fim)
+    )
+    return df_contratos.iloc[posicoes]
+
+# Função para contar, por UG, os contratos vencidos e a vencer a partir de uma data de referência
+def contar_vencimentos(df_contratos, indice, data_referencia):
+    """
+    Retorna uma linha por UG com a quantidade de contratos VENCIDOS (fim da vigência antes
+    de data_referencia) e a vencer em até 30, 60 e 90 dias (faixas acumuladas).
+    """
+    ordem, datas = indice['DATA_FIM_VIGENCIA']
+
+    referencia = np.datetime64(pd.Timestamp(data_referencia), 'ns')
+    inicio_faixas = np.searchsorted(datas, referencia, side='left')
+
+    faixas = {"VENCIDOS": ordem[:inicio_faixas]}
+    for nome, dias in FAIXAS_VENCIMENTO.items():
+        limite = np.searchsorted(datas, referencia + np.timedelta64(dias, 'D'), side='right')
+        faixas[nome] = ordem[inicio_faixas:limite]
+
+    ugs = df_contratos['UG']
+    df_vencimentos = pd.DataFrame({nome: ugs.iloc[posicoes].value_counts() for nome, posicoes in faixas.items()})
+    df_vencimentos = df_vencimentos.fillna(0).astype(int)
+    df_vencimentos.index = df_vencimentos.index.astype('int64')
+    df_vencimentos.index.name = 'UG'
+    return df_vencimentos.reset_index()
@@ -0,0 +1,26 @@
+import pandas as pd
+
+VALORES_DESPESAS = ['VALOR_EMPENHADO', 'VALOR_LIQUIDADO', 'VALOR_PAGO']
+
+# Função para filtrar as linhas das UGs selecionadas no intervalo de anos e meses
+def filtrar_ug_periodo(df, ugs, anos, meses):
+    return df[
+        df['UG'].isin(ugs) &
+        df['ANO'].between(anos[0], anos[1]) &
+        df['MES'].between(meses[0], meses[1])
+    ]
+
+# Função para filtrar as despesas por UG, ano e mês, descartando linhas sem chave e tipando os valores
+def filtrar_despesas(df, ugs, anos, meses):
+    df = filtrar_ug_periodo(df, ugs, anos, meses)
+    df = df.dropna(subset=[coluna for coluna in ['UO', 'UG', 'ANO', 'MES'] if coluna in df.columns])
+    return df.assign(**{coluna: pd.to_numeric(df[coluna], errors='coerce') for coluna in VALORES_DESPESAS})
+
+# Função para somar um valor por uma ou mais colunas (uma linha por categoria)
+def totais_por(df, colunas, valor='VALOR_PAGO'):
+    return df.groupby(colunas)[valor].sum().reset_index()
+
+# Função para obter o ano mais recente e os totais mensais desse ano
+def totais_ano_corrente(df, valor='VALOR_PAGO'):
+    ano_corrente = df['ANO'].max()
+    return ano_corrente, totais_por(df[df['ANO'] == ano_corrente], 'MES', valor)
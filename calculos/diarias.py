@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+NATUREZAS_DIARIAS = ['DIARIAS - CIVIL', 'DIARIAS - MILITAR']
+
+# Faixas de meses consecutivos: nome -> (menor sequência, maior sequência, meses somados no valor)
+FAIXAS_CONSECUTIVAS = {
+    '6_ou_mais': (6, None, 6),
+    '4_5': (4, 5, 4),
+    '3': (3, 3, 3),
+}
+MAX_MESES_CONSECUTIVOS = 6
+
+# Função para obter apenas as despesas com diárias
+def filtrar_diarias(df):
+    return df[df['DESCRICAO_NATUREZA6'].isin(NATUREZAS_DIARIAS)]
+
+# Função para calcular a quantidade e o valor total das diárias pagas
+def metricas_diarias(df_diarias):
+    return int((df_diarias['VALOR_PAGO'] > 0).sum()), df_diarias['VALOR_PAGO'].sum()
+
+# Função para resumir as diárias por uma coluna (valores empenhados e pagos)
+def resumo_diarias(df_diarias, coluna):
+    return df_diarias.groupby(coluna)[['VALOR_EMPENHADO', 'VALOR_PAGO']].sum().reset_index()
+
+# Função para agrupar as diárias por favorecido, processo, empenho e mês (tabela de favorecidos), com o período AAAA/MM
+def agrupar_favorecidos(df_diarias):
+    df_favorecidos = df_diarias.groupby([
+        'CODIGO_FAVORECIDO', 'NOME_FAVORECIDO', 'DESCRICAO_NATUREZA', 'COD_PROCESSO',
+        'NOTA_EMPENHO', 'OBSERVACAO_NE', 'MES', 'ANO'
+    ]).agg({'VALOR_PAGO': 'sum'}).reset_index()
+    df_favorecidos['Período'] = df_favorecidos['ANO'].astype(str) + '/' + df_favorecidos['MES'].astype(str).str.zfill(2)
+    return df_favorecidos
+
+# Função para calcular, por favorecido, os meses consecutivos com diárias até o último mês dos dados
+def calcular_sequencias(df_diarias, max_meses=MAX_MESES_CONSECUTIVOS):
+    """
+    Retorna uma linha por favorecido (na ordem em que aparecem) com SEQUENCIA, a quantidade de
+    meses seguidos com diárias terminando no último mês dos dados (limitada a max_meses), e
+    VALOR_k, o valor pago nos k meses mais recentes, para k de 1 a max_meses.
+    """
+    colunas_valor = [f'VALOR_{k}' for k in range(1, max_meses + 1)]
+    if df_diarias.empty:
+        return pd.DataFrame(columns=['NOME_FAVORECIDO', 'SEQUENCIA'] + colunas_valor)
+
+    codigos, favorecidos = pd.factorize(df_diarias['NOME_FAVORECIDO'])
+
+    # Distância de cada linha ao último mês dos dados (0 = último mês, 1 = mês anterior, ...)
+    ultimo_ano = df_diarias['ANO'].max()
+    ultimo_mes = df_diarias.loc[df_diarias['ANO'] == ultimo_ano, 'MES'].max()
+    distancia = (ultimo_ano * 12 + ultimo_mes) - (df_diarias['ANO'].to_numpy() * 12 + df_diarias['MES'].to_numpy())
+
+    recentes = (codigos >= 0) & (distancia >= 0) & (distancia < max_meses)
+    linhas, colunas = codigos[recentes], distancia[recentes].astype(int)
+
+    # Matrizes favorecido x mês: presença de diárias e valor pago
+    presenca = np.zeros((len(favorecidos), max_meses), dtype=bool)
+    presenca[linhas, colunas] = True
+    valores = np.zeros((len(favorecidos), max_meses))
+    np.add.at(valores, (linhas, colunas), np.nan_to_num(df_diarias['VALOR_PAGO'].to_numpy(dtype=float)[recentes]))
+
+    # A sequência termina no primeiro mês sem diárias (ou cobre todos os meses)
+    sequencia = np.where(presenca.all(axis=1), max_meses, presenca.argmin(axis=1))
+
+    resultado = pd.DataFrame(np.cumsum(valores, axis=1), columns=colunas_valor)
+    resultado.insert(0, 'SEQUENCIA', sequencia)
+    resultado.insert(0, 'NOME_FAVORECIDO', favorecidos)
+    return resultado
+
+# Função para separar os favorecidos com diárias consecutivas nas faixas de 3, 4 a 5 e 6 ou mais meses
+def classificar_consecutivos(df_diarias):
+    """
+    Retorna {faixa: DataFrame} com 'Nome do Servidor' e 'Valor Total Pago' (valor dos meses
+    da faixa: 6, 4 ou 3 mais recentes). Cada favorecido aparece apenas na maior faixa atingida.
+    """
+    sequencias = calcular_sequencias(df_diarias)
+
+    faixas = {}
+    for faixa, (minimo, maximo, meses_valor) in FAIXAS_CONSECUTIVAS.items():
+        na_faixa = sequencias['SEQUENCIA'] >= minimo
+        if maximo is not None:
+            na_faixa &= sequencias['SEQUENCIA'] <= maximo
+        faixas[faixa] = pd.DataFrame({
+            'Nome do Servidor': sequencias.loc[na_faixa, 'NOME_FAVORECIDO'].to_numpy(),
+            'Valor Total Pago': sequencias.loc[na_faixa, f'VALOR_{meses_valor}'].to_numpy(),
+        })
+    return faixas
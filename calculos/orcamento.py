@@ -0,0 +1,172 @@
+import pandas as pd
+
+# Colunas obrigatórias de cada base usada no painel de Orçamento
+COLUNAS_DOTACAO = {"ANO", "UG", "PODER", "UO", "FUNCAO", "VALOR_DOTACAO_INICIAL"}
+COLUNAS_DESPESAS = {"ANO", "UG", "VALOR_EMPENHADO", "VALOR_LIQUIDADO", "VALOR_PAGO"}
+
+# Colunas de valores de cada base (convertidas para numérico uma única vez)
+VALORES_DOTACAO = [
+    "VALOR_DOTACAO_INICIAL", "VALOR_CREDITO_ADICIONAL", "VALOR_REMANEJAMENTO",
+    "VALOR_ATUALIZADO", "VALOR_EMPENHADO", "VALOR_LIQUIDADO", "VALOR_PAGO"
+]
+VALORES_DESPESAS = ["VALOR_EMPENHADO", "VALOR_LIQUIDADO", "VALOR_PAGO"]
+VALORES_RESTOS = [
+    "VALOR_INSCRITO", "VALOR_INSCRITO_EXE_ANTERIOR", "VALOR_CANCELADO",
+    "VALOR_BLOQUEADO", "VALOR_PAGO", "VALOR_A_PAGAR"
+]
+
+# Indicadores do ranking: nome exibido -> (numerador, denominador)
+INDICADORES_RANKING = {
+    "Empenho / Dotação": ("VALOR_EMPENHADO", "VALOR_ATUALIZADO"),
+    "Liquidação / Empenho": ("VALOR_LIQUIDADO", "VALOR_EMPENHADO"),
+    "Pago / Dotação": ("VALOR_PAGO", "VALOR_ATUALIZADO"),
+}
+
+# Percentuais de execução por ano: coluna -> coluna do numerador (o denominador é a dotação atualizada)
+PERCENTUAIS_EXECUCAO = {
+    "% Execução Empenhada": "VALOR_EMPENHADO",
+    "% Liquidação": "VALOR_LIQUIDADO",
+    "% Pagamento": "VALOR_PAGO",
+}
+
+# Função para calcular os indicadores (em %) e o percentil de cada linha (denominador zero resulta em vazio)
+def calcular_indicadores(df, indicadores=INDICADORES_RANKING):
+    df = df.copy()
+    for indicador, (numerador, denominador) in indicadores.items():
+        denominador_valido = df[denominador].where(df[denominador] != 0)
+        df[indicador] = df[numerador] / denominador_valido * 100
+        df[f"Percentil - {indicador}"] = df[indicador].rank(pct=True) * 100
+    return df
+
+# Função para calcular os percentuais de execução sobre a dotação atualizada (denominador zero resulta em 0)
+def percentuais_execucao(df, percentuais=PERCENTUAIS_EXECUCAO):
+    denominador_valido = df["VALOR_ATUALIZADO"].where(df["VALOR_ATUALIZADO"] != 0)
+    return df.assign(**{
+        coluna: (df[numerador] / denominador_valido * 100).fillna(0) for coluna, numerador in percentuais.items()
+    })
+
+# Função para calcular os indicadores dos velocímetros a partir dos totais do período
+def indicadores_execucao(dotacao_atualizada, empenhado, liquidado, pago):
+    """
+    Retorna os valores usados nos velocímetros: os totais (dotação e empenho iguais a 0 passam a 1,
+    evitando divisão por zero) e os percentuais de empenho, crédito disponível, pagamento,
+    liquidação e dotação paga.
+    """
+    dotacao_atualizada = dotacao_atualizada or 1
+    empenhado = empenhado or 1
+    return {
+        "dotacao_atualizada": dotacao_atualizada,
+        "empenhado": empenhado,
+        "liquidado": liquidado,
+        "pago": pago,
+        "credito_disponivel": dotacao_atualizada - empenhado,
+        "empenho_dotacao": empenhado / dotacao_atualizada * 100,
+        "credito_disponivel_pct": (dotacao_atualizada - empenhado) / dotacao_atualizada * 100,
+        "pagamento_empenho": pago / empenhado * 100,
+        "liquidacao_empenho": liquidado / empenhado * 100,
+        "dotacao_paga": pago / dotacao_atualizada * 100,
+    }
+
+# Função para normalizar os nomes das colunas (maiúsculas e sem espaços)
+def normalizar_colunas(df):
+    return df.rename(columns=lambda coluna: coluna.strip().upper())
+
+# Função para converter as chaves (UG, ANO, MES) para inteiro, descartando linhas sem chave válida
+def tipar_chaves(df, chaves):
+    """
+    Linhas com UG, ANO ou MES vazios ou não numéricos são descartadas. Elas já ficavam de fora
+    dos totais (os agrupamentos por essas chaves as ignoram) e dos filtros de UG e de ano, que
+    comparam com os códigos numéricos das UGs de interesse e com o intervalo de anos.
+    """
+    df = df.assign(**{chave: pd.to_numeric(df[chave], errors="coerce") for chave in chaves})
+    df = df.dropna(subset=chaves)
+    return df.astype({chave: "int64" for chave in chaves})
+
+# Função para converter as colunas de valores para numérico (valores inválidos viram 0)
+def tipar_valores(df, colunas):
+    return df.assign(**{
+        coluna: pd.to_numeric(df[coluna], errors="coerce").fillna(0)
+        for coluna in colunas if coluna in df.columns
+    })
+
+# Função para tipar a dotação orçamentária (colunas já normalizadas, com COLUNAS_DOTACAO)
+def preparar_dotacao(df):
+    chaves = ["UG", "ANO", "MES"] if "MES" in df.columns else ["UG", "ANO"]
+    df = tipar_chaves(df, chaves)
+    return tipar_valores(df, VALORES_DOTACAO).reset_index(drop=True)
+
+# Função para agregar a execução das despesas por (UG, ANO, MES), selecionando as colunas antes de qualquer conversão
+def agregar_execucao_despesas(df):
+    """Os nomes das colunas de df podem ter espaços ou minúsculas; COLUNAS_DESPESAS devem existir."""
+    colunas = {coluna.strip().upper(): coluna for coluna in df.columns}
+    chaves = ["UG", "ANO", "MES"] if "MES" in colunas else ["UG", "ANO"]
+    df_execucao = df[[colunas[coluna] for coluna in chaves + VALORES_DESPESAS]]
+    df_execucao = df_execucao.set_axis(chaves + VALORES_DESPESAS, axis=1)
+
+    df_execucao = tipar_valores(tipar_chaves(df_execucao, chaves), VALORES_DESPESAS)
+    return df_execucao.groupby(chaves, as_index=False)[VALORES_DESPESAS].sum()
+
+# Função para tipar os restos a pagar (UG, ANO e MES inteiros)
+def preparar_restos(df):
+    df = tipar_chaves(normalizar_colunas(df), ["UG", "ANO", "MES"])
+    return tipar_valores(df, VALORES_RESTOS).reset_index(drop=True)
+
+# Função para calcular os totais anuais de restos a pagar por (UG, ANO)
+def totais_anuais_restos(df_restos):
+    """
+    Considera os meses 0 a 12 em todas as colunas de valores. A coluna
+    VALOR_INSCRITO_SEM_DEZEMBRO exclui o mês 12, que repete o valor inscrito no exercício.
+    """
+    df_restos = df_restos[df_restos["MES"].between(0, 12)]
+    valores = [coluna for coluna in VALORES_RESTOS if coluna in df_restos.columns]
+
+    df_anual = df_restos.groupby(["UG", "ANO"], as_index=False)[valores].sum()
+
+    df_inscrito = (
+        df_restos[df_restos["MES"] != 12]
+        .groupby(["UG", "ANO"], as_index=False)["VALOR_INSCRITO"].sum()
+        .rename(columns={"VALOR_INSCRITO": "VALOR_INSCRITO_SEM_DEZEMBRO"})
+    )
+
+    df_anual = df_anual.merge(df_inscrito, on=["UG", "ANO"], how="left")
+    df_anual["VALOR_INSCRITO_SEM_DEZEMBRO"] = df_anual["VALOR_INSCRITO_SEM_DEZEMBRO"].fillna(0)
+    return df_anual.sort_values(["UG", "ANO"]).reset_index(drop=True)
+
+# Função para unir a dotação e a execução das despesas em uma tabela por (UG, ANO, MES)
+def montar_fatos_execucao(df_dotacao, df_despesas):
+    """
+    Retorna uma linha por (UG, ANO, MES), ou por (UG, ANO) sem o mês, com os valores da
+    dotação (VALORES_DOTACAO) e a execução das despesas (sufixo _DESPESA). As colunas
+    TEM_DOTACAO e TEM_DESPESA indicam de qual base a linha veio, preservando o critério
+    de exibição de cada aba.
+    """
+    # MES é opcional nas duas bases: a tabela fica por (UG, ANO) quando alguma delas não tiver o mês
+    chaves = ["UG", "ANO"]
+    if "MES" in df_dotacao.columns and "MES" in df_despesas.columns:
+        chaves.append("MES")
+    valores_dotacao = [coluna for coluna in VALORES_DOTACAO if coluna in df_dotacao.columns]
+
+    df_dotacao_agg = df_dotacao.groupby(chaves, as_index=False)[valores_dotacao].sum()
+    df_dotacao_agg["TEM_DOTACAO"] = True
+
+    df_despesas_agg = df_despesas.groupby(chaves, as_index=False)[VALORES_DESPESAS].sum()
+    df_despesas_agg = df_despesas_agg.rename(columns={coluna: f"{coluna}_DESPESA" for coluna in VALORES_DESPESAS})
+    df_despesas_agg["TEM_DESPESA"] = True
+
+    df_fatos = df_dotacao_agg.merge(df_despesas_agg, on=chaves, how="outer")
+    df_fatos[["TEM_DOTACAO", "TEM_DESPESA"]] = df_fatos[["TEM_DOTACAO", "TEM_DESPESA"]].fillna(False).astype(bool)
+    return df_fatos.fillna(0).sort_values(chaves).reset_index(drop=True)
+
+# Função para montar o cubo de execução por (UG, ANO), base do ranking entre todas as UGs
+def cubo_ug_ano(df_fatos):
+    valores = [coluna for coluna in VALORES_DOTACAO if coluna in df_fatos.columns]
+    return df_fatos.groupby(["UG", "ANO"], as_index=False)[valores].sum()
+
+# Função para calcular os indicadores de execução das UGs informadas (df_ugs) no período
+def ranking_ugs(cubo, anos, df_ugs, indicadores=INDICADORES_RANKING):
+    df_periodo = cubo[(cubo["ANO"] >= anos[0]) & (cubo["ANO"] <= anos[1])]
+    df_totais = df_periodo.drop(columns="ANO").groupby("UG", as_index=False).sum()
+
+    # Todas as UGs da lista aparecem no ranking, mesmo sem dados no período
+    df_ranking = df_ugs.merge(df_totais, on="UG", how="left")
+    return calcular_indicadores(df_ranking, indicadores)
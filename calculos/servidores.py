@@ -0,0 +1,54 @@
+import pandas as pd
+
+# Função para preparar a folha: uma linha por CPF (menor vínculo), com o valor de "TOTAL VANTAGENS"
+def preparar_servidores(df):
+    """
+    Normaliza Unidade (8 dígitos) e CPF (11 dígitos, sem aspas) e mantém uma linha por CPF,
+    priorizando a verba "TOTAL VANTAGENS". O valor dessa verba fica em
+    Financ_Valor_Calculado_salario_bruto.
+    """
+    df = df.assign(
+        Unidade=df['Unidade'].astype(str).str.zfill(8),
+        CPF=df['CPF'].astype(str).str.replace('"', '').str.zfill(11)
+    )
+
+    df_sorted = df.sort_values(by=['CPF', 'Financ_Verba_Desc'], ascending=[True, False])
+    df_total_vantagens = df_sorted[df_sorted['Financ_Verba_Desc'] == 'TOTAL VANTAGENS']
+    df = df_sorted.drop_duplicates(subset=['CPF'], keep='first')
+    return pd.merge(df, df_total_vantagens[['CPF', 'Financ_Valor_Calculado']], on='CPF', suffixes=('', '_salario_bruto'), how='left')
+
+# Função para contar os servidores por grau de instrução e sexo, com os graus ordenados pelo total
+def distribuicao_grau_sexo(df):
+    contagem = df.groupby(['Grau_Instrucao_Desc', 'Sexo_Desc']).size().reset_index(name='Quantidade')
+    ordem = contagem.groupby('Grau_Instrucao_Desc')['Quantidade'].sum().sort_values(ascending=False).index
+    contagem['Grau_Instrucao_Desc'] = pd.Categorical(contagem['Grau_Instrucao_Desc'], categories=ordem, ordered=True)
+    return contagem.sort_values('Grau_Instrucao_Desc')
+
+# Função para calcular a idade (em anos completos no ano de referência) a partir de Data_Nascimento (AAAAMMDD)
+def calcular_idades(df, ano_referencia=None):
+    ano_referencia = pd.Timestamp.today().year if ano_referencia is None else ano_referencia
+    nascimento = pd.to_datetime(df['Data_Nascimento'], format='%Y%m%d')
+    return nascimento, ano_referencia - nascimento.dt.year
+
+# Função para contar os servidores por idade, em ordem crescente de idade
+def contagem_por_idade(idades):
+    contagem = idades.value_counts().reset_index()
+    contagem.columns = ['Idade', 'Quantidade']
+    return contagem.sort_values(by='Idade')
+
+# Função para somar os valores por tipo de verba (linhas sem verba ou sem valor são descartadas)
+def valores_por_verba(df):
+    df = df.dropna(subset=['Financ_Verba_Desc', 'Financ_Valor_Calculado'])
+    df = df.assign(Financ_Valor_Calculado=pd.to_numeric(df['Financ_Valor_Calculado'], errors='coerce'))
+    return df.groupby('Financ_Verba_Desc')['Financ_Valor_Calculado'].sum().reset_index()
+
+# Função para calcular a média salarial por função efetiva
+def media_salarial_por_funcao(df):
+    return df.groupby('Funcao_Efetiva_Desc')['Financ_Valor_Calculado'].mean().reset_index()
+
+# Função para buscar servidores pelo nome ou pelo CPF (sem diferenciar maiúsculas e minúsculas)
+def buscar_servidores(df, termo):
+    return df[
+        df['Nome_Funcionario'].astype(str).str.contains(termo, case=False, na=False) |
+        df['CPF'].astype(str).str.contains(termo, case=False, na=False)
+    ]
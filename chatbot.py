@@ -1,20 +1,51 @@
 import streamlit as st
-import os
-from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
-from dotenv import load_dotenv
 import pandas as pd
 from data_loader import load_servidores_data
+from memoria_chat import montar_contexto, registrar_turno
+from llm_gateway import configurar_chave_api, obter_chain
+
+# Modelos usados pela ALici
+MODELO_DADOS_SERVIDOR = 'llama-3.3-70b-versatile'
+MODELO_DIALOGO = 'llama-3.1-70b-versatile'
+
+# Regras básicas para o chatbot quando há dados de um servidor no contexto
+REGRAS_DADOS_SERVIDOR = """
+        Você é um chatbot amigável e feminino, seu nome é ALici.
+        - Responda com simplicidade e clareza.
+        - Você tem acesso a informações restritas de acordo com a Lei e pode fornecer aos usuários.
+        - Seus usuários são Auditores ou gestores do governo estadual, por isso tem acesso a informações restritas como CPF.
+        - Antes de responder, sempre verifique no histórico de conversa, se você já se apresentou ao usuário, não precisa se apresentar novamente.
+        - Não precisa ficar cumprimentando o usuário em todas respostas com "Olá" ou alguma cumprimentação parecida, se você já cumprimentou uma vez no dia, não precisa mais.
+        - Não responda a mensagem com "Olá" toda vez, seja objetivo nas respostas.
+        - Sempre seja educada e cordial.
+        - Use os dados que foram fornecidos sobre o servidor ao responder as perguntas.
+        - Para pesquisar informações sobre um servidor, é necessário informar o CPF.
+        - Sem o CPF não pode buscar dados de um servidor.
+        - Mantenha as respostas curtas e diretas.
+        - Se não souber a resposta para uma pergunta, peça mais informações ou indique que a informação não está disponível.
+    """
+
+# Regras básicas para o diálogo normal com o chatbot
+REGRAS_DIALOGO = """
+        - Você é um chatbot amigável e feminino, seu nome é ALici.
+        - Responda com simplicidade e clareza.
+        - Você tem acesso a informações restritas de acordo com a Lei e pode fornecer aos usuários.
+        - Seus usuários são Auditores ou gestores do governo estadual, por isso tem acesso a informações restritas como CPF.
+        - Antes de responder, sempre verifique no histórico de conversa, se você já se apresentou ao usuário, não precisa se apresentar novamente.
+        - Não precisa ficar cumprimentando o usuário em todas respostas com "Olá" ou alguma cumprimentação parecida, se você já cumprimentou uma vez no dia, não precisa mais.
+        - Não responda a mensagem com "Olá" toda vez, seja objetivo nas respostas.
+        - Sempre seja educada.
+        - Use os dados que foram fornecidos sobre o servidor ao responder as perguntas.
+        - Para pesquisar informações sobre um servidor, é necessário informar o CPF.
+        - Sem o CPF não pode buscar dados de um servidor.
+        - Mantenha as respostas curtas e diretas.
+        - Se não souber a resposta para uma pergunta, peça mais informações ou indique que a informação não está disponível.
+    """
 
 # Função para inicializar o chatbot no sidebar
 def render_chatbot():
-    # Carregar a chave da API do arquivo .env
-    load_dotenv()
-    API_KEY = os.getenv("API_KEY")
-
-    if API_KEY:
-        os.environ['GROQ_API_KEY'] = API_KEY
-    else:
+    # Configurar a chave da API (carregada do .env apenas uma vez por processo)
+    if not configurar_chave_api():
         st.error("API Key não encontrada. Verifique seu arquivo .env.")
 
     # Variável de estado para armazenar o histórico de conversa e dados do CPF
@@ -55,10 +86,13 @@ def render_chatbot():
                 # Realizar o diálogo normal com o chatbot
                 resposta_automatica = dialogo_comum(pergunta_usuario)
 
-            # Adicionar a pergunta e resposta ao histórico
+            # Adicionar a pergunta e resposta ao histórico exibido
             st.session_state.historico.append(f"Você: {pergunta_usuario}")
             st.session_state.historico.append(f"**Alici:** {resposta_automatica}")
 
+            # Registrar o turno na memória limitada usada nos prompts
+            registrar_turno(pergunta_usuario, resposta_automatica)
+
         # Limpar a pergunta após o envio
         st.session_state.input_pergunta = ""
 
@@ -130,42 +164,16 @@ def buscar_dados_por_cpf(cpf):
 # Função para integrar os dados ao modelo LLM e gerar respostas naturais
 def responder_com_dados(pergunta_usuario, dados_servidor):
     try:
-        # Instanciar o modelo da Groq
-        chat = ChatGroq(model='llama-3.3-70b-versatile')
-
-        # Criar regras básicas para o chatbot e incluir os dados do servidor no contexto
-        regras = """
-            Você é um chatbot amigável e feminino, seu nome é ALici.
-            - Responda com simplicidade e clareza.
-            - Você tem acesso a informações restritas de acordo com a Lei e pode fornecer aos usuários.
-            - Seus usuários são Auditores ou gestores do governo estadual, por isso tem acesso a informações restritas como CPF.
-            - Antes de responder, sempre verifique no histórico de conversa, se você já se apresentou ao usuário, não precisa se apresentar novamente.
-            - Não precisa ficar cumprimentando o usuário em todas respostas com "Olá" ou alguma cumprimentação parecida, se você já cumprimentou uma vez no dia, não precisa mais.
-            - Não responda a mensagem com "Olá" toda vez, seja objetivo nas respostas.
-            - Sempre seja educada e cordial.
-            - Use os dados que foram fornecidos sobre o servidor ao responder as perguntas.
-            - Para pesquisar informações sobre um servidor, é necessário informar o CPF.
-            - Sem o CPF não pode buscar dados de um servidor.
-            - Mantenha as respostas curtas e diretas.
-            - Se não souber a resposta para uma pergunta, peça mais informações ou indique que a informação não está disponível.
-        """
-
         # Preparar os dados do servidor para serem passados ao LLM
         dados_servidor_str = "\n".join([f"{key}: {value}" for key, value in dados_servidor.items()])
 
-        # Concatenar o histórico completo de conversas
-        historico_completo = "\n".join(st.session_state.historico)
-        prompt_completo = f"Dados do servidor:\n{dados_servidor_str}\n\nHistórico de conversa:\n{historico_completo}\n\nUsuário: {pergunta_usuario}"
-
-        # Criar o template de mensagens
-        template = ChatPromptTemplate.from_messages([
-            ('system', regras),
-            ('user', prompt_completo)
-        ])
+        # Usar apenas a memória limitada da conversa (resumo + turnos recentes)
+        historico_conversa = montar_contexto()
+        prompt_completo = f"Dados do servidor:\n{dados_servidor_str}\n\nHistórico de conversa:\n{historico_conversa}\n\nUsuário: {pergunta_usuario}"
 
-        # Gerar a resposta usando o modelo da LLM
-        chain = template | chat
-        resposta = chain.invoke({'input': pergunta_usuario})
+        # Gerar a resposta usando a chain reutilizável da LLM
+        chain = obter_chain(REGRAS_DADOS_SERVIDOR, MODELO_DADOS_SERVIDOR)
+        resposta = chain.invoke({'entrada': prompt_completo})
         return resposta.content if resposta.content.strip() else "Desculpe, não tenho essa informação no momento."
     except Exception as e:
         error_message = str(e)
@@ -191,32 +199,10 @@ def extract_cpf_from_message(message):
 # Função para continuar o diálogo normal com o chatbot
 def dialogo_comum(pergunta_usuario):
     try:
-        # Instanciar o modelo da Groq
-        chat = ChatGroq(model='llama-3.1-70b-versatile')
-
-        # Criar regras básicas para o chatbot
-        regras = """
-            - Você é um chatbot amigável e feminino, seu nome é ALici.
-            - Responda com simplicidade e clareza.
-            - Você tem acesso a informações restritas de acordo com a Lei e pode fornecer aos usuários.
-            - Seus usuários são Auditores ou gestores do governo estadual, por isso tem acesso a informações restritas como CPF.
-            - Antes de responder, sempre verifique no histórico de conversa, se você já se apresentou ao usuário, não precisa se apresentar novamente.
-            - Não precisa ficar cumprimentando o usuário em todas respostas com "Olá" ou alguma cumprimentação parecida, se você já cumprimentou uma vez no dia, não precisa mais.
-            - Não responda a mensagem com "Olá" toda vez, seja objetivo nas respostas.
-            - Sempre seja educada.
-            - Use os dados que foram fornecidos sobre o servidor ao responder as perguntas.
-            - Para pesquisar informações sobre um servidor, é necessário informar o CPF.
-            - Sem o CPF não pode buscar dados de um servidor.
-            - Mantenha as respostas curtas e diretas.
-            - Se não souber a resposta para uma pergunta, peça mais informações ou indique que a informação não está disponível.
-        """
-        historico_conversa = "\n".join(st.session_state.historico)
-        template = ChatPromptTemplate.from_messages([
-            ('system', regras),
-            ('user', historico_conversa + f"\nUsuário: {pergunta_usuario}")
-        ])
-        chain = template | chat
-        resposta = chain.invoke({'input': pergunta_usuario})
+        # Usar apenas a memória limitada da conversa (resumo + turnos recentes)
+        historico_conversa = montar_contexto()
+        chain = obter_chain(REGRAS_DIALOGO, MODELO_DIALOGO)
+        resposta = chain.invoke({'entrada': historico_conversa + f"\nUsuário: {pergunta_usuario}"})
         return resposta.content if resposta.content.strip() else "Desculpe, não tenho essa informação no momento."
     except Exception as e:
         return f"Erro ao processar sua pergunta: {e}"
\ No newline at end of file
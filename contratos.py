@@ -5,6 +5,16 @@ import plotly.graph_objects as go
 import locale
 from sidebar import load_sidebar
 from data_loader import load_contracts_data
+from contratos_modelo import carregar_indice_aditivos, carregar_indice_vigencia, calcular_vencimentos
+from datetime import date
+from graficos import grafico_em_cache, versao_dataset, reduzir_categorias
+from tabela_paginada import exibir_tabela_paginada, filtrar_por_palavra
+from exportacao import exibir_exportacao
+from instrumentacao import medir, registrar_contexto
+from calculos.contratos import (
+    metricas_contratos, totais_por_categoria, totais_por_ug, valores_por_licitacao,
+    aditivos_do_contrato, aditivos_dos_contratos, filtrar_vigencia
+)
 #from chatbot import render_chatbot  # Importar a função do chatbot
 
 # Tente definir o locale para pt_BR. Se falhar, use o locale padrão do sistema
@@ -26,6 +36,36 @@ colunas_exibicao = {
     'DSC_SITUACAO': 'Situação'
 }
 
+# Colunas formatadas (calculadas no carregamento) usadas nas tabelas de contratos
+colunas_tabela_contratos = {
+    'CODIGO_CONTRATO_FORMATADO': 'CODIGO_CONTRATO',
+    'UG_FORMATADA': 'UG',
+    'NOME_CONTRATANTE': 'NOME_CONTRATANTE',
+    'NOME_CONTRATADA': 'NOME_CONTRATADA',
+    'VALOR_TOTAL_FORMATADO': 'VALOR_TOTAL',
+    'NOME_CONTRATO': 'NOME_CONTRATO',
+    'DATA_INICIO_VIGENCIA_FORMATADA': 'DATA_INICIO_VIGENCIA',
+    'DATA_FIM_VIGENCIA_FORMATADA': 'DATA_FIM_VIGENCIA',
+    'DSC_SITUACAO': 'DSC_SITUACAO'
+}
+
+# Colunas formatadas (calculadas no carregamento) usadas nas tabelas de aditivos
+colunas_tabela_aditivos = {
+    'COD_CONTRATO_FORMATADO': 'COD_CONTRATO',
+    'TIPO': 'TIPO',
+    'NUM_ORIGINAL': 'NUM_ORIGINAL',
+    'NUM_PROCESSO': 'NUM_PROCESSO',
+    'DATA_VIGENCIA_INICIAL_FORMATADA': 'DATA_VIGENCIA_INICIAL',
+    'DATA_VIGENCIA_FINAL_FORMATADA': 'DATA_VIGENCIA_FINAL',
+    'DATA_PUBLICACAO_FORMATADA': 'DATA_PUBLICACAO',
+    'VALOR_FORMATADO': 'VALOR_FORMATADO',
+    'DSC_OBJETO': 'DSC_OBJETO'
+}
+
+# Função para montar a tabela de aditivos para exibição a partir das colunas já formatadas
+def tabela_aditivos(df):
+    return df[list(colunas_tabela_aditivos)].rename(columns=colunas_tabela_aditivos).rename(columns=colunas_exibicao)
+
 # Funções para formatação
 def formatar_valor(valor):
     """Formatar o valor como moeda no padrão brasileiro."""
@@ -33,65 +73,72 @@ def formatar_valor(valor):
         return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     return 'R$ 0,00'
 
-def formatar_numero(numero):
-    """Formatar números inteiros com zeros à esquerda."""
-    return str(int(numero)).zfill(8)
-
-def formatar_data(data):
-    """Formatar data no formato DD/MM/AAAA."""
-    return pd.to_datetime(data).dt.strftime('%d/%m/%Y')
+# Função para exibir a tabela paginada de contratos (colunas formatadas ordenadas pelos valores tipados)
+def exibir_tabela_contratos(df, chave):
+    exibir_tabela_paginada(
+        df,
+        chave=chave,
+        colunas={coluna: colunas_exibicao.get(base, base) for coluna, base in colunas_tabela_contratos.items()},
+        ordenar_por={coluna: base for coluna, base in colunas_tabela_contratos.items() if coluna != base},
+        totais={'Valor total dos contratos exibidos': ('VALOR_TOTAL', formatar_valor)}
+    )
+    # A exportação usa as colunas tipadas (valores e datas continuam numéricos na planilha)
+    exibir_exportacao(df, chave, 'contratos', colunas={base: colunas_exibicao.get(base, base) for base in colunas_tabela_contratos.values()})
+
+# Função para exibir a tabela paginada de aditivos e reajustes
+def exibir_tabela_aditivos(df, chave):
+    exibir_tabela_paginada(
+        df,
+        chave=chave,
+        colunas={coluna: colunas_exibicao.get(base, base) for coluna, base in colunas_tabela_aditivos.items()},
+        ordenar_por={'COD_CONTRATO_FORMATADO': 'COD_CONTRATO', 'VALOR_FORMATADO': 'VALOR'},
+        totais={'Valor total dos Aditivos/Reajustes filtrados': ('VALOR', formatar_valor)}
+    )
+    exibir_exportacao(df, chave, 'aditivos_reajustes', colunas={
+        'COD_CONTRATO': 'COD_CONTRATO', 'TIPO': 'TIPO', 'NUM_ORIGINAL': 'NUM_ORIGINAL', 'NUM_PROCESSO': 'NUM_PROCESSO',
+        'DATA_VIGENCIA_INICIAL': 'DATA_VIGENCIA_INICIAL', 'DATA_VIGENCIA_FINAL': 'DATA_VIGENCIA_FINAL',
+        'DATA_PUBLICACAO': 'DATA_PUBLICACAO', 'VALOR': 'VALOR', 'DSC_OBJETO': 'DSC_OBJETO'
+    })
 
 def run_dashboard():
     # Carregar os datasets de contratos e aditivos usando o data_loader
-    df_aditivos, df_contratos = load_contracts_data()
+    with medir("carga dos dados"):
+        df_aditivos, df_contratos = load_contracts_data()
 
     if df_contratos.empty or df_aditivos.empty:
         st.error("Nenhum dado de contratos ou aditivos foi carregado.")
         return
 
     # Carregar o sidebar específico para contratos
-    selected_ugs, selected_ug_sigla_contratos, selected_data_inicio, selected_data_fim, selected_situacoes = load_sidebar(df_contratos, dashboard_name='Contratos')
+    with medir("sidebar"):
+        selected_ugs, selected_ug_sigla_contratos, selected_data_inicio, selected_data_fim, selected_situacoes = load_sidebar(df_contratos, dashboard_name='Contratos')
+    registrar_contexto(ugs=selected_ugs, inicio=selected_data_inicio, fim=selected_data_fim, situacoes=selected_situacoes)
+
+    # Sem datas de vigência válidas não há períodos para filtrar
+    if selected_data_inicio is None or selected_data_fim is None:
+        st.warning("Nenhum contrato possui datas de vigência válidas. Verifique as colunas DATA_INICIO_VIGENCIA e DATA_FIM_VIGENCIA do dataset.")
+        return
     
     # Chame o chatbot para renderizar no sidebar
     #render_chatbot()
 
-    # Aplicar filtros ao dataframe de contratos
-    df_contratos = df_contratos[df_contratos['UG'].isin(selected_ugs)]
-
-    # Corrigir a comparação com as datas selecionadas no slider
-    df_contratos = df_contratos[(df_contratos['DATA_INICIO_VIGENCIA'] >= pd.to_datetime(selected_data_inicio[0])) &
-                                (df_contratos['DATA_INICIO_VIGENCIA'] <= pd.to_datetime(selected_data_inicio[1]))]
-    df_contratos = df_contratos[(df_contratos['DATA_FIM_VIGENCIA'] >= pd.to_datetime(selected_data_fim[0])) &
-                                (df_contratos['DATA_FIM_VIGENCIA'] <= pd.to_datetime(selected_data_fim[1]))]
-    
-    # Aplicar filtro de situação do contrato
-    df_contratos = df_contratos[df_contratos['DSC_SITUACAO'].isin(selected_situacoes)]
-
-    # Eliminar a coluna DIAS_VENCIDOS e linhas em branco na coluna DSC_SITUACAO
-    df_contratos = df_contratos.drop(columns=['DIAS_VENCIDOS'])
-    df_contratos = df_contratos[df_contratos['DSC_SITUACAO'].notna()]
-
-    # Aplicar máscara de CPF/CNPJ na coluna CODIGO_CONTRATADA
-    df_contratos['CODIGO_CONTRATADA'] = df_contratos['CODIGO_CONTRATADA'].apply(lambda x: '{}.{}.{}-{}'.format(x[:3], x[3:6], x[6:9], x[9:]))
-
-
-    # Converter a coluna NOME_CONTRATO para maiúsculas
-    df_contratos['NOME_CONTRATO'] = df_contratos['NOME_CONTRATO'].str.upper()
+    # Chave do cache de gráficos: filtros que definem o conteúdo dos gráficos e versão dos dados
+    filtros_graficos = (selected_ugs, selected_data_inicio, selected_data_fim, selected_situacoes)
+    versao_dados = versao_dataset(df_contratos)
 
-    # Tratamento de dados
-    df_contratos['DATA_PUBLICACAO'] = pd.to_datetime(df_contratos['DATA_PUBLICACAO'], format='%d/%m/%Y', errors='coerce')
+    with medir("filtro"):
+        # Filtrar os períodos de vigência por busca binária no índice ordenado por início e fim da vigência
+        df_contratos = filtrar_vigencia(df_contratos, carregar_indice_vigencia(), selected_data_inicio, selected_data_fim)
 
-    numeric_cols = ['UG', 'CODIGO_CONTRATANTE', 'CODIGO_CONTRATADA', 'CODIGO_CONTRATO', 'COD_TIPO_LICITACAO', 'COD_SITUACAO']
-    for col in numeric_cols:
-        df_contratos[col] = pd.to_numeric(df_contratos[col], errors='coerce')
-        
-    financial_cols = ['VALOR_CONCESSAO', 'VALOR_TOTAL', 'VALOR_MULTA', 'VALOR_GARANTIA', 'VALOR_ADITIVO']
-    for col in financial_cols:
-        df_contratos[col] = df_contratos[col].apply(pd.to_numeric, errors='coerce')
+        # Aplicar filtros ao dataframe de contratos
+        df_contratos = df_contratos[df_contratos['UG'].isin(selected_ugs)]
 
-    if df_contratos['VALOR_PERCENTUAL_TERCEIR'].dtype == 'object':
-        df_contratos['VALOR_PERCENTUAL_TERCEIR'] = df_contratos['VALOR_PERCENTUAL_TERCEIR'].str.replace('%', '').astype(float) / 100
+        # Aplicar filtro de situação do contrato
+        df_contratos = df_contratos[df_contratos['DSC_SITUACAO'].isin(selected_situacoes)]
 
+        # Eliminar linhas em branco na coluna DSC_SITUACAO
+        # (tipos e colunas formatadas para exibição já vêm calculados do carregamento dos contratos)
+        df_contratos = df_contratos[df_contratos['DSC_SITUACAO'].notna()]
 
     # Adicionar métricas ao painel
     if "TODAS" in selected_ug_sigla_contratos:
@@ -108,13 +155,12 @@ def run_dashboard():
 
      
     # Dividindo em abas
-    tab1, tab2, tab3 = st.tabs(["Métricas dos Contratos", "Distribuição por Licitação", "Detalhes e Aditivos"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Métricas dos Contratos", "Distribuição por Licitação", "Detalhes e Aditivos", "Vencimentos"])
     
 
-    with tab1:
+    with tab1, medir("aba Métricas dos Contratos"):
         # Obter a quantidade de contratos e valor total
-        quantidade_contratos = len(df_contratos)
-        valor_total_contratos = df_contratos['VALOR_TOTAL'].sum()
+        quantidade_contratos, valor_total_contratos = metricas_contratos(df_contratos)
 
         # Formatar valor total para moeda
         #valor_total_formatado = locale.currency(valor_total_contratos, grouping=True)
@@ -127,170 +173,141 @@ def run_dashboard():
         col1.metric("Quantidade de Contratos", quantidade_contratos)
         col2.metric("Valor Total", valor_total_formatado)
 
-        # Gráficos
-
-        # 1. Gráfico de Barras Empilhadas
-        fig = go.Figure()
-
-        # Proporção de contratos por situação
-        df_situacao = df_contratos.groupby('DSC_SITUACAO').size().reset_index(name='quantidade')
-        fig.add_trace(go.Bar(x=df_situacao['DSC_SITUACAO'], y=df_situacao['quantidade'], name='Situação'))
-
-        # Proporção de contratos por tipo de licitação
-        df_licitacao = df_contratos.groupby('NOM_TIPO_LICITACAO').size().reset_index(name='quantidade')
-        fig.add_trace(go.Bar(x=df_licitacao['NOM_TIPO_LICITACAO'], y=df_licitacao['quantidade'], name='Tipo de Licitação'))
-
-        # Proporção de contratos por natureza
-        df_natureza = df_contratos.groupby('NATUREZA_CONTRATO').size().reset_index(name='quantidade')
-        fig.add_trace(go.Bar(x=df_natureza['NATUREZA_CONTRATO'], y=df_natureza['quantidade'], name='Natureza'))
-
-        # Proporção de contratos por contratante
-        df_contratante = df_contratos.groupby('NOME_CONTRATANTE').size().reset_index(name='quantidade')
-        fig.add_trace(go.Bar(x=df_contratante['NOME_CONTRATANTE'], y=df_contratante['quantidade'], name='Contratante'))
-
-        # 2. Gráfico de Rosca (Donut)
-
-        col3, col4 = st.columns(2)
-
-        with col3:
+        # Agregações e gráficos reaproveitados do cache quando os filtros não mudaram
+        def construir_graficos_metricas():
+            # Quantidade e valor dos contratos por situação e por tipo de licitação
+            df_situacao = totais_por_categoria(df_contratos, 'DSC_SITUACAO')
+            df_licitacao = totais_por_categoria(df_contratos, 'NOM_TIPO_LICITACAO')
 
+            # Gráficos de Rosca (Donut)
             fig_donut_situacao = px.pie(df_situacao, values='quantidade', names='DSC_SITUACAO', title='Proporção de Contratos por Situação', hole=0.4)
-            st.plotly_chart(fig_donut_situacao)
             
-        with col4:
             fig_donut_licitacao = px.pie(df_licitacao, values='quantidade', names='NOM_TIPO_LICITACAO', title='Proporção de Contratos por Tipo de Licitação', hole=0.4)
-            st.plotly_chart(fig_donut_licitacao)
         
-        # Distribuição de contratos
-        fig = go.Figure()
-
-        # Lista de categorias que queremos exibir (removendo "Contratante")
-        categorias_permitidas = ['DSC_SITUACAO', 'NOM_TIPO_LICITACAO', 'NATUREZA_CONTRATO']
-
-        # Criar os gráficos apenas para as categorias permitidas
-        if 'DSC_SITUACAO' in df_contratos.columns:
-            df_situacao = df_contratos.groupby('DSC_SITUACAO').agg(
-                quantidade=('CODIGO_CONTRATO', 'count'),
-                valor_total=('VALOR_TOTAL', 'sum')
-            ).reset_index()
-
-            # Formatar os valores para exibição no hover
-            df_situacao['valor_formatado'] = df_situacao['valor_total'].apply(formatar_valor)
-
-            fig.add_trace(go.Bar(
-                x=df_situacao['DSC_SITUACAO'],
-                y=df_situacao['quantidade'],
-                name='Situação',
-                text=df_situacao['quantidade'],  # Mantém o número de contratos visível
-                textposition="outside",  # Garante que os números apareçam fora da barra
-                hovertext=df_situacao.apply(lambda row: f"Quantidade: {row['quantidade']}<br>Valor Total: {row['valor_formatado']}", axis=1),
-                hoverinfo="text"
-            ))
+            # Distribuição de contratos
+            fig = go.Figure()
+
+            # Lista de categorias que queremos exibir (removendo "Contratante")
+            categorias_permitidas = ['DSC_SITUACAO', 'NOM_TIPO_LICITACAO', 'NATUREZA_CONTRATO']
+
+            # Criar os gráficos apenas para as categorias permitidas
+            if 'DSC_SITUACAO' in df_contratos.columns:
+                df_situacao = totais_por_categoria(df_contratos, 'DSC_SITUACAO')
+
+                # Formatar os valores para exibição no hover
+                df_situacao['valor_formatado'] = df_situacao['valor_total'].apply(formatar_valor)
+
+                fig.add_trace(go.Bar(
+                    x=df_situacao['DSC_SITUACAO'],
+                    y=df_situacao['quantidade'],
+                    name='Situação',
+                    text=df_situacao['quantidade'],  # Mantém o número de contratos visível
+                    textposition="outside",  # Garante que os números apareçam fora da barra
+                    hovertext=df_situacao.apply(lambda row: f"Quantidade: {row['quantidade']}<br>Valor Total: {row['valor_formatado']}", axis=1),
+                    hoverinfo="text"
+                ))
+
+            if 'NOM_TIPO_LICITACAO' in df_contratos.columns:
+                df_licitacao = totais_por_categoria(df_contratos, 'NOM_TIPO_LICITACAO')
+
+                df_licitacao['valor_formatado'] = df_licitacao['valor_total'].apply(formatar_valor)
+
+                fig.add_trace(go.Bar(
+                    x=df_licitacao['NOM_TIPO_LICITACAO'],
+                    y=df_licitacao['quantidade'],
+                    name='Tipo de Licitação',
+                    text=df_licitacao['quantidade'],
+                    textposition="outside",
+                    hovertext=df_licitacao.apply(lambda row: f"Quantidade: {row['quantidade']}<br>Valor Total: {row['valor_formatado']}", axis=1),
+                    hoverinfo="text"
+                ))
+
+            if 'NATUREZA_CONTRATO' in df_contratos.columns:
+                df_natureza = totais_por_categoria(df_contratos, 'NATUREZA_CONTRATO')
+
+                df_natureza['valor_formatado'] = df_natureza['valor_total'].apply(formatar_valor)
+
+                fig.add_trace(go.Bar(
+                    x=df_natureza['NATUREZA_CONTRATO'],
+                    y=df_natureza['quantidade'],
+                    name='Natureza',
+                    text=df_natureza['quantidade'],
+                    textposition="outside",
+                    hovertext=df_natureza.apply(lambda row: f"Quantidade: {row['quantidade']}<br>Valor Total: {row['valor_formatado']}", axis=1),
+                    hoverinfo="text"
+                ))
+
+            # Atualizar layout
+            fig.update_layout(
+                barmode='stack',
+                title='Distribuição de Contratos',
+                xaxis_title='Categoria',
+                yaxis_title='Contagem'
+            )
 
-        if 'NOM_TIPO_LICITACAO' in df_contratos.columns:
-            df_licitacao = df_contratos.groupby('NOM_TIPO_LICITACAO').agg(
-                quantidade=('CODIGO_CONTRATO', 'count'),
-                valor_total=('VALOR_TOTAL', 'sum')
-            ).reset_index()
-
-            df_licitacao['valor_formatado'] = df_licitacao['valor_total'].apply(formatar_valor)
-
-            fig.add_trace(go.Bar(
-                x=df_licitacao['NOM_TIPO_LICITACAO'],
-                y=df_licitacao['quantidade'],
-                name='Tipo de Licitação',
-                text=df_licitacao['quantidade'],
-                textposition="outside",
-                hovertext=df_licitacao.apply(lambda row: f"Quantidade: {row['quantidade']}<br>Valor Total: {row['valor_formatado']}", axis=1),
-                hoverinfo="text"
-            ))
+            # Calcular a quantidade de contratos e valor total por UG (apenas UGs com contratos), com a sigla de cada UG
+            df_ug_contratos = totais_por_ug(df_contratos, pd.read_csv("./database/UGS-COD-NOME-SIGLA.csv"))
 
-        if 'NATUREZA_CONTRATO' in df_contratos.columns:
-            df_natureza = df_contratos.groupby('NATUREZA_CONTRATO').agg(
-                quantidade=('CODIGO_CONTRATO', 'count'),
-                valor_total=('VALOR_TOTAL', 'sum')
-            ).reset_index()
-
-            df_natureza['valor_formatado'] = df_natureza['valor_total'].apply(formatar_valor)
-
-            fig.add_trace(go.Bar(
-                x=df_natureza['NATUREZA_CONTRATO'],
-                y=df_natureza['quantidade'],
-                name='Natureza',
-                text=df_natureza['quantidade'],
-                textposition="outside",
-                hovertext=df_natureza.apply(lambda row: f"Quantidade: {row['quantidade']}<br>Valor Total: {row['valor_formatado']}", axis=1),
-                hoverinfo="text"
-            ))
+            # Manter as UGs com mais contratos e somar as demais em "Outros"
+            df_ug_contratos = reduzir_categorias(df_ug_contratos, 'SIGLA_UG', 'quantidade', somar=['quantidade', 'valor_total'])
 
-        # Atualizar layout
-        fig.update_layout(
-            barmode='stack',
-            title='Distribuição de Contratos',
-            xaxis_title='Categoria',
-            yaxis_title='Contagem'
-        )
+            # Inverter a ordem para exibir a maior UG no topo e "Outros" na base do gráfico
+            df_ug_contratos = df_ug_contratos.iloc[::-1].reset_index(drop=True)
 
-        # Exibir o gráfico no Streamlit
-        st.plotly_chart(fig, use_container_width=True)
+            # Formatar valores para exibição
+            df_ug_contratos['valor_formatado'] = df_ug_contratos['valor_total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+            df_ug_contratos['label'] = df_ug_contratos.apply(lambda row: f"Quantidade: {row['quantidade']} | Valor: {row['valor_formatado']}", axis=1)
 
-        # Calcular a quantidade de contratos e valor total por UG
-        df_ug_contratos = df_contratos.groupby('UG').agg(
-            quantidade=('CODIGO_CONTRATO', 'count'),
-            valor_total=('VALOR_TOTAL', 'sum')
-        ).reset_index()
+            # Definir altura dinâmica do gráfico (mínimo de 400, máximo de 1200)
+            altura_minima_por_barra = 30  # Mantém um tamanho mínimo adequado para cada barra
+            altura_base = 400  # Altura mínima do gráfico
+            altura_maxima = 2400  # Altura máxima do gráfico
 
-        # Filtrar apenas UGs com pelo menos 1 contrato
-        df_ug_contratos = df_ug_contratos[df_ug_contratos['quantidade'] > 0]
+            altura_grafico = max(altura_base, min(altura_maxima, len(df_ug_contratos) * altura_minima_por_barra))
 
-        # Mapear a sigla da UG usando o dataset original
-        df_ug_info = pd.read_csv("./database/UGS-COD-NOME-SIGLA.csv")
-        df_ug_contratos = df_ug_contratos.merge(df_ug_info[['UG', 'SIGLA_UG']], on='UG', how='left')
-
-        # Ordenar os valores por quantidade de contratos
-        df_ug_contratos = df_ug_contratos.sort_values(by='quantidade', ascending=True)
-
-        # Formatar valores para exibição
-        df_ug_contratos['valor_formatado'] = df_ug_contratos['valor_total'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-        df_ug_contratos['label'] = df_ug_contratos.apply(lambda row: f"Quantidade: {row['quantidade']} | Valor: {row['valor_formatado']}", axis=1)
-
-        # Definir altura dinâmica do gráfico (mínimo de 400, máximo de 1200)
-        altura_minima_por_barra = 30  # Mantém um tamanho mínimo adequado para cada barra
-        altura_base = 400  # Altura mínima do gráfico
-        altura_maxima = 2400  # Altura máxima do gráfico
-
-        altura_grafico = max(altura_base, min(altura_maxima, len(df_ug_contratos) * altura_minima_por_barra))
-
-        # Criar gráfico de barras horizontais garantindo que os rótulos fiquem visíveis corretamente
-        fig_ug_contratos = go.Figure(go.Bar(
-            y=df_ug_contratos['SIGLA_UG'],  # Sigla da UG no eixo Y
-            x=df_ug_contratos['quantidade'],  # Quantidade de contratos no eixo X
-            orientation='h',  # Barras horizontais
-            marker=dict(color='#095aa2'),  # Cor das barras
-            text=df_ug_contratos['label'],  # Texto dentro das barras
-            textposition='auto',  # Deixa o Plotly decidir se coloca dentro ou fora conforme o espaço
-            insidetextfont=dict(size=12),  # Define o tamanho mínimo da fonte dentro da barra
-            outsidetextfont=dict(size=12)  # Mantém o tamanho da fonte fora da barra se necessário
-        ))
+            # Criar gráfico de barras horizontais garantindo que os rótulos fiquem visíveis corretamente
+            fig_ug_contratos = go.Figure(go.Bar(
+                y=df_ug_contratos['SIGLA_UG'],  # Sigla da UG no eixo Y
+                x=df_ug_contratos['quantidade'],  # Quantidade de contratos no eixo X
+                orientation='h',  # Barras horizontais
+                marker=dict(color='#095aa2'),  # Cor das barras
+                text=df_ug_contratos['label'],  # Texto dentro das barras
+                textposition='auto',  # Deixa o Plotly decidir se coloca dentro ou fora conforme o espaço
+                insidetextfont=dict(size=12),  # Define o tamanho mínimo da fonte dentro da barra
+                outsidetextfont=dict(size=12)  # Mantém o tamanho da fonte fora da barra se necessário
+            ))
 
-        fig_ug_contratos.update_layout(
-            title="Quantidade de Contratos por UG",
-            xaxis_title="Quantidade de Contratos",
-            yaxis_title="UG (Sigla)",
-            height=altura_grafico,  # Define altura dinâmica
-            yaxis=dict(
-                tickfont=dict(size=12),  # Mantém a fonte das siglas no eixo Y legível
+            fig_ug_contratos.update_layout(
+                title="Quantidade de Contratos por UG",
+                xaxis_title="Quantidade de Contratos",
+                yaxis_title="UG (Sigla)",
+                height=altura_grafico,  # Define altura dinâmica
+                yaxis=dict(
+                    tickfont=dict(size=12),  # Mantém a fonte das siglas no eixo Y legível
+                )
             )
+
+            return fig_donut_situacao, fig_donut_licitacao, fig, fig_ug_contratos
+
+        fig_donut_situacao, fig_donut_licitacao, fig, fig_ug_contratos = grafico_em_cache(
+            'contratos', 'metricas', filtros_graficos, versao_dados, construir_graficos_metricas
         )
 
-        # Exibir o gráfico no Streamlit
+        col3, col4 = st.columns(2)
+        with col3:
+            st.plotly_chart(fig_donut_situacao)
+        with col4:
+            st.plotly_chart(fig_donut_licitacao)
+
+        # Exibir os gráficos no Streamlit
+        st.plotly_chart(fig, use_container_width=True)
         st.plotly_chart(fig_ug_contratos, use_container_width=True)
 
 
     # Aplicar as funções nas abas
-    with tab2:
+    with tab2, medir("aba Distribuição por Licitação"):
         # Agrupamento e formatação para o gráfico
-        df_valores_licitacao = df_contratos.groupby('NOM_TIPO_LICITACAO')['VALOR_TOTAL'].sum().reset_index()
+        df_valores_licitacao = valores_por_licitacao(df_contratos)
         df_valores_licitacao['VALOR_FORMATADO'] = df_valores_licitacao['VALOR_TOTAL'].apply(formatar_valor)
 
         fig_valores_licitacao = go.Figure(go.Bar(
@@ -320,60 +337,91 @@ def run_dashboard():
         # Exibir tabela se pelo menos um tipo de licitação for selecionado
         if selected_licitacoes:
             # Filtrar o DataFrame para os tipos de licitação selecionados
-            filtered_table = df_contratos[df_contratos['NOM_TIPO_LICITACAO'].isin(selected_licitacoes)].copy()
-
-            # Aplicar formatações
-            filtered_table['VALOR_TOTAL'] = filtered_table['VALOR_TOTAL'].apply(formatar_valor)
-            filtered_table['CODIGO_CONTRATO'] = filtered_table['CODIGO_CONTRATO'].apply(formatar_numero)
-            filtered_table['UG'] = filtered_table['UG'].apply(formatar_numero)
-            filtered_table['DATA_INICIO_VIGENCIA'] = formatar_data(filtered_table['DATA_INICIO_VIGENCIA'])
-            filtered_table['DATA_FIM_VIGENCIA'] = formatar_data(filtered_table['DATA_FIM_VIGENCIA'])
+            filtered_table = df_contratos[df_contratos['NOM_TIPO_LICITACAO'].isin(selected_licitacoes)]
 
             # Exibir tabela de contratos filtrados com títulos renomeados
             st.header('Contratos por Tipo de Licitação Selecionado')
-            st.write(
-                filtered_table[['CODIGO_CONTRATO', 'UG', 'NOME_CONTRATANTE', 'NOME_CONTRATADA', 'VALOR_TOTAL', 
-                                'NOME_CONTRATO', 'DATA_INICIO_VIGENCIA', 'DATA_FIM_VIGENCIA', 'DSC_SITUACAO']]
-                .rename(columns=colunas_exibicao).reset_index(drop=True)
-            )
+            exibir_tabela_contratos(filtered_table, 'contratos_licitacao')
 
-            st.write(f"Total de contratos exibidos: {len(filtered_table)}")
-
-            # Calcular e exibir o valor total dos contratos filtrados
-            total_valor_contratos = filtered_table['VALOR_TOTAL'].str.replace('R$ ', '').str.replace('.', '').str.replace(',', '.').astype(float).sum()
-            st.write(f"Valor total dos contratos exibidos: {formatar_valor(total_valor_contratos)}")
-
-
-    with tab3:
-        # Aplicar formatações de valores, números e datas na aba de visualização completa de contratos
-        df_contratos['VALOR_TOTAL'] = df_contratos['VALOR_TOTAL'].apply(formatar_valor)
-        df_contratos['CODIGO_CONTRATO'] = df_contratos['CODIGO_CONTRATO'].apply(formatar_numero)
-        df_contratos['UG'] = df_contratos['UG'].apply(formatar_numero)
-        df_contratos['DATA_INICIO_VIGENCIA'] = formatar_data(df_contratos['DATA_INICIO_VIGENCIA'])
-        df_contratos['DATA_FIM_VIGENCIA'] = formatar_data(df_contratos['DATA_FIM_VIGENCIA'])
 
+    with tab3, medir("aba Detalhes e Aditivos"):
         st.subheader('Contratos da Unidade Gestora')
         keyword = st.text_input('Digite uma palavra-chave para filtrar os contratos:')
 
         if keyword:
-            df_contratos = df_contratos[df_contratos.apply(lambda row: row.astype(str).str.contains(keyword, case=False).any(), axis=1)]
+            df_contratos = filtrar_por_palavra(df_contratos, keyword)
 
-        # Exibir DataFrame com títulos renomeados
-        st.write(df_contratos[['CODIGO_CONTRATO', 'UG', 'NOME_CONTRATANTE', 'NOME_CONTRATADA', 'VALOR_TOTAL', 'NOME_CONTRATO', 'DATA_INICIO_VIGENCIA', 'DATA_FIM_VIGENCIA', 'DSC_SITUACAO']].rename(columns=colunas_exibicao))
+        # Exibir a tabela paginada com títulos renomeados
+        exibir_tabela_contratos(df_contratos, 'contratos_ug')
 
         if df_aditivos is not None:
-            df_aditivos_filtrados = df_aditivos[df_aditivos['COD_CONTRATO'].isin(df_contratos['CODIGO_CONTRATO'].astype(int))].copy()
-            df_aditivos_filtrados['VALOR_FORMATADO'] = df_aditivos_filtrados['VALOR'].apply(formatar_valor)
-            df_aditivos_filtrados['COD_CONTRATO'] = df_aditivos_filtrados['COD_CONTRATO'].apply(formatar_numero)
-            df_aditivos_filtrados['DATA_VIGENCIA_INICIAL'] = formatar_data(df_aditivos_filtrados['DATA_VIGENCIA_INICIAL'])
-            df_aditivos_filtrados['DATA_VIGENCIA_FINAL'] = formatar_data(df_aditivos_filtrados['DATA_VIGENCIA_FINAL'])
-            df_aditivos_filtrados['DATA_PUBLICACAO'] = formatar_data(df_aditivos_filtrados['DATA_PUBLICACAO'])
+            # Buscar os aditivos dos contratos exibidos no índice por código do contrato
+            df_aditivos_indexados, indice_aditivos, resumo_aditivos = carregar_indice_aditivos()
+            df_aditivos_filtrados = aditivos_dos_contratos(df_aditivos_indexados, indice_aditivos, df_contratos['CODIGO_CONTRATO'])
 
             st.subheader('Aditivos e Reajustes dos Contratos Exibidos')
-            st.write(df_aditivos_filtrados[['COD_CONTRATO', 'TIPO', 'NUM_ORIGINAL', 'NUM_PROCESSO', 'DATA_VIGENCIA_INICIAL', 'DATA_VIGENCIA_FINAL', 'DATA_PUBLICACAO', 'VALOR_FORMATADO', 'DSC_OBJETO']].rename(columns=colunas_exibicao))
+            exibir_tabela_aditivos(df_aditivos_filtrados, 'contratos_aditivos')
+
+            # Histórico de um contrato específico (consulta direta no índice e no resumo pré-calculado)
+            contratos_com_aditivos = df_contratos[df_contratos['CODIGO_CONTRATO'].isin(resumo_aditivos.index)]
+            if not contratos_com_aditivos.empty:
+                st.subheader('Histórico de Aditivos de um Contrato')
+                opcoes_contratos = dict(zip(
+                    contratos_com_aditivos['CODIGO_CONTRATO_FORMATADO'] + ' - ' + contratos_com_aditivos['NOME_CONTRATADA'].fillna(''),
+                    contratos_com_aditivos['CODIGO_CONTRATO']
+                ))
+                contrato_selecionado = st.selectbox(
+                    'Selecione o contrato:',
+                    options=list(opcoes_contratos.keys()),
+                    index=None,
+                    placeholder="Escolha uma opção"
+                )
+
+                if contrato_selecionado:
+                    codigo = int(opcoes_contratos[contrato_selecionado])
+                    resumo = resumo_aditivos.loc[codigo]
+
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Quantidade de Aditivos", int(resumo['QTD_ADITIVOS']))
+                    col2.metric("Valor Acrescido", formatar_valor(resumo['VALOR_ADITIVOS']))
+                    col3.metric(
+                        "Acréscimo sobre o Valor Original",
+                        f"{resumo['PERCENTUAL_ADITIVOS']:.2f}%".replace(".", ",") if pd.notnull(resumo['PERCENTUAL_ADITIVOS']) else "-"
+                    )
+
+                    st.write(tabela_aditivos(aditivos_do_contrato(df_aditivos_indexados, indice_aditivos, codigo)).reset_index(drop=True))
+
+    with tab4, medir("aba Vencimentos"):
+        st.subheader('Monitoramento de Vencimentos de Todos os Órgãos')
+        st.caption('Quantidade de contratos por data de fim da vigência, independente dos filtros do sidebar. As faixas "a vencer" são acumuladas.')
+
+        # Faixas de vencimento por UG, calculadas uma vez por dia a partir do índice de vigência
+        df_vencimentos = calcular_vencimentos(date.today())
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Vencidos", int(df_vencimentos['VENCIDOS'].sum()))
+        col2.metric("Vencem em até 30 dias", int(df_vencimentos['VENCE_30_DIAS'].sum()))
+        col3.metric("Vencem em até 60 dias", int(df_vencimentos['VENCE_60_DIAS'].sum()))
+        col4.metric("Vencem em até 90 dias", int(df_vencimentos['VENCE_90_DIAS'].sum()))
 
-            valor_total_aditivos = df_aditivos_filtrados['VALOR'].sum()
-            st.markdown(f"**Valor total dos Aditivos/Reajustes filtrados: {formatar_valor(valor_total_aditivos)}**")
+        # Mapear a sigla da UG usando o dataset original
+        df_ug_info = pd.read_csv("./database/UGS-COD-NOME-SIGLA.csv")
+        df_vencimentos = df_vencimentos.merge(df_ug_info[['UG', 'SIGLA_UG', 'DESCRICAO_UG']], on='UG', how='left')
+        df_vencimentos = df_vencimentos.sort_values(by=['VENCE_30_DIAS', 'VENCE_60_DIAS', 'VENCE_90_DIAS'], ascending=False)
+
+        st.dataframe(
+            df_vencimentos[['UG', 'SIGLA_UG', 'DESCRICAO_UG', 'VENCE_30_DIAS', 'VENCE_60_DIAS', 'VENCE_90_DIAS', 'VENCIDOS']].rename(columns={
+                'UG': 'Unidade Gestora',
+                'SIGLA_UG': 'Sigla',
+                'DESCRICAO_UG': 'Descrição da UG',
+                'VENCE_30_DIAS': 'Vencem em até 30 dias',
+                'VENCE_60_DIAS': 'Vencem em até 60 dias',
+                'VENCE_90_DIAS': 'Vencem em até 90 dias',
+                'VENCIDOS': 'Vencidos'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
 
 
 if __name__ == "__main__":
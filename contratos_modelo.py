@@ -0,0 +1,32 @@
+import streamlit as st
+from data_loader import load_contracts_data
+from cache_datasets import registrar_dependente, contabilizar_derivado
+from calculos.contratos import indexar_aditivos, indexar_vigencia, contar_vencimentos
+
+# Função para obter os aditivos indexados por código do contrato, com o resumo de cada contrato
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('contratos')
+def carregar_indice_aditivos():
+    """Retorna (df_aditivos, indice, resumo), como em calculos.contratos.indexar_aditivos."""
+    df_aditivos, df_contratos = load_contracts_data()
+    return indexar_aditivos(df_aditivos, df_contratos)
+
+# Função para obter os contratos ordenados por início e por fim da vigência (índice para buscas binárias)
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('contratos')
+def carregar_indice_vigencia():
+    """Retorna {coluna: (ordem, datas)}, como em calculos.contratos.indexar_vigencia."""
+    _, df_contratos = load_contracts_data()
+    return indexar_vigencia(df_contratos)
+
+# Função para contar, por UG, os contratos vencidos e a vencer (calculada uma vez por dia)
+@st.cache_resource(show_spinner=False, max_entries=2)
+@contabilizar_derivado('contratos', entradas=2)
+def calcular_vencimentos(data_referencia):
+    _, df_contratos = load_contracts_data()
+    return contar_vencimentos(df_contratos, carregar_indice_vigencia(), data_referencia)
+
+# Índices calculados sobre as linhas do dataset: liberados quando o dataset for descartado da memória
+registrar_dependente('contratos', carregar_indice_aditivos.clear)
+registrar_dependente('contratos', carregar_indice_vigencia.clear)
+registrar_dependente('contratos', calcular_vencimentos.clear)
@@ -3,9 +3,15 @@ import pandas as pd
 import pyarrow.parquet as pq
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from io import BytesIO
 import json
+import threading
+import time
 import toml
+import metricas
+from cache_datasets import obter_dataset
 
 # Carregar configurações do arquivo TOML
 #config = toml.load('secrets.toml')
@@ -20,6 +26,43 @@ FOLDER_ID = config['FOLDER_ID']
 # ID da pasta do Google Drive onde estão os dados "contratos"
 CONTRATOS_FOLDER_ID = config['CONTRATOS_FOLDER_ID']
 
+# Partições (arquivos por ano) de despesas já baixadas enquanto o carregamento completo não termina
+_particoes_lock = threading.Lock()
+_particoes_despesas = {}
+_total_particoes_despesas = 0
+_despesas_parciais = (0, None)
+
+# Barra de progresso que não exibe nada, usada quando não há uma sessão do usuário
+# (por exemplo, durante o aquecimento dos dados em segundo plano)
+class BarraProgressoSilenciosa:
+    def progress(self, valor):
+        pass
+
+# Função para criar a barra de progresso apenas quando houver uma sessão do usuário ativa
+def criar_barra_progresso():
+    if get_script_run_ctx() is None:
+        return BarraProgressoSilenciosa()
+    return st.progress(0)
+
+# Requisição da API do Google Drive que registra chamadas, falhas, latência e bytes baixados nas métricas
+class RequisicaoDriveMedida(HttpRequest):
+    def execute(self, *args, **kwargs):
+        metodo = self.methodId or "desconhecido"
+        metricas.incrementar("painelgestor_drive_chamadas_total", metodo=metodo)
+        inicio = time.perf_counter()
+        try:
+            resposta = super().execute(*args, **kwargs)
+        except Exception:
+            metricas.incrementar("painelgestor_drive_erros_total", metodo=metodo)
+            raise
+        finally:
+            metricas.observar("painelgestor_drive_latencia_segundos", time.perf_counter() - inicio, metodo=metodo)
+
+        # Downloads (get_media) retornam o conteúdo do arquivo em bytes
+        if isinstance(resposta, bytes):
+            metricas.incrementar("painelgestor_drive_bytes_baixados_total", len(resposta))
+        return resposta
+
 # Função para autenticar e construir o serviço Google Drive API
 def get_drive_service():
     # Carregar o JSON como um dicionário do .env
@@ -31,7 +74,7 @@ def get_drive_service():
         scopes=['https://www.googleapis.com/auth/drive']
     )
 
-    return build('drive', 'v3', credentials=credentials)
+    return build('drive', 'v3', credentials=credentials, requestBuilder=RequisicaoDriveMedida)
 
 # ========== Login CSV Data Loader ==========
 # Função para listar arquivos .csv na pasta de login no Google Drive
@@ -80,6 +123,7 @@ def list_parquet_files(service):
         ).execute()
         for file in year_files.get('files', []):
             if file['name'].endswith('.parquet'):
+                file['ano'] = folder['name']  # Guardar o ano (nome da pasta) de cada arquivo
                 parquet_files.append(file)
 
     return parquet_files
@@ -105,8 +149,12 @@ def download_file_from_drive(service, file_id):
     return BytesIO(response)
 
 # Função para carregar arquivos de despesas e diárias, com cache
-@st.cache_resource
 def load_parquet_data_from_drive():
+    return obter_dataset('despesas', _baixar_despesas)
+
+# Função para baixar e preparar os dados de despesas e diárias do Google Drive (chamada pelo cache de datasets)
+@metricas.medir_carga('despesas')
+def _baixar_despesas():
     service = get_drive_service()
     parquet_files = list_parquet_files(service)
 
@@ -114,21 +162,68 @@ def load_parquet_data_from_drive():
         st.error('Nenhum arquivo .parquet encontrado no Google Drive.')
         return pd.DataFrame()
 
+    # Carregar primeiro os anos mais recentes, para que as páginas possam exibir dados parciais
+    parquet_files = sorted(parquet_files, key=lambda file: file.get('ano', ''), reverse=True)
+
     # Carregar todos os arquivos .parquet e concatenar
     data_frames = []
     total_files = len(parquet_files)
+    _iniciar_particoes_despesas(total_files)
 
     # Inicializar a barra de progresso
-    progress_bar = st.progress(0)
+    progress_bar = criar_barra_progresso()
     for idx, file in enumerate(parquet_files):
         file_content = download_file_from_drive(service, file['id'])
-        data_frames.append(pq.read_table(file_content).to_pandas())
+        df_particao = pq.read_table(file_content).to_pandas()
+        data_frames.append(df_particao)
+        _registrar_particao_despesas(file['id'], df_particao)
 
         # Atualizar a barra de progresso
         progress_percentage = (idx + 1) / total_files
         progress_bar.progress(progress_percentage)
 
-    return pd.concat(data_frames, ignore_index=True)
+    data = pd.concat(data_frames, ignore_index=True)
+
+    # Com o dataset completo em cache, as partições avulsas não são mais necessárias
+    _iniciar_particoes_despesas(0)
+
+    return data
+
+# Função para reiniciar o registro de partições de despesas
+def _iniciar_particoes_despesas(total):
+    global _total_particoes_despesas, _despesas_parciais
+    with _particoes_lock:
+        _particoes_despesas.clear()
+        _total_particoes_despesas = total
+        _despesas_parciais = (0, None)
+
+# Função para registrar uma partição de despesas assim que ela termina de ser baixada
+def _registrar_particao_despesas(file_id, df_particao):
+    with _particoes_lock:
+        _particoes_despesas[file_id] = df_particao
+
+# Função para obter as despesas já baixadas enquanto o carregamento completo está em andamento
+def load_data_parcial():
+    """
+    Retorna (df, carregadas, total): o DataFrame com as partições já baixadas (ou None,
+    se nenhuma estiver disponível), a quantidade de partições carregadas e o total esperado.
+    """
+    global _despesas_parciais
+    with _particoes_lock:
+        particoes = list(_particoes_despesas.values())
+        total = _total_particoes_despesas
+        carregadas, df_parcial = _despesas_parciais
+
+    if not particoes:
+        return None, 0, total
+
+    # Concatenar novamente apenas quando uma nova partição tiver chegado
+    if carregadas != len(particoes):
+        df_parcial = pd.concat(particoes, ignore_index=True)
+        with _particoes_lock:
+            _despesas_parciais = (len(particoes), df_parcial)
+
+    return df_parcial, len(particoes), total
 
 # Função principal para carregar os dados de despesas e diárias
 def load_data():
@@ -144,9 +239,74 @@ def load_data():
 
     return data
 
-# Função para carregar arquivos de contratos (sem alterações)
-@st.cache_resource
+# Função para formatar códigos numéricos com zeros à esquerda (8 dígitos)
+def _formatar_codigo(serie):
+    numeros = pd.to_numeric(serie, errors='coerce').astype('Int64')
+    return numeros.astype(str).str.zfill(8).where(numeros.notna(), '')
+
+# Função para formatar valores como moeda no padrão brasileiro
+def _formatar_moeda(serie):
+    return serie.apply(lambda valor: f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(valor) else 'R$ 0,00')
+
+# Função para formatar datas no formato DD/MM/AAAA
+def _formatar_data(serie):
+    return pd.to_datetime(serie, errors='coerce').dt.strftime('%d/%m/%Y')
+
+# Função para preparar a lista de contratos: tipos e colunas de exibição calculados uma única vez
+def _preparar_contratos(df_contratos):
+    # Conversão de timestamps (em milissegundos) para datetime
+    for col in ['DATA_INICIO_VIGENCIA', 'DATA_FIM_VIGENCIA']:
+        if not pd.api.types.is_datetime64_any_dtype(df_contratos[col]):
+            df_contratos[col] = pd.to_datetime(df_contratos[col], unit='ms')
+
+    # Eliminar a coluna DIAS_VENCIDOS (não utilizada no painel)
+    df_contratos = df_contratos.drop(columns=['DIAS_VENCIDOS'], errors='ignore')
+
+    # Aplicar máscara de CPF/CNPJ na coluna CODIGO_CONTRATADA
+    contratada = df_contratos['CODIGO_CONTRATADA'].astype('string')
+    df_contratos['CODIGO_CONTRATADA'] = contratada.str[:3] + '.' + contratada.str[3:6] + '.' + contratada.str[6:9] + '-' + contratada.str[9:]
+
+    # Converter a coluna NOME_CONTRATO para maiúsculas
+    df_contratos['NOME_CONTRATO'] = df_contratos['NOME_CONTRATO'].str.upper()
+
+    df_contratos['DATA_PUBLICACAO'] = pd.to_datetime(df_contratos['DATA_PUBLICACAO'], format='%d/%m/%Y', errors='coerce')
+
+    numeric_cols = ['UG', 'CODIGO_CONTRATANTE', 'CODIGO_CONTRATO', 'COD_TIPO_LICITACAO', 'COD_SITUACAO']
+    financial_cols = ['VALOR_CONCESSAO', 'VALOR_TOTAL', 'VALOR_MULTA', 'VALOR_GARANTIA', 'VALOR_ADITIVO']
+    for col in numeric_cols + financial_cols:
+        df_contratos[col] = pd.to_numeric(df_contratos[col], errors='coerce')
+
+    if df_contratos['VALOR_PERCENTUAL_TERCEIR'].dtype == 'object':
+        df_contratos['VALOR_PERCENTUAL_TERCEIR'] = df_contratos['VALOR_PERCENTUAL_TERCEIR'].str.replace('%', '').astype(float) / 100
+
+    # Colunas formatadas para exibição nas tabelas
+    df_contratos['VALOR_TOTAL_FORMATADO'] = _formatar_moeda(df_contratos['VALOR_TOTAL'])
+    df_contratos['CODIGO_CONTRATO_FORMATADO'] = _formatar_codigo(df_contratos['CODIGO_CONTRATO'])
+    df_contratos['UG_FORMATADA'] = _formatar_codigo(df_contratos['UG'])
+    df_contratos['DATA_INICIO_VIGENCIA_FORMATADA'] = _formatar_data(df_contratos['DATA_INICIO_VIGENCIA'])
+    df_contratos['DATA_FIM_VIGENCIA_FORMATADA'] = _formatar_data(df_contratos['DATA_FIM_VIGENCIA'])
+
+    return df_contratos
+
+# Função para preparar os aditivos e reajustes: tipos e colunas de exibição calculados uma única vez
+def _preparar_aditivos(df_aditivos):
+    df_aditivos['COD_CONTRATO'] = pd.to_numeric(df_aditivos['COD_CONTRATO'], errors='coerce')
+    df_aditivos['VALOR'] = pd.to_numeric(df_aditivos['VALOR'], errors='coerce')
+
+    df_aditivos['VALOR_FORMATADO'] = _formatar_moeda(df_aditivos['VALOR'])
+    df_aditivos['COD_CONTRATO_FORMATADO'] = _formatar_codigo(df_aditivos['COD_CONTRATO'])
+    for col in ['DATA_VIGENCIA_INICIAL', 'DATA_VIGENCIA_FINAL', 'DATA_PUBLICACAO']:
+        df_aditivos[f'{col}_FORMATADA'] = _formatar_data(df_aditivos[col])
+
+    return df_aditivos
+
+# Função para carregar arquivos de contratos (com colunas tipadas e de exibição já calculadas)
 def load_contracts_data():
+    return obter_dataset('contratos', _baixar_contratos)
+
+# Função para baixar e preparar os dados de contratos e aditivos do Google Drive (chamada pelo cache de datasets)
+@metricas.medir_carga('contratos')
+def _baixar_contratos():
     service = get_drive_service()
     contract_files = list_contracts_files(service)
 
@@ -163,7 +323,7 @@ def load_contracts_data():
         return pd.DataFrame(), pd.DataFrame()
     
     # Inicializar a barra de progresso
-    progress_bar = st.progress(0)
+    progress_bar = criar_barra_progresso()
     total_files = 2  # Apenas dois arquivos, aditivos e contratos
 
     # Baixar os arquivos e carregar como DataFrames
@@ -175,11 +335,15 @@ def load_contracts_data():
     df_contratos = pq.read_table(contratos_content).to_pandas()
     progress_bar.progress(2 / total_files)
 
-    return df_aditivos, df_contratos
+    return _preparar_aditivos(df_aditivos), _preparar_contratos(df_contratos)
 
 # Função para carregar o arquivo de servidores (folha de pagamento) do Google Drive
-@st.cache_resource
 def load_servidores_data():
+    return obter_dataset('servidores', _baixar_servidores)
+
+# Função para baixar e preparar os dados de servidores (folha de pagamento) do Google Drive (chamada pelo cache de datasets)
+@metricas.medir_carga('servidores')
+def _baixar_servidores():
     service = get_drive_service()
 
     # Carregar o ID da pasta do arquivo de folha a partir do .env
@@ -209,7 +373,7 @@ def load_servidores_data():
         return pd.DataFrame()
     
     # Inicializar a barra de progresso
-    progress_bar = st.progress(0)
+    progress_bar = criar_barra_progresso()
 
     # Baixar o arquivo e carregar como DataFrame
     folha_content = download_file_from_drive(service, folha_file['id'])
@@ -245,8 +409,12 @@ def list_dotacao_files(service):
     return dotacao_files
 
 # Função para carregar arquivos de dotação do Google Drive
-@st.cache_resource
 def load_dotacao_data():
+    return obter_dataset('dotacao', _baixar_dotacao)
+
+# Função para baixar e preparar os dados de dotação orçamentária do Google Drive (chamada pelo cache de datasets)
+@metricas.medir_carga('dotacao')
+def _baixar_dotacao():
     service = get_drive_service()
     dotacao_files = list_dotacao_files(service)
     
@@ -296,8 +464,12 @@ def list_restos_files(service):
     return restos_files
 
 # Função para carregar arquivos de restos a pagar do Google Drive
-@st.cache_resource
 def load_restos_data():
+    return obter_dataset('restos', _baixar_restos)
+
+# Função para baixar e preparar os dados de restos a pagar do Google Drive (chamada pelo cache de datasets)
+@metricas.medir_carga('restos')
+def _baixar_restos():
     service = get_drive_service()
     restos_files = list_restos_files(service)
     
@@ -340,8 +512,12 @@ def list_adiantamentos_files(service):
     return adiantamentos_files
 
 # Função para carregar arquivos de adiantamentos do Google Drive
-@st.cache_resource
 def load_adiantamentos_data():
+    return obter_dataset('adiantamentos', _baixar_adiantamentos)
+
+# Função para baixar e preparar os dados de adiantamentos do Google Drive (chamada pelo cache de datasets)
+@metricas.medir_carga('adiantamentos')
+def _baixar_adiantamentos():
     service = get_drive_service()
     adiantamentos_files = list_adiantamentos_files(service)
 
@@ -354,7 +530,7 @@ def load_adiantamentos_data():
     total_files = len(adiantamentos_files) 
 
     # Inicializar a barra de progresso
-    progress_bar = st.progress(0)  
+    progress_bar = criar_barra_progresso()  
 
     for idx, file in enumerate(adiantamentos_files):
         file_content = download_file_from_drive(service, file['id'])
@@ -364,7 +540,21 @@ def load_adiantamentos_data():
         progress_percentage = (idx + 1) / total_files  
         progress_bar.progress(progress_percentage)  
 
-    return pd.concat(data_frames, ignore_index=True)
+    df = pd.concat(data_frames, ignore_index=True)
+
+    # Normalizar colunas e tipos uma única vez (UG, ANO e NUM_MES inteiros; valores em float)
+    df.columns = df.columns.str.strip().str.upper()
+    for col in ["UG", "ANO", "NUM_MES"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=[col for col in ["UG", "ANO", "NUM_MES"] if col in df.columns])
+    df = df.astype({col: "int64" for col in ["UG", "ANO", "NUM_MES"] if col in df.columns})
+
+    for col in df.columns:
+        if col.startswith("VALOR_"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(float)
+
+    return df.reset_index(drop=True)
 
 
 # # Função para listar arquivos .parquet na pasta de adiantamentos no Google Drive
@@ -3,9 +3,14 @@ import pandas as pd
 import plotly.express as px
 import locale
 from sidebar import load_sidebar
-from data_loader import load_data
+from aquecimento import carregar_despesas_progressivo, aguardar_datasets
 #from chatbot import render_chatbot  # Importar a função do chatbot
 from analyzer import botao_analise
+from graficos import grafico_em_cache, versao_dataset, reduzir_categorias
+from tabela_paginada import exibir_tabela_paginada, filtrar_por_palavra, formatar_moeda
+from exportacao import exibir_exportacao
+from instrumentacao import medir, registrar_contexto
+from calculos.despesas import filtrar_despesas, totais_por, totais_ano_corrente
 
 # Configurar o locale para português do Brasil
 #locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
@@ -17,13 +22,17 @@ except locale.Error:
     locale.setlocale(locale.LC_ALL, '')  # Fallback para o locale padrão do sistema
 
 def run_dashboard():
-    # Carregar dados usando o módulo centralizado
-    df = load_data()
+    # Carregar dados de forma progressiva: enquanto o aquecimento não termina, exibe os anos já carregados
+    with medir("carga dos dados"):
+        df, dados_completos = carregar_despesas_progressivo()
 
     if df is None:
         st.error("Nenhum dado foi carregado. Por favor, verifique os arquivos de entrada.")
         return
 
+    # Versão dos dados usada na chave do cache de gráficos
+    versao_dados = versao_dataset(df)
+
     # # Função para formatar valores monetários abreviados
     # def format_currency(value):
     #     if value >= 1e6:
@@ -47,28 +56,23 @@ def run_dashboard():
 
    
     # Carregar o sidebar
-    selected_ugs_despesas, selected_ano, selected_mes = load_sidebar(df, "despesas_ug")
+    with medir("sidebar"):
+        selected_ugs_despesas, selected_ano, selected_mes = load_sidebar(df, "despesas_ug")
+    registrar_contexto(ugs=selected_ugs_despesas, anos=selected_ano, meses=selected_mes)
 
     # Chame o chatbot para renderizar no sidebar
     #render_chatbot()
 
-    if df is not None:
-        # Filtrar dados apenas para o Poder Executivo
-        df = df[df['PODER'] == 'EXE']
-
+    with medir("filtro"):
+        if df is not None:
+            # Filtrar dados apenas para o Poder Executivo
+            df = df[df['PODER'] == 'EXE']
 
-    # Aplicar filtros ao dataframe
-    df_filtered = df[df['UG'].isin(selected_ugs_despesas)]
-    df_filtered = df_filtered[(df_filtered['ANO'] >= selected_ano[0]) & (df_filtered['ANO'] <= selected_ano[1])]
-    df_filtered = df_filtered[(df_filtered['MES'] >= selected_mes[0]) & (df_filtered['MES'] <= selected_mes[1])]
+        # Aplicar filtros ao dataframe (linhas sem UO, UG, ano ou mês são descartadas e os valores tipados)
+        df_filtered = filtrar_despesas(df, selected_ugs_despesas, selected_ano, selected_mes)
 
-    # Eliminar linhas com valores em branco nas colunas de interesse
-    df_filtered = df_filtered.dropna(subset=['UO', 'UG', 'ANO', 'MES'])
-
-    # Tratamento de dados
-    df_filtered['VALOR_EMPENHADO'] = df_filtered['VALOR_EMPENHADO'].apply(pd.to_numeric, errors='coerce')
-    df_filtered['VALOR_LIQUIDADO'] = df_filtered['VALOR_LIQUIDADO'].apply(pd.to_numeric, errors='coerce')
-    df_filtered['VALOR_PAGO'] = df_filtered['VALOR_PAGO'].apply(pd.to_numeric, errors='coerce')
+    # Filtros que definem o conteúdo dos gráficos (widgets que não alteram um gráfico não o reconstroem)
+    filtros_graficos = (selected_ugs_despesas, selected_ano, selected_mes)
 
     # Obter a quantidade de despesas e valor total
     quantidade_despesas = len(df_filtered)
@@ -91,11 +95,16 @@ def run_dashboard():
 
     # Exibir o subtítulo com a descrição da UG selecionada
     st.markdown(f'<h3 style="font-size:20px;"> {selected_ug_description}</h3>', unsafe_allow_html=True)
+
+    # Avisar que os dados são parciais e atualizar a página quando os anos restantes forem carregados
+    if not dados_completos:
+        st.info("Exibindo os anos já carregados. Os anos anteriores serão incluídos automaticamente assim que o carregamento terminar.")
+        aguardar_datasets(('despesas',))
     
     # Dividindo em abas
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Visão Geral das Despesas", "Despesas por Subfunção e Fonte", "Despesas por Favorecido e Natureza","Detalhamento das Despesas", "Análise Geral com IA"])
 
-    with tab1:
+    with tab1, medir("aba Visão Geral das Despesas"):
 
         col1, col2 = st.columns(2)
 
@@ -106,78 +115,89 @@ def run_dashboard():
         col5, col6 = st.columns(2)
 
         with col5:
-            # Preparar dados para o gráfico de despesas por ano
-            df_ano = df_filtered.groupby('ANO')['VALOR_PAGO'].sum().reset_index()
-            df_ano['VALOR_PAGO_ABREVIADO'] = df_ano['VALOR_PAGO'].apply(format_currency)
-
-            # Criar o gráfico de barras com valores abreviados
-            fig_ano = px.bar(
-                df_ano, 
-                x='ANO', 
-                y='VALOR_PAGO', 
-                title='Despesas por Ano', 
-                labels={'VALOR_PAGO': 'Valor Pago'}, 
-                color_discrete_sequence=['#41b8d5']
-            )
-
-            # Atualizar traços para definir a cor do texto dentro das barras
-            fig_ano.update_traces(
-                text=df_ano['VALOR_PAGO_ABREVIADO'], 
-                textposition='inside', 
-                textfont_color='white',  # Define a cor do texto dentro das barras como branco
-                hovertemplate='%{x}<br>%{text}'
-            )
-
+            # Preparar dados e gráfico de despesas por ano (reaproveitados do cache se os filtros não mudaram)
+            def construir_grafico_ano():
+                df_ano = totais_por(df_filtered, 'ANO')
+                df_ano['VALOR_PAGO_ABREVIADO'] = df_ano['VALOR_PAGO'].apply(format_currency)
+
+                # Criar o gráfico de barras com valores abreviados
+                fig_ano = px.bar(
+                    df_ano, 
+                    x='ANO', 
+                    y='VALOR_PAGO', 
+                    title='Despesas por Ano', 
+                    labels={'VALOR_PAGO': 'Valor Pago'}, 
+                    color_discrete_sequence=['#41b8d5']
+                )
+
+                # Atualizar traços para definir a cor do texto dentro das barras
+                fig_ano.update_traces(
+                    text=df_ano['VALOR_PAGO_ABREVIADO'], 
+                    textposition='inside', 
+                    textfont_color='white',  # Define a cor do texto dentro das barras como branco
+                    hovertemplate='%{x}<br>%{text}'
+                )
+
+                return fig_ano, df_ano
+
+            fig_ano, df_ano = grafico_em_cache('despesas_ug', 'despesas_por_ano', filtros_graficos, versao_dados, construir_grafico_ano)
             st.plotly_chart(fig_ano, use_container_width=True)
 
         with col6:
-            # Preparar dados para o gráfico de despesas por função
-            df_funcao = df_filtered.groupby('DESCRICAO_FUNCAO')['VALOR_PAGO'].sum().reset_index()
-            fig_funcao = px.pie(
-                df_funcao, 
-                values='VALOR_PAGO', 
-                names='DESCRICAO_FUNCAO', 
-                title='Proporção das Despesas por Função', 
-                labels={'VALOR_PAGO': 'Valor Pago', 'DESCRICAO_FUNCAO': 'Função'},
-                hole=0.4,  # Adiciona o parâmetro hole para criar um gráfico de rosca
-                color_discrete_sequence=['#2d8bba','#2f5f98', '#41b8d5', '#31356e', '#042b4d']  # Define as cores personalizadas
-            )
+            # Preparar dados e gráfico de despesas por função
+            def construir_grafico_funcao():
+                df_funcao = totais_por(df_filtered, 'DESCRICAO_FUNCAO')
+                fig_funcao = px.pie(
+                    df_funcao, 
+                    values='VALOR_PAGO', 
+                    names='DESCRICAO_FUNCAO', 
+                    title='Proporção das Despesas por Função', 
+                    labels={'VALOR_PAGO': 'Valor Pago', 'DESCRICAO_FUNCAO': 'Função'},
+                    hole=0.4,  # Adiciona o parâmetro hole para criar um gráfico de rosca
+                    color_discrete_sequence=['#2d8bba','#2f5f98', '#41b8d5', '#31356e', '#042b4d']  # Define as cores personalizadas
+                )
+                return fig_funcao, df_funcao
+
+            fig_funcao, df_funcao = grafico_em_cache('despesas_ug', 'despesas_por_funcao', filtros_graficos, versao_dados, construir_grafico_funcao)
             st.plotly_chart(fig_funcao, use_container_width=True)
 
     # Gráfico de Despesas Mensais do Ano Corrente
         st.markdown("### Despesas Mensais do Ano Corrente")
-        ano_corrente = df_filtered['ANO'].max()
-
-        # Mapear os números dos meses para os nomes dos meses
-        meses_map = {
-            1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril', 5: 'Maio', 6: 'Junho',
-            7: 'Julho', 8: 'Agosto', 9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
-        }
+        def construir_grafico_ano_corrente():
+            ano_corrente, df_ano_corrente = totais_ano_corrente(df_filtered)
+
+            # Mapear os números dos meses para os nomes dos meses
+            meses_map = {
+                1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril', 5: 'Maio', 6: 'Junho',
+                7: 'Julho', 8: 'Agosto', 9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
+            }
+
+            df_ano_corrente['MES'] = df_ano_corrente['MES'].map(meses_map)
+            df_ano_corrente['VALOR_PAGO_ABREVIADO'] = df_ano_corrente['VALOR_PAGO'].apply(format_currency)
+
+            fig_corrente = px.bar(
+                df_ano_corrente,
+                x='MES',
+                y='VALOR_PAGO',
+                title=f'Despesas Mensais do Ano Corrente ({ano_corrente})',
+                labels={'MES': 'Mês', 'VALOR_PAGO': 'Valor Pago'},
+                text='VALOR_PAGO_ABREVIADO',
+                color_discrete_sequence=['#41b8d5']
+            )
+            fig_corrente.update_layout(
+                xaxis=dict(categoryorder='array', categoryarray=list(meses_map.values()))
+            )
+            fig_corrente.update_traces(
+                textposition='outside',
+                hovertemplate='%{x}<br>%{text}'
+            )
+            return fig_corrente, df_ano_corrente
 
-        df_ano_corrente = df_filtered[df_filtered['ANO'] == ano_corrente].groupby('MES')['VALOR_PAGO'].sum().reset_index()
-        df_ano_corrente['MES'] = df_ano_corrente['MES'].map(meses_map)
-        df_ano_corrente['VALOR_PAGO_ABREVIADO'] = df_ano_corrente['VALOR_PAGO'].apply(format_currency)
-
-        fig_corrente = px.bar(
-            df_ano_corrente,
-            x='MES',
-            y='VALOR_PAGO',
-            title=f'Despesas Mensais do Ano Corrente ({ano_corrente})',
-            labels={'MES': 'Mês', 'VALOR_PAGO': 'Valor Pago'},
-            text='VALOR_PAGO_ABREVIADO',
-            color_discrete_sequence=['#41b8d5']
-        )
-        fig_corrente.update_layout(
-            xaxis=dict(categoryorder='array', categoryarray=list(meses_map.values()))
-        )
-        fig_corrente.update_traces(
-            textposition='outside',
-            hovertemplate='%{x}<br>%{text}'
-        )
+        fig_corrente, df_ano_corrente = grafico_em_cache('despesas_ug', 'despesas_ano_corrente', filtros_graficos, versao_dados, construir_grafico_ano_corrente)
         st.plotly_chart(fig_corrente, use_container_width=True)
 
-        # Criar tabela de gastos mensais do ano corrente
-        df_ano_corrente['VALOR_PAGO'] = df_ano_corrente['VALOR_PAGO'].apply(format_currency)
+        # Criar tabela de gastos mensais do ano corrente (cópia, pois o DataFrame do cache não deve ser alterado)
+        df_ano_corrente = df_ano_corrente.assign(VALOR_PAGO=df_ano_corrente['VALOR_PAGO'].apply(format_currency))
 
         # Preparar tabelas ocultas para análise
         tabela_ano = df_ano[['ANO', 'VALOR_PAGO']]
@@ -207,43 +227,48 @@ def run_dashboard():
             key="botao_analise_des_tab1"
         )
         
-    with tab2:
+    with tab2, medir("aba Despesas por Subfunção e Fonte"):
 
         # Função para criar gráficos de barras horizontais
         def plot_bar_chart(df, group_col, title, x_label, y_label, color='#E55115', max_chars=90):
-            # Agrupar os dados por coluna e calcular a soma dos valores
-            df_grouped = df.groupby(group_col)['VALOR_PAGO'].sum().reset_index()
-            df_grouped['VALOR_PAGO_FORMATADO'] = df_grouped['VALOR_PAGO'].apply(
-                lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(x) else "R$ 0,00"
-            )
+            def construir():
+                # Agrupar os dados por coluna e calcular a soma dos valores
+                df_grouped = totais_por(df, group_col)
+                df_grouped['VALOR_PAGO_FORMATADO'] = df_grouped['VALOR_PAGO'].apply(
+                    lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(x) else "R$ 0,00"
+                )
             
-            # Truncar as descrições longas para o limite de caracteres especificado
-            df_grouped[group_col] = df_grouped[group_col].apply(
-                lambda x: (x[:max_chars] + "...") if len(x) > max_chars else x
-            )
-
-            # Criar o gráfico de barras horizontais com a cor especificada
-            fig = px.bar(
-                df_grouped, 
-                x='VALOR_PAGO', 
-                y=group_col, 
-                orientation='h', 
-                title=title, 
-                labels={'VALOR_PAGO': x_label, group_col: y_label},
-                color_discrete_sequence=[color]  # Define a cor das barras
-            )
-            fig.update_traces(
-                text=df_grouped['VALOR_PAGO_FORMATADO'], 
-                textposition='auto', 
-                insidetextanchor='end', 
-                hoverinfo='x+text'
-            )
+                # Truncar as descrições longas para o limite de caracteres especificado
+                df_grouped[group_col] = df_grouped[group_col].apply(
+                    lambda x: (x[:max_chars] + "...") if len(x) > max_chars else x
+                )
+
+                # Criar o gráfico de barras horizontais com a cor especificada
+                fig = px.bar(
+                    df_grouped, 
+                    x='VALOR_PAGO', 
+                    y=group_col, 
+                    orientation='h', 
+                    title=title, 
+                    labels={'VALOR_PAGO': x_label, group_col: y_label},
+                    color_discrete_sequence=[color]  # Define a cor das barras
+                )
+                fig.update_traces(
+                    text=df_grouped['VALOR_PAGO_FORMATADO'], 
+                    textposition='auto', 
+                    insidetextanchor='end', 
+                    hoverinfo='x+text'
+                )
         
-            # Calcular a altura do gráfico com base no número de categorias
-            num_categories = df_grouped.shape[0]
-            fig_height = max(400, num_categories * 30)
+                # Calcular a altura do gráfico com base no número de categorias
+                num_categories = df_grouped.shape[0]
+                fig_height = max(400, num_categories * 30)
         
-            fig.update_layout(yaxis={'categoryorder':'total ascending'}, height=fig_height)
+                fig.update_layout(yaxis={'categoryorder':'total ascending'}, height=fig_height)
+                return fig, df_grouped
+
+            # Agregação e figura reaproveitadas do cache quando os filtros não mudaram
+            fig, df_grouped = grafico_em_cache('despesas_ug', f'barras_{group_col}', filtros_graficos, versao_dados, construir)
             st.plotly_chart(fig, use_container_width=True)
 
             return df_grouped  # Retornar a tabela gerada para análise
@@ -283,42 +308,47 @@ def run_dashboard():
             key="botao_analise_des_tab2"
         )
 
-    with tab3:
+    with tab3, medir("aba Despesas por Favorecido e Natureza"):
 
         # Gráfico de Barras: Despesas por Favorecido
-        df_favorecido = df_filtered.groupby('NOME_FAVORECIDO')['VALOR_PAGO'].sum().reset_index()
-        df_favorecido = df_favorecido.sort_values(by='VALOR_PAGO', ascending=False).head(10)  # Exibir os 10 maiores favorecidos
+        def construir_grafico_favorecido():
+            df_favorecido = totais_por(df_filtered, 'NOME_FAVORECIDO')
+            df_favorecido = reduzir_categorias(df_favorecido, 'NOME_FAVORECIDO', 'VALOR_PAGO', n=10)  # Exibir os 10 maiores favorecidos e "Outros"
         
-        # Limitar os nomes dos favorecidos a 90 caracteres
-        df_favorecido['NOME_FAVORECIDO'] = df_favorecido['NOME_FAVORECIDO'].apply(
-            lambda x: (x[:90] + '...') if len(x) > 90 else x
-        )
+            # Limitar os nomes dos favorecidos a 90 caracteres
+            df_favorecido['NOME_FAVORECIDO'] = df_favorecido['NOME_FAVORECIDO'].apply(
+                lambda x: (x[:90] + '...') if len(x) > 90 else x
+            )
 
-        df_favorecido['VALOR_PAGO_FORMATADO'] = df_favorecido['VALOR_PAGO'].apply(
-            lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(x) else "R$ 0,00"
-        )
+            df_favorecido['VALOR_PAGO_FORMATADO'] = df_favorecido['VALOR_PAGO'].apply(
+                lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(x) else "R$ 0,00"
+            )
 
-        # Criar o gráfico de barras horizontais com a cor especificada
-        fig_favorecido = px.bar(
-            df_favorecido, 
-            x='VALOR_PAGO', 
-            y='NOME_FAVORECIDO', 
-            orientation='h', 
-            title='Despesas por Favorecido', 
-            labels={'VALOR_PAGO': 'Valor Pago', 'NOME_FAVORECIDO': 'Favorecido'},
-            color_discrete_sequence=['#E55115']
-        )
-        fig_favorecido.update_traces(
-            text=df_favorecido['VALOR_PAGO_FORMATADO'], 
-            textposition='auto', 
-            insidetextanchor='end', 
-            hoverinfo='x+text'
-        )
+            # Criar o gráfico de barras horizontais com a cor especificada
+            fig_favorecido = px.bar(
+                df_favorecido, 
+                x='VALOR_PAGO', 
+                y='NOME_FAVORECIDO', 
+                orientation='h', 
+                title='Despesas por Favorecido', 
+                labels={'VALOR_PAGO': 'Valor Pago', 'NOME_FAVORECIDO': 'Favorecido'},
+                color_discrete_sequence=['#E55115']
+            )
+            fig_favorecido.update_traces(
+                text=df_favorecido['VALOR_PAGO_FORMATADO'], 
+                textposition='auto', 
+                insidetextanchor='end', 
+                hoverinfo='x+text'
+            )
 
-        # Ajustar altura do gráfico dinamicamente
-        num_categories_favorecido = df_favorecido.shape[0]
-        fig_height_favorecido = max(400, num_categories_favorecido * 30)
-        fig_favorecido.update_layout(yaxis={'categoryorder':'total ascending'}, height=fig_height_favorecido)
+            # Ajustar altura do gráfico dinamicamente
+            num_categories_favorecido = df_favorecido.shape[0]
+            fig_height_favorecido = max(400, num_categories_favorecido * 30)
+            # Manter a ordem decrescente de cima para baixo, com "Outros" na última barra
+            fig_favorecido.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': df_favorecido['NOME_FAVORECIDO'].tolist()[::-1]}, height=fig_height_favorecido)
+            return fig_favorecido, df_favorecido
+
+        fig_favorecido, df_favorecido = grafico_em_cache('despesas_ug', 'despesas_por_favorecido', filtros_graficos, versao_dados, construir_grafico_favorecido)
 
         # Exibir o gráfico
         st.plotly_chart(fig_favorecido, use_container_width=True)
@@ -343,24 +373,28 @@ def run_dashboard():
         # Filtrar a coluna selecionada
         coluna_selecionada = opcoes_natureza[selecao_natureza]
 
-        # Agrupar os dados pela natureza selecionada e somar os valores pagos
-        df_natureza = df_filtered.groupby(coluna_selecionada)['VALOR_PAGO'].sum().reset_index()
-        df_natureza = df_natureza[df_natureza['VALOR_PAGO'] > 0]
-        df_natureza['VALOR_PAGO_FORMATADO'] = df_natureza['VALOR_PAGO'].apply(format_currency)
-
-        # Criar gráfico de barras
-        height = max(600, len(df_natureza) * 30)
-        fig_natureza = px.bar(
-            df_natureza,
-            x=coluna_selecionada,
-            y='VALOR_PAGO',
-            text='VALOR_PAGO_FORMATADO',
-            title=f'Despesas por {selecao_natureza}',
-            labels={coluna_selecionada: selecao_natureza, 'VALOR_PAGO': 'Valor Pago'},
-            color_discrete_sequence=['#095aa2']
-        )
-        fig_natureza.update_traces(textposition='outside')
-        fig_natureza.update_layout(height=height)
+        def construir_grafico_natureza():
+            # Agrupar os dados pela natureza selecionada e somar os valores pagos
+            df_natureza = totais_por(df_filtered, coluna_selecionada)
+            df_natureza = df_natureza[df_natureza['VALOR_PAGO'] > 0]
+            df_natureza['VALOR_PAGO_FORMATADO'] = df_natureza['VALOR_PAGO'].apply(format_currency)
+
+            # Criar gráfico de barras
+            height = max(600, len(df_natureza) * 30)
+            fig_natureza = px.bar(
+                df_natureza,
+                x=coluna_selecionada,
+                y='VALOR_PAGO',
+                text='VALOR_PAGO_FORMATADO',
+                title=f'Despesas por {selecao_natureza}',
+                labels={coluna_selecionada: selecao_natureza, 'VALOR_PAGO': 'Valor Pago'},
+                color_discrete_sequence=['#095aa2']
+            )
+            fig_natureza.update_traces(textposition='outside')
+            fig_natureza.update_layout(height=height)
+            return fig_natureza, df_natureza
+
+        fig_natureza, df_natureza = grafico_em_cache('despesas_ug', f'despesas_por_{coluna_selecionada}', filtros_graficos, versao_dados, construir_grafico_natureza)
 
         # Exibir o gráfico
         st.plotly_chart(fig_natureza, use_container_width=True)
@@ -392,29 +426,29 @@ def run_dashboard():
             key="botao_analise_des_tab3"
         )
 
-    with tab4:
+    with tab4, medir("aba Detalhamento das Despesas"):
 
     # Adicionar uma tabela detalhada com informações de despesas por natureza
         st.subheader('Despesas - Detalhado')
         df_detalhado = df_filtered[['DESCRICAO_NATUREZA', 'NOME_FAVORECIDO', 'TIPO_LICITACAO', 'UG_EMITENTE', 'NOTA_EMPENHO', 'COD_PROCESSO', 'NOME_CONTRATO', 'OBSERVACAO_NE', 'VALOR_PAGO']]
 
-    # Ajustar o limite de células permitidas para renderização
-        pd.set_option("styler.render.max_elements", 999999)  # Altere este número para o total de células do seu dataframe
-
     # Campo de entrada para a palavra-chave de pesquisa
         keyword = st.text_input('Digite uma palavra-chave para filtrar a tabela:')
 
-    # Inicializar uma variável para controlar a exibição da tabela
-        mostrar_tabela = False
+    # Inicializar uma variável para controlar a exibição da tabela (mantida entre as trocas de página)
+        if 'despesas_exibir_tudo' not in st.session_state:
+            st.session_state.despesas_exibir_tudo = False
+        mostrar_tabela = st.session_state.despesas_exibir_tudo
 
     # Se o usuário digitou algo no campo de pesquisa, mostrar a tabela com o filtro
         if keyword:
-            df_detalhado = df_detalhado[df_detalhado.apply(lambda row: row.astype(str).str.contains(keyword, case=False).any(), axis=1)]
+            df_detalhado = filtrar_por_palavra(df_detalhado, keyword)
             mostrar_tabela = True  # Sempre mostrar a tabela ao pesquisar
 
     # Se o usuário não digitou nada, mostrar o botão para exibir a tabela completa
         if not keyword:
             if st.button('Exibir tudo'):
+                st.session_state.despesas_exibir_tudo = True
                 mostrar_tabela = True  # Mostrar a tabela ao clicar no botão
 
     # Opções de exibição de valores
@@ -437,14 +471,13 @@ def run_dashboard():
         if not exibir_negativos:
             df_detalhado = df_detalhado[df_detalhado['VALOR_PAGO'] >= 0]
 
-    # Calcular o valor total das linhas filtradas
-        valor_total_filtrado = df_detalhado['VALOR_PAGO'].sum()
-
     # Exibir a tabela apenas se a variável mostrar_tabela for True
         if mostrar_tabela:
-        # Configurar a formatação de valores na exibição usando o st.dataframe
-            st.dataframe(
-                df_detalhado.rename(columns={
+        # Paginar a tabela: apenas as linhas da página são formatadas e enviadas ao navegador
+            exibir_tabela_paginada(
+                df_detalhado,
+                chave='despesas_detalhado',
+                colunas={
                     'DESCRICAO_NATUREZA': 'Natureza',
                     'NOME_FAVORECIDO': 'Favorecido',
                     'TIPO_LICITACAO': 'Tipo Licitação',
@@ -454,13 +487,15 @@ def run_dashboard():
                     'NOME_CONTRATO': 'Nome do Contrato',
                     'OBSERVACAO_NE': 'Observação',
                     'VALOR_PAGO': 'Valor Pago'
-                }).style.format({'Valor Pago': 'R$ {:,.2f}'})
+                },
+                formatos={'VALOR_PAGO': formatar_moeda},
+                totais={'Valor total pago das linhas filtradas': ('VALOR_PAGO', formatar_moeda)}
             )
 
-        # Exibir o valor total das linhas filtradas
-            st.markdown(f"**Valor total pago das linhas filtradas:** R$ {valor_total_filtrado:,.2f}")
+    # Exportar as linhas filtradas sem precisar exibir a tabela
+        exibir_exportacao(df_detalhado, 'despesas_detalhado', 'despesas_detalhado')
 
-    with tab5:
+    with tab5, medir("aba Análise Geral com IA"):
 
         st.markdown("### Análise Geral com Inteligência Artificial")
 
@@ -4,11 +4,19 @@ import plotly.express as px
 import plotly.graph_objects as go
 import locale
 from sidebar import load_sidebar
-from data_loader import load_data
+from aquecimento import carregar_despesas_progressivo, aguardar_datasets
+from cache_datasets import registrar_dependente, contabilizar_derivado
+from graficos import grafico_em_cache, versao_dataset, reduzir_categorias
+from tabela_paginada import mascarar_cpf
+from exportacao import exibir_exportacao
+from instrumentacao import medir, registrar_contexto
+from calculos.despesas import filtrar_ug_periodo
+from calculos.diarias import filtrar_diarias, metricas_diarias, resumo_diarias, agrupar_favorecidos, classificar_consecutivos
 #from chatbot import render_chatbot  # Importar a função do chatbot
 from analyzer import botao_analise
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from collections import Counter
+from io import BytesIO
 
 # Configurar o locale para português do Brasil
 #locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
@@ -25,17 +33,66 @@ def formatar_valor(valor):
     if pd.notnull(valor):
         return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     return 'R$ 0,00'
-    
+
+# Função para pré-calcular a frequência das palavras das observações de diárias por (UG, ANO, MES)
+@st.cache_resource(show_spinner=False, max_entries=2)
+@contabilizar_derivado('despesas', entradas=2)
+def calcular_frequencias_observacoes(_df, versao):
+    """
+    Retorna um dicionário {(UG, ANO, MES): Counter} com a contagem de palavras das observações.
+    O parâmetro versao (graficos.versao_dataset) identifica a versão do DataFrame (parcial ou
+    completo) no cache; as versões parciais antigas saem do cache pelo limite de entradas.
+    """
+    df_diarias = _df[(_df['PODER'] == 'EXE') & (_df['DESCRICAO_NATUREZA6'].isin(['DIARIAS - CIVIL', 'DIARIAS - MILITAR']))]
+
+    # Considerar cada observação uma única vez por favorecido, processo e empenho (mesmo critério da tabela de favorecidos)
+    df_observacoes = df_diarias[['UG', 'ANO', 'MES', 'CODIGO_FAVORECIDO', 'COD_PROCESSO', 'NOTA_EMPENHO', 'OBSERVACAO_NE']]
+    df_observacoes = df_observacoes.dropna(subset=['OBSERVACAO_NE']).drop_duplicates()
+
+    processador = WordCloud()
+    frequencias = {}
+    for chave, observacoes in df_observacoes.groupby(['UG', 'ANO', 'MES'])['OBSERVACAO_NE']:
+        frequencias[chave] = Counter(processador.process_text(' '.join(observacoes)))
+    return frequencias
+
+# Função para somar as frequências das células (UG, ANO, MES) que atendem aos filtros selecionados
+def combinar_frequencias(frequencias, ugs, anos, meses):
+    total = Counter()
+    for (ug, ano, mes), contagem in frequencias.items():
+        if ug in ugs and anos[0] <= ano <= anos[1] and meses[0] <= mes <= meses[1]:
+            total.update(contagem)
+    return total
+
+# Função para contar as palavras das observações de um DataFrame já filtrado (usada na busca por palavra-chave)
+def contar_palavras(observacoes):
+    return Counter(WordCloud().process_text(' '.join(observacoes.dropna())))
+
+# Função para gerar a imagem PNG da nuvem de palavras, mantida em cache para cada combinação de filtros
+@st.cache_data(show_spinner=False, max_entries=64)
+def gerar_nuvem_palavras(chave_filtro, _frequencias):
+    wordcloud = WordCloud(width=1200, height=600, background_color=None, mode='RGBA', colormap='plasma')
+    wordcloud.generate_from_frequencies(_frequencias)
+
+    buffer = BytesIO()
+    wordcloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+# Frequências calculadas sobre as despesas: liberadas quando o dataset for descartado da memória
+registrar_dependente('despesas', calcular_frequencias_observacoes.clear)
+
 def run_dashboard():
-    # Carregar dados usando o módulo centralizado
-    df = load_data()
+    # Carregar dados de forma progressiva: enquanto o aquecimento não termina, exibe os anos já carregados
+    with medir("carga dos dados"):
+        df, dados_completos = carregar_despesas_progressivo()
 
     if df is None:
         st.error("Nenhum dado foi carregado. Por favor, verifique os arquivos de entrada.")
         return
 
     # Carregar o sidebar
-    selected_ugs_despesas, selected_ano, selected_mes = load_sidebar(df, "diarias")
+    with medir("sidebar"):
+        selected_ugs_despesas, selected_ano, selected_mes = load_sidebar(df, "diarias")
+    registrar_contexto(ugs=selected_ugs_despesas, anos=selected_ano, meses=selected_mes)
     
     # Verificar se nenhuma UG foi selecionada
     if not selected_ugs_despesas:
@@ -45,21 +102,23 @@ def run_dashboard():
     # Chame o chatbot para renderizar no sidebar
     #render_chatbot()
 
-    if df is not None:
-        # Filtrar dados apenas para o Poder Executivo
-        df = df[df['PODER'] == 'EXE']
+    # Chave do cache de gráficos: filtros da página e versão dos dados carregados
+    filtros_graficos = (selected_ugs_despesas, selected_ano, selected_mes)
+    versao_dados = versao_dataset(df)
 
-    # Aplicar filtros ao dataframe
-    df_filtered = df[df['UG'].isin(selected_ugs_despesas)]
-    df_filtered = df_filtered[(df_filtered['ANO'] >= selected_ano[0]) & (df_filtered['ANO'] <= selected_ano[1])]
-    df_filtered = df_filtered[(df_filtered['MES'] >= selected_mes[0]) & (df_filtered['MES'] <= selected_mes[1])]
+    with medir("filtro"):
+        if df is not None:
+            # Filtrar dados apenas para o Poder Executivo
+            df = df[df['PODER'] == 'EXE']
 
-    # Filtrar dados de diárias
-    df_diarias = df_filtered[df_filtered['DESCRICAO_NATUREZA6'].isin(['DIARIAS - CIVIL', 'DIARIAS - MILITAR'])]
+        # Aplicar filtros ao dataframe
+        df_filtered = filtrar_ug_periodo(df, selected_ugs_despesas, selected_ano, selected_mes)
+
+        # Filtrar dados de diárias
+        df_diarias = filtrar_diarias(df_filtered)
 
     # Calcular as métricas
-    quantidade_despesas = df_diarias[df_diarias['VALOR_PAGO'] > 0].shape[0]
-    valor_total_diarias = df_diarias['VALOR_PAGO'].sum()
+    quantidade_despesas, valor_total_diarias = metricas_diarias(df_diarias)
     #valor_total_formatado = locale.currency(valor_total_diarias, grouping=True)
     valor_total_formatado = f"R$ {valor_total_diarias:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
@@ -76,10 +135,15 @@ def run_dashboard():
     # Exibir o subtítulo com a descrição da UG selecionada
     st.markdown(f'<h3 style="font-size:20px;"> {selected_ug_description}</h3>', unsafe_allow_html=True)
 
+    # Avisar que os dados são parciais e atualizar a página quando os anos restantes forem carregados
+    if not dados_completos:
+        st.info("Exibindo os anos já carregados. Os anos anteriores serão incluídos automaticamente assim que o carregamento terminar.")
+        aguardar_datasets(('despesas',))
+
    # Dividindo em abas
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Resumo das Diárias", "Diárias por Favorecido", "Análise de Consecutividade","Favorecidos Detalhado","Análise Geral com IA"])
 
-    with tab1:
+    with tab1, medir("aba Resumo das Diárias"):
 
         # Exibir as métricas
         st.subheader('Métricas de diárias')
@@ -97,8 +161,8 @@ def run_dashboard():
             'DESCRICAO_NATUREZA': 'Natureza da Despesa'
         }
 
-        with col3:
-            df_mensal = df_diarias.groupby('MES')[['VALOR_EMPENHADO', 'VALOR_PAGO']].sum().reset_index()
+        def construir_mensal():
+            df_mensal = resumo_diarias(df_diarias, 'MES')
             df_mensal = df_mensal.rename(columns=colunas_exibicao)  # Renomear as colunas
             fig_mensal = px.line(
                 df_mensal, 
@@ -110,10 +174,10 @@ def run_dashboard():
                 labels={'Mês': 'Mês', 'value': 'Valor'},
                 color_discrete_sequence=['#31356e', '#41b8d5']  # Definindo as cores das linhas
             )
-            st.plotly_chart(fig_mensal)
+            return fig_mensal, df_mensal
 
-        with col4:
-            df_categoria = df_diarias.groupby('DESCRICAO_NATUREZA')[['VALOR_EMPENHADO', 'VALOR_PAGO']].sum().reset_index()
+        def construir_categoria():
+            df_categoria = resumo_diarias(df_diarias, 'DESCRICAO_NATUREZA')
             df_categoria = df_categoria.rename(columns=colunas_exibicao)  # Renomear as colunas
             fig_pizza = px.pie(
                 df_categoria,
@@ -123,6 +187,19 @@ def run_dashboard():
                 hole=0.4,  # Adiciona um buraco no meio para criar um gráfico de rosca
                 color_discrete_sequence=['#095aa2', '#042b4d']  # Define as cores desejadas
             )
+            return fig_pizza, df_categoria
+
+        fig_mensal, df_mensal = grafico_em_cache('diarias', 'evolucao_mensal', filtros_graficos, versao_dados, construir_mensal)
+        fig_pizza, df_categoria = grafico_em_cache('diarias', 'proporcao_categoria', filtros_graficos, versao_dados, construir_categoria)
+
+        # Cópias das tabelas do cache, pois os resumos abaixo formatam os valores como texto
+        df_mensal = df_mensal.copy()
+        df_categoria = df_categoria.copy()
+
+        with col3:
+            st.plotly_chart(fig_mensal)
+
+        with col4:
             st.plotly_chart(fig_pizza)
 
         # Inicializar variáveis de estado na sessão, se não estiverem definidas
@@ -182,42 +259,52 @@ def run_dashboard():
             key="botao_analise_dia_tab1"
         )
                 
-    with tab2:
-
-        # Agrupar por favorecido e calcular o valor total pago
-        df_total_por_favorecido = df_diarias.groupby('NOME_FAVORECIDO')['VALOR_PAGO'].sum().reset_index()
-
-        # Filtrar para exibir apenas valores maiores que 0
-        df_total_por_favorecido = df_total_por_favorecido[df_total_por_favorecido['VALOR_PAGO'] > 0]
-
-        # Ordenar por valor total pago, do maior para o menor
-        df_total_por_favorecido = df_total_por_favorecido.sort_values(by='VALOR_PAGO', ascending=True)
-
-        # Formatar os valores como moeda brasileira
-        df_total_por_favorecido['VALOR_PAGO_FORMATADO'] = df_total_por_favorecido['VALOR_PAGO'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(x) else 'R$ 0,00')
-
-        # Criar o gráfico de barras horizontais
-        fig_favorecido = px.bar(
-            df_total_por_favorecido,
-            x='VALOR_PAGO', 
-            y='NOME_FAVORECIDO',
-            orientation='h',  # Barras horizontais
-            title='Total de Diárias Recebidas por Favorecido',
-            labels={'VALOR_PAGO': 'Valor Pago', 'NOME_FAVORECIDO': 'Favorecido'},
-            text='VALOR_PAGO_FORMATADO',  # Exibir o valor formatado em cada barra
-            color_discrete_sequence=['#095aa2']  # Define a cor das barras
-        )
+    with tab2, medir("aba Diárias por Favorecido"):
+
+        def construir_favorecidos():
+            # Agrupar por favorecido e calcular o valor total pago
+            df_total_por_favorecido = df_diarias.groupby('NOME_FAVORECIDO')['VALOR_PAGO'].sum().reset_index()
+
+            # Filtrar para exibir apenas valores maiores que 0
+            df_total_por_favorecido = df_total_por_favorecido[df_total_por_favorecido['VALOR_PAGO'] > 0]
+
+            # Manter os maiores favorecidos e somar os demais em "Outros"
+            df_total_por_favorecido = reduzir_categorias(df_total_por_favorecido, 'NOME_FAVORECIDO', 'VALOR_PAGO')
+
+            # Inverter a ordem para exibir o maior favorecido no topo e "Outros" na base do gráfico
+            df_total_por_favorecido = df_total_por_favorecido.iloc[::-1].reset_index(drop=True)
+
+            # Formatar os valores como moeda brasileira
+            df_total_por_favorecido['VALOR_PAGO_FORMATADO'] = df_total_por_favorecido['VALOR_PAGO'].apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if pd.notnull(x) else 'R$ 0,00')
+
+            # Criar o gráfico de barras horizontais
+            fig_favorecido = px.bar(
+                df_total_por_favorecido,
+                x='VALOR_PAGO', 
+                y='NOME_FAVORECIDO',
+                orientation='h',  # Barras horizontais
+                title='Total de Diárias Recebidas por Favorecido',
+                labels={'VALOR_PAGO': 'Valor Pago', 'NOME_FAVORECIDO': 'Favorecido'},
+                text='VALOR_PAGO_FORMATADO',  # Exibir o valor formatado em cada barra
+                color_discrete_sequence=['#095aa2']  # Define a cor das barras
+            )
 
-        # Ajustar o hover para mostrar o nome e o valor formatado
-        fig_favorecido.update_traces(
-            hovertemplate='%{y}<br>Valor Pago: %{text}<extra></extra>'  # Exibe nome e valor formatado
-        )
+            # Ajustar o hover para mostrar o nome e o valor formatado
+            fig_favorecido.update_traces(
+                hovertemplate='%{y}<br>Valor Pago: %{text}<extra></extra>'  # Exibe nome e valor formatado
+            )
 
-        # Ajustar layout e formatação dos valores
-        fig_favorecido.update_layout(
-            xaxis_title='Valor Total Pago (R$)',
-            yaxis_title='Favorecido',
-            height=600  # Ajuste a altura conforme necessário
+            # Ajustar layout e formatação dos valores
+            fig_favorecido.update_layout(
+                xaxis_title='Valor Total Pago (R$)',
+                yaxis_title='Favorecido',
+                height=600  # Ajuste a altura conforme necessário
+            )
+
+            return fig_favorecido, df_total_por_favorecido
+
+        fig_favorecido, df_total_por_favorecido = grafico_em_cache(
+            'diarias', 'total_por_favorecido', filtros_graficos, versao_dados, construir_favorecidos
         )
 
         # Exibir o gráfico
@@ -247,55 +334,15 @@ def run_dashboard():
 
 
     #===========================================================================================
-    with tab3:
+    with tab3, medir("aba Análise de Consecutividade"):
         # Contagem dos servidores que receberam diárias em 3, 4-5, e 6 ou mais meses consecutivos
         st.subheader('Servidores recebendo Diárias Consecutivas')
 
-    # Identificar o último mês e ano no dataset
-        ultimo_ano = df_diarias['ANO'].max()
-        ultimo_mes = df_diarias[df_diarias['ANO'] == ultimo_ano]['MES'].max()
-
-    # Função para contar servidores consecutivos sem duplicações
-        def contar_servidores_consecutivos(meses, servidores_contabilizados):
-            servidores_consecutivos = 0
-            servidores = df_diarias['NOME_FAVORECIDO'].unique()
-        
-            for servidor in servidores:
-                if servidor in servidores_contabilizados:
-                    continue  # Pular servidores que já foram contabilizados
-            
-                df_servidor = df_diarias[df_diarias['NOME_FAVORECIDO'] == servidor]
-                df_servidor = df_servidor.sort_values(by=['ANO', 'MES'], ascending=False)
-            
-                consecutivos = 0
-                mes_atual = ultimo_mes
-                ano_atual = ultimo_ano
-            
-                for _ in range(meses):
-                    if df_servidor[(df_servidor['ANO'] == ano_atual) & (df_servidor['MES'] == mes_atual)].shape[0] > 0:
-                        consecutivos += 1
-                    else:
-                        break
-                
-                    # Ajustar para o mês anterior
-                    mes_atual -= 1
-                    if mes_atual == 0:
-                        mes_atual = 12
-                        ano_atual -= 1
-            
-                if consecutivos == meses:
-                    servidores_consecutivos += 1
-                    servidores_contabilizados.add(servidor)  # Adicionar o servidor à lista de contabilizados
-        
-            return servidores_consecutivos
-
-    # Set para rastrear servidores já contabilizados
-        servidores_contabilizados = set()
-
-    # Contar servidores sem duplicação
-        servidores_6_ou_mais_meses = contar_servidores_consecutivos(6, servidores_contabilizados)
-        servidores_4_5_meses = contar_servidores_consecutivos(4, servidores_contabilizados) + contar_servidores_consecutivos(5, servidores_contabilizados)
-        servidores_3_meses = contar_servidores_consecutivos(3, servidores_contabilizados)
+    # Separar os servidores nas faixas de 6 ou mais, 4 a 5 e 3 meses consecutivos (cada um apenas na maior faixa)
+        faixas_consecutivas = classificar_consecutivos(df_diarias)
+        servidores_6_ou_mais_meses = len(faixas_consecutivas['6_ou_mais'])
+        servidores_4_5_meses = len(faixas_consecutivas['4_5'])
+        servidores_3_meses = len(faixas_consecutivas['3'])
 
     # Função para criar gráfico de velocímetro
         def criar_grafico_velocimetro(titulo, valor, max_valor, cores):
@@ -335,63 +382,10 @@ def run_dashboard():
             st.plotly_chart(fig_6_ou_mais_meses)
 
     #======= Tabela dos servidores que receberam diárias nos ultimos meses consecutivos
-    # Função para obter os detalhes dos servidores que receberam diárias consecutivas
-        def obter_servidores_consecutivos(meses, servidores_contabilizados):
-            servidores_detalhes = []
-            servidores = df_diarias['NOME_FAVORECIDO'].unique()
-        
-            for servidor in servidores:
-                if servidor in servidores_contabilizados:
-                    continue  # Pular servidores que já foram contabilizados
-            
-                df_servidor = df_diarias[df_diarias['NOME_FAVORECIDO'] == servidor]
-                df_servidor = df_servidor.sort_values(by=['ANO', 'MES'], ascending=False)
-            
-                consecutivos = 0
-                mes_atual = ultimo_mes
-                ano_atual = ultimo_ano
-                valor_total = 0
-            
-                for _ in range(meses):
-                    df_mes = df_servidor[(df_servidor['ANO'] == ano_atual) & (df_servidor['MES'] == mes_atual)]
-                    if df_mes.shape[0] > 0:
-                        consecutivos += 1
-                        valor_total += df_mes['VALOR_PAGO'].sum()
-                    else:
-                        break
-                
-                    # Ajustar para o mês anterior
-                    mes_atual -= 1
-                    if mes_atual == 0:
-                        mes_atual = 12
-                        ano_atual -= 1
-            
-                if consecutivos == meses:
-                    servidores_detalhes.append({'Nome do Servidor': servidor, 'Valor Total Pago': valor_total})
-                    servidores_contabilizados.add(servidor)  # Adicionar o servidor à lista de contabilizados
-        
-            return servidores_detalhes
-
-    # Set para rastrear servidores já contabilizados
-        servidores_contabilizados = set()
-
-    # Obter detalhes dos servidores para 6 ou mais meses primeiro
-        servidores_6_ou_mais_meses_detalhes = obter_servidores_consecutivos(6, servidores_contabilizados)
-
-    # Obter detalhes dos servidores para 4 e 5 meses
-        servidores_4_meses_detalhes = obter_servidores_consecutivos(4, servidores_contabilizados)
-        servidores_5_meses_detalhes = obter_servidores_consecutivos(5, servidores_contabilizados)
-        servidores_4_5_meses_detalhes = servidores_4_meses_detalhes + servidores_5_meses_detalhes
-
-    # Obter detalhes dos servidores para 3 meses
-        servidores_3_meses_detalhes = obter_servidores_consecutivos(3, servidores_contabilizados)
-
-    # Criar DataFrames para cada grupo
-        df_3_meses = pd.DataFrame(servidores_3_meses_detalhes)
-        df_4_5_meses = pd.DataFrame(servidores_4_5_meses_detalhes)
-        df_6_ou_mais_meses = pd.DataFrame(servidores_6_ou_mais_meses_detalhes)
-
-
+    # Tabelas de cada faixa
+        df_3_meses = faixas_consecutivas['3']
+        df_4_5_meses = faixas_consecutivas['4_5']
+        df_6_ou_mais_meses = faixas_consecutivas['6_ou_mais']
 
         # Aplicar a formatação de moeda no 'Valor Total Pago' em cada DataFrame
         if not df_3_meses.empty:
@@ -426,7 +420,7 @@ def run_dashboard():
             st.dataframe(df_6_ou_mais_meses)
 
 
-    with tab4:
+    with tab4, medir("aba Favorecidos Detalhado"):
         #====== Adicionar a tabela de Favorecidos das Diárias com filtro por palavra-chave e cálculo do valor total filtrado
         st.subheader('Favorecidos das Diárias')
 
@@ -436,11 +430,8 @@ def run_dashboard():
         # Inicializar uma variável para controlar a exibição da tabela
         mostrar_tabela = False
 
-        # Agrupar os dados de favorecidos
-        df_favorecidos = df_diarias.groupby(['CODIGO_FAVORECIDO','NOME_FAVORECIDO', 'DESCRICAO_NATUREZA', 'COD_PROCESSO', 'NOTA_EMPENHO', 'OBSERVACAO_NE', 'MES', 'ANO']).agg({'VALOR_PAGO': 'sum'}).reset_index()
-
-        # Criar a coluna 'Período' com o formato 'MM/AAAA'
-        df_favorecidos['Período'] = df_favorecidos['ANO'].astype(str) + '/' +  df_favorecidos['MES'].astype(str).str.zfill(2)
+        # Agrupar os dados de favorecidos (com a coluna 'Período' no formato 'AAAA/MM')
+        df_favorecidos = agrupar_favorecidos(df_diarias)
 
         # Renomear colunas e reordenar
         df_favorecidos = df_favorecidos.rename(columns={
@@ -454,7 +445,7 @@ def run_dashboard():
         })[['CPF do Favorecido','Favorecido', 'Natureza', 'Valor Pago', 'Período', 'Código do Processo', 'Nota de Empenho', 'Observação']]
 
         # Aplicar máscara de CPF na coluna `CPF do Favorecido`
-        df_favorecidos['CPF do Favorecido'] = df_favorecidos['CPF do Favorecido'].apply(lambda x: x[:-4] + '****' if pd.notnull(x) else x)
+        df_favorecidos['CPF do Favorecido'] = df_favorecidos['CPF do Favorecido'].map(mascarar_cpf)
 
         # Se o usuário digitou algo no campo de pesquisa, mostrar a tabela com o filtro
         if keyword:
@@ -469,6 +460,9 @@ def run_dashboard():
         # Calcular o valor total das linhas filtradas
         valor_total_filtrado = df_favorecidos['Valor Pago'].sum()
 
+        # Exportar as linhas filtradas (CPF já mascarado e valores ainda numéricos)
+        exibir_exportacao(df_favorecidos, 'diarias_favorecidos', 'diarias_favorecidos')
+
         # Aplicar a formatação de moeda na coluna 'Valor Pago' usando a função formatar_valor
         df_favorecidos['Valor Pago'] = df_favorecidos['Valor Pago'].apply(formatar_valor)
 
@@ -538,25 +532,23 @@ def run_dashboard():
         else:
             st.write('Nenhum servidor recebeu diárias de outras UGs além da UG filtrada.')
 
-        # Filtrar as observações para a coluna 'Observação'
-        observacoes_texto = ' '.join(df_favorecidos['Observação'].dropna())
-
-        # Gerar a nuvem de palavras com uma resolução mais alta e cores destacadas para fundo escuro
-        wordcloud = WordCloud(width=1600, height=800, background_color=None, mode='RGBA', colormap='plasma').generate(observacoes_texto)
+        if keyword:
+            # Com a busca por palavra-chave, contar as palavras apenas das linhas encontradas na tabela
+            frequencias_filtro = contar_palavras(df_favorecidos['Observação'])
+        else:
+            # Combinar as frequências pré-calculadas de palavras das observações para os filtros selecionados
+            frequencias = calcular_frequencias_observacoes(df, versao_dados)
+            frequencias_filtro = combinar_frequencias(frequencias, set(selected_ugs_despesas), selected_ano, selected_mes)
 
-        # Exibir a nuvem de palavras usando matplotlib com ajuste de DPI e tamanho
         st.subheader("Nuvem de Palavras das Observações")
-        fig, ax = plt.subplots(figsize=(16, 8), dpi=300)  # Aumentar o DPI e o tamanho da figura para melhor qualidade
-
-        # Adicionar o fundo cinza com 95% de transparência
-        fig.patch.set_facecolor((0.5, 0.5, 0.5, 0.05))  # Cor cinza com 95% de transparência
-
-        # Renderizar a nuvem de palavras sobre o fundo
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis("off")
-        st.pyplot(fig)
+        if frequencias_filtro:
+            # A imagem é gerada uma única vez por combinação de filtros, palavra-chave e versão dos dados
+            chave_filtro = (tuple(sorted(selected_ugs_despesas)), tuple(selected_ano), tuple(selected_mes), keyword, versao_dados)
+            st.image(gerar_nuvem_palavras(chave_filtro, frequencias_filtro), use_container_width=True)
+        else:
+            st.write('Nenhuma observação encontrada para os filtros selecionados.')
 
-    with tab5:
+    with tab5, medir("aba Análise Geral com IA"):
         #st.subheader("Análise Geral com IA")
 
         # Preparar todas as tabelas para análise
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from openpyxl import Workbook
+from tabela_paginada import mascarar_cpf
+
+# Quantidade de linhas convertidas e gravadas por vez
+TAMANHO_LOTE = 50_000
+
+# Limite de linhas de uma planilha do Excel (sem contar o cabeçalho)
+MAX_LINHAS_XLSX = 1_048_575
+
+# Tamanho máximo do arquivo entregue ao botão de download (EXPORTACAO_MAX_MB nos secrets). O arquivo
+# é gravado em lotes, mas o Streamlit lê o arquivo inteiro para a memória ao oferecê-lo para download
+MAX_TAMANHO_EXPORTACAO_MB = 200
+
+# Formatos disponíveis: nome exibido -> (extensão, tipo MIME)
+FORMATOS_EXPORTACAO = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel (XLSX)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+# Função para percorrer o DataFrame em lotes, já com as colunas renomeadas e os CPFs mascarados
+def _lotes(df, colunas, mascarar):
+    for inicio in range(0, len(df), TAMANHO_LOTE):
+        lote = df.iloc[inicio:inicio + TAMANHO_LOTE][list(colunas)]
+        lote = lote.assign(**{coluna: lote[coluna].map(mascarar_cpf) for coluna in mascarar})
+        yield lote.rename(columns=colunas)
+
+# Função para gravar os lotes em CSV (separador ";" e vírgula decimal, como o Excel em português)
+def _gravar_csv(lotes, caminho):
+    with open(caminho, "w", encoding="utf-8-sig", newline="") as arquivo:
+        for numero, lote in enumerate(lotes):
+            lote.to_csv(arquivo, sep=";", decimal=",", index=False, header=(numero == 0))
+
+# Função para gravar os lotes em Parquet, um grupo de linhas por lote
+def _gravar_parquet(lotes, caminho):
+    """
+    O schema vem dos tipos das colunas (iguais em todos os lotes), e não dos valores do primeiro
+    lote: colunas de texto (object) são gravadas como string, mesmo que o primeiro lote só
+    tenha valores vazios nelas.
+    """
+    escritor = None
+    try:
+        for lote in lotes:
+            lote = lote.astype({coluna: "string" for coluna in lote.columns if lote[coluna].dtype == object})
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, pa.Schema.from_pandas(lote.head(0), preserve_index=False))
+            escritor.write_table(pa.Table.from_pandas(lote, schema=escritor.schema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+# Função para gravar os lotes em XLSX no modo write-only do openpyxl (linhas não ficam em memória)
+def _gravar_xlsx(lotes, caminho, colunas):
+    planilha = Workbook(write_only=True)
+    aba = planilha.create_sheet("Dados")
+    aba.append(list(colunas.values()))
+    for lote in lotes:
+        # Valores vazios viram células em branco e tipos numpy viram tipos nativos do Python
+        lote = lote.astype(object).where(lote.notna(), None)
+        for linha in lote.itertuples(index=False, name=None):
+            aba.append(linha)
+    planilha.save(caminho)
+
+# Função para gravar o DataFrame filtrado no formato escolhido, em lotes, dentro da pasta informada
+def exportar_dados(df, formato, pasta, nome_arquivo, colunas=None, mascarar=()):
+    """
+    - colunas: {coluna de df: título no arquivo}; por padrão, todas as colunas com o próprio nome;
+    - mascarar: colunas com CPF cujos últimos 4 dígitos são ocultados, como nas telas.
+    Retorna o caminho do arquivo gerado.
+    """
+    colunas = colunas or {coluna: coluna for coluna in df.columns}
+    extensao, _ = FORMATOS_EXPORTACAO[formato]
+    caminho = os.path.join(pasta, f"{nome_arquivo}.{extensao}")
+
+    lotes = _lotes(df, colunas, mascarar)
+    if extensao == "csv":
+        _gravar_csv(lotes, caminho)
+    elif extensao == "parquet":
+        _gravar_parquet(lotes, caminho)
+    else:
+        _gravar_xlsx(lotes, caminho, colunas)
+    return caminho
+
+# Função para exibir os controles de exportação das linhas filtradas de uma tabela detalhada
+def exibir_exportacao(df, chave, nome_arquivo, colunas=None, mascarar=()):
+    """
+    O arquivo é gerado somente ao clicar em "Gerar arquivo", em um diretório temporário
+    removido logo após ser entregue ao botão de download. Como o botão de download mantém o
+    arquivo inteiro em memória, arquivos acima de EXPORTACAO_MAX_MB não são oferecidos.
+    """
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        formato = st.selectbox("Exportar as linhas filtradas como:", options=list(FORMATOS_EXPORTACAO), key=f"{chave}_formato")
+    with col2:
+        gerar = st.button("Gerar arquivo", key=f"{chave}_gerar")
+
+    if not gerar:
+        return
+
+    if df.empty:
+        st.warning("Nenhuma linha para exportar com os filtros selecionados.")
+        return
+
+    if FORMATOS_EXPORTACAO[formato][0] == "xlsx" and len(df) > MAX_LINHAS_XLSX:
+        st.error(f"O Excel aceita no máximo {MAX_LINHAS_XLSX:,} linhas. Exporte em CSV ou Parquet.".replace(",", "."))
+        return
+
+    extensao, tipo_mime = FORMATOS_EXPORTACAO[formato]
+    with st.spinner("Gerando arquivo..."):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = exportar_dados(df, formato, pasta, nome_arquivo, colunas, mascarar)
+
+            tamanho_mb = os.path.getsize(caminho) / 1024 ** 2
+            limite_mb = float(st.secrets.get("EXPORTACAO_MAX_MB", MAX_TAMANHO_EXPORTACAO_MB))
+            if tamanho_mb > limite_mb:
+                st.error(
+                    f"O arquivo gerado tem {tamanho_mb:,.0f} MB, acima do limite de {limite_mb:,.0f} MB para download. "
+                    "Refine os filtros ou escolha o formato Parquet, que é mais compacto."
+                )
+                return
+
+            with open(caminho, "rb") as arquivo:
+                st.download_button(
+                    "Baixar arquivo",
+                    data=arquivo,
+                    file_name=f"{nome_arquivo}.{extensao}",
+                    mime=tipo_mime,
+                    key=f"{chave}_baixar"
+                )
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from instrumentacao import medir
+from cache_datasets import geracao, registrar_dependente, contabilizar, memoria_objeto
+import metricas
+
+# Quantidade máxima de gráficos mantidos em memória (os menos usados recentemente são descartados)
+MAX_GRAFICOS = 256
+
+# Cache compartilhado por todas as sessões do processo
+_lock = threading.Lock()
+_graficos = OrderedDict()
+
+# Memória estimada de cada gráfico em cache (conta no orçamento do cache de datasets)
+_memorias = {}
+
+# Quantidade padrão de categorias exibidas nos gráficos com muitas categorias (as demais vão para "Outros")
+MAX_CATEGORIAS = 30
+ROTULO_OUTROS = "Outros"
+
+# Função para identificar a versão de um ou mais datasets carregados (muda quando os dados são recarregados)
+def versao_dataset(*dfs):
+    """
+    Usa a geração do cache de datasets, que muda a cada carga ou descarte, mais a identidade e
+    o tamanho de cada DataFrame de origem (que distinguem as versões parciais das despesas
+    durante o carregamento progressivo). Deve receber os DataFrames devolvidos pelos loaders
+    com cache, e não cópias filtradas criadas a cada execução.
+    """
+    return (geracao(),) + tuple((id(df), len(df)) if df is not None else None for df in dfs)
+
+# Função para converter os filtros em uma tupla estável (listas, conjuntos e tipos numpy)
+def normalizar_filtros(filtros):
+    if isinstance(filtros, dict):
+        return tuple(sorted((chave, normalizar_filtros(valor)) for chave, valor in filtros.items()))
+    if isinstance(filtros, (set, frozenset)):
+        return tuple(sorted(normalizar_filtros(valor) for valor in filtros))
+    if isinstance(filtros, (list, tuple)):
+        return tuple(normalizar_filtros(valor) for valor in filtros)
+    if isinstance(filtros, np.generic):
+        return filtros.item()
+    return filtros
+
+# Função para obter um gráfico do cache, construindo-o apenas quando a chave ainda não existe
+def grafico_em_cache(pagina, grafico, filtros, versao, construir):
+    """
+    A chave é (pagina, grafico, filtros normalizados, versao). A função construir deve fazer
+    a agregação e montar a figura, devolvendo a figura (ou uma tupla com a figura e as
+    tabelas usadas na análise com IA). O resultado não deve ser alterado por quem o recebe.
+    """
+    chave = (pagina, grafico, normalizar_filtros(filtros), versao)
+
+    with _lock:
+        if chave in _graficos:
+            _graficos.move_to_end(chave)
+            metricas.registrar_cache("graficos", acerto=True)
+            return _graficos[chave]
+
+    metricas.registrar_cache("graficos", acerto=False)
+    with medir(f"gráfico {grafico} (construção)"):
+        resultado = construir()
+
+    memoria = memoria_objeto(resultado)
+    with _lock:
+        _graficos[chave] = resultado
+        _graficos.move_to_end(chave)
+        _memorias[chave] = memoria
+        while len(_graficos) > MAX_GRAFICOS:
+            chave_antiga, _ = _graficos.popitem(last=False)
+            _memorias.pop(chave_antiga, None)
+        memoria_total = sum(_memorias.values())
+
+    # Fora do lock: o orçamento excedido descarta datasets, e o descarte limpa este cache
+    contabilizar(None, "graficos", memoria_total)
+    return resultado
+
+# Função para esvaziar o cache de gráficos (executada quando um dataset é descartado da memória)
+def limpar_graficos():
+    with _lock:
+        _graficos.clear()
+        _memorias.clear()
+
+# Função para manter apenas as categorias de maior valor, somando as demais em uma linha "Outros"
+def reduzir_categorias(df, categoria, valor, n=MAX_CATEGORIAS, somar=None, rotulo_outros=ROTULO_OUTROS):
+    """
+    Recebe um DataFrame já agregado (uma linha por categoria) e devolve as n categorias de
+    maior valor em ordem decrescente, seguidas da linha "Outros" quando houver categorias
+    excedentes. As colunas em somar (padrão: apenas valor) são somadas em "Outros"; as
+    demais ficam vazias. O tamanho do gráfico fica limitado a n + 1 categorias.
+    """
+    somar = [valor] if somar is None else somar
+    if len(df) <= n:
+        return df.sort_values(valor, ascending=False, kind="stable")
+
+    # Seleção parcial das n maiores (sem ordenar todas as categorias)
+    valores = df[valor].fillna(0).to_numpy()
+    topo = np.argpartition(-valores, n - 1)[:n]
+    topo = topo[np.argsort(-valores[topo], kind="stable")]
+
+    restantes = np.ones(len(df), dtype=bool)
+    restantes[topo] = False
+    linha_outros = pd.DataFrame([{categoria: rotulo_outros, **df.loc[restantes, somar].sum().to_dict()}])
+
+    return pd.concat([df.iloc[topo], linha_outros], ignore_index=True)
+
+# Os gráficos guardam agregações dos datasets: liberados quando qualquer dataset for descartado da memória
+registrar_dependente(None, limpar_graficos)
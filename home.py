@@ -1,8 +1,7 @@
 import streamlit as st
 import locale
-import base64
-from PIL import Image
 from sidebar import load_sidebar
+from assets import MINIATURAS_PATHS, imagem_html
 #from chatbot import render_chatbot  # Importar a função do chatbot
 
 # Tente definir o locale para pt_BR. Se falhar, use o locale padrão do sistema
@@ -25,14 +24,7 @@ def run_dashboard():
     # Exibir título da página
     st.title('Módulos disponíveis')
 
-    # Carregar as imagens das miniaturas e textos explicativos
-    image_paths = {
-        "Despesas Detalhado": "src/assets/despesas_capab.png",
-        "Diárias": "src/assets/diarias_capab.png",
-        "Contratos": "src/assets/contratos_capab.png",
-        "Servidores": "src/assets/servidores_capab.png"
-    }
-    
+    # Textos explicativos das miniaturas (as imagens vêm do módulo assets)
     dashboard_texts = {
         "Despesas Detalhado": "Painel detalhado com dados sobre despesas realizadas, oferecendo insights por mês e ano.",
         "Diárias": "Visualização das diárias pagas aos servidores, incluindo análises por unidade e períodos.",
@@ -47,15 +39,9 @@ def run_dashboard():
     cols = st.columns(4)
     for i, dashboard in enumerate(dashboards):
         with cols[i]:
-            # Carregar a imagem e convertê-la para Base64 para evitar a expansão
-            image = Image.open(image_paths[dashboard])
-            with open(image_paths[dashboard], "rb") as file:
-                image_data = file.read()
-                encoded_image = base64.b64encode(image_data).decode()
-            
-            # Exibir a imagem com HTML para desativar a expansão
+            # Exibir a imagem (já convertida para Base64 em cache) com HTML para desativar a expansão
             st.markdown(
-                f'<img src="data:image/png;base64,{encoded_image}" style="width:100%;height:auto;" alt="{dashboard}">',
+                imagem_html(MINIATURAS_PATHS[dashboard], "width:100%;height:auto;", dashboard),
                 unsafe_allow_html=True
             )
             
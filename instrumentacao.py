@@ -0,0 +1,166 @@
+import contextlib
+import json
+import logging
+import os
+import time
+from logging.handlers import RotatingFileHandler
+import pandas as pd
+import streamlit as st
+from cache_datasets import resumo_cache, datasets_conhecidos, descartar_dataset
+
+# Chave do estado da sessão com as medições da execução (rerun) atual
+CHAVE_EXECUCAO = "_instrumentacao_execucao"
+
+# Arquivo de log rotativo das medições (pode ser alterado em INSTRUMENTACAO_LOG nos secrets)
+ARQUIVO_LOG = "logs/instrumentacao.log"
+TAMANHO_MAX_LOG = 5 * 1024 * 1024
+QTD_ARQUIVOS_LOG = 5
+
+# Função para saber se a instrumentação está ligada (flag de administrador INSTRUMENTACAO_ATIVA nos secrets)
+def instrumentacao_ativa():
+    return bool(st.secrets.get("INSTRUMENTACAO_ATIVA", False))
+
+# Função para obter a memória residente do processo em MB (None quando não for possível medir)
+def _memoria_mb():
+    """
+    Lê /proc/self/statm (Linux). A memória é do processo inteiro, compartilhado por todas as
+    sessões, então a variação de uma etapa também inclui o que outras sessões alocaram no período.
+    """
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Função para configurar (uma única vez por processo) o logger com arquivo rotativo
+@st.cache_resource(show_spinner=False)
+def _logger():
+    caminho = st.secrets.get("INSTRUMENTACAO_LOG", ARQUIVO_LOG)
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+
+    handler = RotatingFileHandler(caminho, maxBytes=TAMANHO_MAX_LOG, backupCount=QTD_ARQUIVOS_LOG, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+
+    logger = logging.getLogger("painelgestor.instrumentacao")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    return logger
+
+# Função para iniciar as medições de uma execução (chamada no início de cada rerun)
+def iniciar_execucao():
+    if not instrumentacao_ativa():
+        st.session_state.pop(CHAVE_EXECUCAO, None)
+        return
+    st.session_state[CHAVE_EXECUCAO] = {
+        "pagina": None,
+        "filtros": {},
+        "etapas": [],
+        "nivel": 0,
+        "inicio": time.perf_counter(),
+    }
+
+# Função para registrar a página e os filtros da execução (contexto gravado junto com as medições)
+def registrar_contexto(pagina=None, **filtros):
+    execucao = st.session_state.get(CHAVE_EXECUCAO)
+    if execucao is None:
+        return
+    if pagina is not None:
+        execucao["pagina"] = pagina
+    execucao["filtros"].update(filtros)
+
+# Função para medir o tempo e a variação de memória de uma etapa da execução
+@contextlib.contextmanager
+def medir(etapa):
+    """
+    Uso: with medir("filtro"): ... As etapas podem ser aninhadas (ex.: a construção de um
+    gráfico dentro de uma aba). Sem a instrumentação ligada, não mede nada.
+    """
+    execucao = st.session_state.get(CHAVE_EXECUCAO)
+    if execucao is None:
+        yield
+        return
+
+    # A etapa é registrada no início, para que as etapas internas apareçam logo abaixo dela
+    registro = {"etapa": etapa, "nivel": execucao["nivel"], "tempo_s": None, "memoria_mb": None}
+    execucao["etapas"].append(registro)
+    execucao["nivel"] += 1
+
+    memoria_inicio = _memoria_mb()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro["tempo_s"] = time.perf_counter() - inicio
+        memoria_fim = _memoria_mb()
+        if memoria_inicio is not None and memoria_fim is not None:
+            registro["memoria_mb"] = memoria_fim - memoria_inicio
+        execucao["nivel"] -= 1
+
+# Função para encerrar a execução: grava as medições no log e exibe o painel no sidebar
+def finalizar_execucao():
+    execucao = st.session_state.pop(CHAVE_EXECUCAO, None)
+    if execucao is None:
+        return
+
+    total_s = time.perf_counter() - execucao["inicio"]
+    etapas = [etapa for etapa in execucao["etapas"] if etapa["tempo_s"] is not None]
+
+    _logger().info(json.dumps({
+        "pagina": execucao["pagina"],
+        "filtros": execucao["filtros"],
+        "total_s": round(total_s, 4),
+        "etapas": [
+            {
+                "etapa": etapa["etapa"],
+                "nivel": etapa["nivel"],
+                "tempo_s": round(etapa["tempo_s"], 4),
+                "memoria_mb": None if etapa["memoria_mb"] is None else round(etapa["memoria_mb"], 2),
+            }
+            for etapa in etapas
+        ],
+    }, ensure_ascii=False, default=str))
+
+    exibir_painel(etapas, total_s)
+
+# Função para exibir a tabela de tempos da execução em um painel recolhível no sidebar
+def exibir_painel(etapas, total_s):
+    with st.sidebar.expander("Instrumentação (tempo por etapa)", expanded=False):
+        df_etapas = pd.DataFrame({
+            "Etapa": ["\u2003" * etapa["nivel"] + etapa["etapa"] for etapa in etapas],  # Recuo das etapas aninhadas
+            "Tempo (s)": [etapa["tempo_s"] for etapa in etapas],
+            "Memória (MB)": [etapa["memoria_mb"] for etapa in etapas],
+        })
+        st.dataframe(
+            df_etapas,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Tempo (s)": st.column_config.NumberColumn(format="%.3f"),
+                "Memória (MB)": st.column_config.NumberColumn(format="%+.1f"),
+            }
+        )
+        st.caption(f"Tempo total da execução: {total_s:.3f} s")
+
+        # Datasets mantidos em memória pelo cache de datasets, do mais para o menos usado recentemente
+        df_datasets, memoria_mb, orcamento_mb = resumo_cache()
+        if not df_datasets.empty:
+            st.dataframe(
+                df_datasets,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Memória (MB)": st.column_config.NumberColumn(format="%.1f"),
+                    "Derivados (MB)": st.column_config.NumberColumn(format="%.1f"),
+                    "Carga (s)": st.column_config.NumberColumn(format="%.2f"),
+                }
+            )
+        st.caption(f"Datasets e caches derivados em memória: {memoria_mb:.0f} de {orcamento_mb:.0f} MB")
+
+        # Ação de administrador: descartar a cópia em memória e em disco para buscar dados novos no Google Drive
+        datasets = datasets_conhecidos()
+        if datasets:
+            dataset = st.selectbox("Dataset", datasets, key="_instrumentacao_recarregar")
+            if st.button("Recarregar do Google Drive", key="_instrumentacao_recarregar_botao"):
+                descartar_dataset(dataset, apagar_disco=True)
+                st.rerun()
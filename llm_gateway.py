@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+import httpx
+from dotenv import load_dotenv
+import metricas
+
+# Estado compartilhado por todas as sessões do processo
+_lock = threading.Lock()
+_chave_configurada = False
+_cliente_http = None
+_chats = {}
+_chains = {}
+
+# Função para carregar a chave da API do arquivo .env uma única vez por processo
+def configurar_chave_api():
+    global _chave_configurada
+
+    if _chave_configurada:
+        return True
+
+    with _lock:
+        if not _chave_configurada:
+            load_dotenv()
+            API_KEY = os.getenv("API_KEY")
+            if API_KEY:
+                os.environ['GROQ_API_KEY'] = API_KEY  # Configura a chave globalmente
+                _chave_configurada = True
+
+    return _chave_configurada
+
+# Função para obter o cliente HTTP compartilhado, mantendo as conexões TLS abertas (keep-alive)
+def obter_cliente_http():
+    global _cliente_http
+
+    with _lock:
+        if _cliente_http is None:
+            _cliente_http = httpx.Client(
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=300)
+            )
+    return _cliente_http
+
+# Função para extrair os tokens de entrada e de saída de uma resposta da LLM
+def _tokens_resposta(resposta):
+    uso = (resposta.llm_output or {}).get("token_usage") or {}
+    if uso:
+        return uso.get("prompt_tokens", 0), uso.get("completion_tokens", 0)
+
+    # Modelos que informam o consumo apenas na mensagem gerada
+    for geracoes in resposta.generations:
+        for geracao in geracoes:
+            metadados = getattr(getattr(geracao, "message", None), "usage_metadata", None) or {}
+            if metadados:
+                return metadados.get("input_tokens", 0), metadados.get("output_tokens", 0)
+    return 0, 0
+
+# Função para criar o callback que registra chamadas, latência e tokens de um modelo nas métricas
+def _criar_callback_metricas(modelo):
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class CallbackMetricas(BaseCallbackHandler):
+        def __init__(self):
+            self._inicios = {}
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._inicios[run_id] = time.perf_counter()
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._inicios[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            self._registrar(run_id)
+            tokens_entrada, tokens_saida = _tokens_resposta(response)
+            metricas.incrementar("painelgestor_llm_tokens_total", tokens_entrada, modelo=modelo, tipo="entrada")
+            metricas.incrementar("painelgestor_llm_tokens_total", tokens_saida, modelo=modelo, tipo="saida")
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            self._registrar(run_id)
+            metricas.incrementar("painelgestor_llm_erros_total", modelo=modelo)
+
+        def _registrar(self, run_id):
+            metricas.incrementar("painelgestor_llm_chamadas_total", modelo=modelo)
+            inicio = self._inicios.pop(run_id, None)
+            if inicio is not None:
+                metricas.observar("painelgestor_llm_latencia_segundos", time.perf_counter() - inicio, modelo=modelo)
+
+    return CallbackMetricas()
+
+# Função para obter o modelo da Groq reutilizável para o nome de modelo informado
+def obter_chat(modelo):
+    chat = _chats.get(modelo)
+    if chat is not None:
+        return chat
+
+    # Importar a biblioteca da Groq apenas no primeiro uso da IA
+    from langchain_groq import ChatGroq
+
+    configurar_chave_api()
+    cliente_http = obter_cliente_http()
+
+    with _lock:
+        if modelo not in _chats:
+            _chats[modelo] = ChatGroq(model=modelo, http_client=cliente_http, callbacks=[_criar_callback_metricas(modelo)])
+        return _chats[modelo]
+
+# Função para obter uma chain (regras de sistema + mensagem do usuário) reutilizável
+def obter_chain(regras, modelo):
+    """
+    Retorna a chain `template | chat` para as regras e o modelo informados.
+
+    A mensagem do usuário é passada na invocação pela variável `entrada`,
+    por exemplo: `obter_chain(regras, modelo).invoke({'entrada': texto})`.
+    """
+    chave = (regras, modelo)
+    chain = _chains.get(chave)
+    if chain is not None:
+        return chain
+
+    from langchain.prompts import ChatPromptTemplate
+
+    template = ChatPromptTemplate.from_messages([
+        ('system', regras),
+        ('user', '{entrada}')
+    ])
+    chat = obter_chat(modelo)
+
+    with _lock:
+        if chave not in _chains:
+            _chains[chave] = template | chat
+        return _chains[chave]
@@ -0,0 +1,117 @@
+import threading
+import streamlit as st
+from llm_gateway import obter_chat
+
+# Orçamento total de tokens (aproximado) reservado para a memória da conversa em cada prompt
+ORCAMENTO_TOKENS = 1500
+
+# Parte do orçamento reservada para o resumo acumulado da conversa
+TOKENS_RESUMO = 400
+
+# Quantidade de turnos (pergunta + resposta) mantidos literalmente na janela recente
+TURNOS_JANELA = 6
+
+# Quantidade de turnos que saem da janela antes de o resumo ser atualizado
+TURNOS_POR_RESUMO = 4
+
+# Modelo leve usado apenas para condensar a conversa antiga
+MODELO_RESUMO = 'llama-3.1-8b-instant'
+
+# Função para estimar a quantidade de tokens de um texto (aproximação de ~4 caracteres por token)
+def estimar_tokens(texto):
+    return len(texto) // 4 + 1 if texto else 0
+
+# Função para cortar um texto mantendo o trecho mais recente dentro do limite de tokens
+def truncar_tokens(texto, limite_tokens):
+    limite_caracteres = limite_tokens * 4
+    if len(texto) <= limite_caracteres:
+        return texto
+    return "..." + texto[-limite_caracteres:]
+
+# Função para cortar um turno ao limite de tokens (a pergunta fica com até metade do limite, a resposta com o restante)
+def truncar_turno(turno, limite_tokens):
+    pergunta, resposta = turno
+    pergunta = truncar_tokens(pergunta, max(limite_tokens // 2, 1))
+    limite_resposta = limite_tokens - estimar_tokens(formatar_turnos([(pergunta, "")]))
+    return pergunta, truncar_tokens(resposta, max(limite_resposta, 1))
+
+# Função para formatar uma lista de turnos no mesmo padrão usado no histórico exibido
+def formatar_turnos(turnos):
+    return "\n".join(f"Você: {pergunta}\nAlici: {resposta}" for pergunta, resposta in turnos)
+
+# Função para obter (ou criar) a memória da conversa na sessão do usuário
+def obter_memoria():
+    if "memoria_chat" not in st.session_state:
+        st.session_state.memoria_chat = {
+            "resumo": "",        # Resumo acumulado dos turnos antigos
+            "janela": [],        # Turnos recentes mantidos na íntegra
+            "pendentes": [],     # Turnos que saíram da janela e ainda não entraram no resumo
+            "resumindo": False   # Indica se há uma atualização de resumo em andamento
+        }
+    return st.session_state.memoria_chat
+
+# Função para registrar um novo turno da conversa na memória
+def registrar_turno(pergunta, resposta):
+    memoria = obter_memoria()
+    memoria["janela"].append((pergunta, resposta))
+
+    # Turnos que excedem a janela passam a aguardar o próximo resumo
+    while len(memoria["janela"]) > TURNOS_JANELA:
+        memoria["pendentes"].append(memoria["janela"].pop(0))
+
+    # Atualizar o resumo periodicamente, em segundo plano, para não atrasar a resposta atual
+    if len(memoria["pendentes"]) >= TURNOS_POR_RESUMO and not memoria["resumindo"]:
+        memoria["resumindo"] = True
+        lote = list(memoria["pendentes"])
+        threading.Thread(target=atualizar_resumo, args=(memoria, lote), daemon=True).start()
+
+# Função para condensar o resumo anterior e os turnos pendentes em um novo resumo
+def atualizar_resumo(memoria, lote):
+    try:
+        chat = obter_chat(MODELO_RESUMO)
+        prompt = (
+            "Atualize o resumo de uma conversa entre um usuário (auditor ou gestor do governo estadual) e a assistente ALici. "
+            "Mantenha fatos relevantes como CPFs consultados, nomes, valores e pedidos do usuário. "
+            f"Responda apenas com o novo resumo, em Português Brasileiro, com no máximo {TOKENS_RESUMO * 3 // 4} palavras.\n\n"
+            f"Resumo atual:\n{memoria['resumo'] or '(vazio)'}\n\n"
+            f"Novos trechos da conversa:\n{formatar_turnos(lote)}"
+        )
+        resposta = chat.invoke(prompt)
+        novo_resumo = resposta.content.strip()
+    except Exception:
+        novo_resumo = ""
+
+    # Se a LLM falhar, manter os turnos mais recentes como resumo literal
+    if not novo_resumo:
+        novo_resumo = "\n".join(filter(None, [memoria["resumo"], formatar_turnos(lote)]))
+
+    memoria["resumo"] = truncar_tokens(novo_resumo, TOKENS_RESUMO)
+    del memoria["pendentes"][:len(lote)]
+    memoria["resumindo"] = False
+
+# Função para montar o contexto da conversa respeitando o orçamento de tokens
+def montar_contexto():
+    memoria = obter_memoria()
+
+    resumo = truncar_tokens(memoria["resumo"], TOKENS_RESUMO)
+    disponivel = ORCAMENTO_TOKENS - estimar_tokens(resumo)
+
+    # Percorrer do turno mais recente para o mais antigo até esgotar o orçamento
+    turnos_recentes = memoria["pendentes"] + memoria["janela"]
+    selecionados = []
+    for turno in reversed(turnos_recentes):
+        custo = estimar_tokens(formatar_turnos([turno]))
+        if custo > disponivel:
+            # O turno mais recente (provavelmente o assunto da pergunta atual) entra sempre, cortado ao orçamento
+            if not selecionados:
+                selecionados.append(truncar_turno(turno, disponivel))
+            break
+        selecionados.insert(0, turno)
+        disponivel -= custo
+
+    partes = []
+    if resumo:
+        partes.append(f"Resumo da conversa anterior:\n{resumo}")
+    if selecionados:
+        partes.append(f"Conversa recente:\n{formatar_turnos(selecionados)}")
+    return "\n\n".join(partes)
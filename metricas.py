@@ -0,0 +1,192 @@
+import functools
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+import streamlit as st
+
+# Métricas exportadas: nome -> (tipo no formato do Prometheus, descrição)
+METRICAS = {
+    "painelgestor_drive_chamadas_total": ("counter", "Chamadas à API do Google Drive por método."),
+    "painelgestor_drive_erros_total": ("counter", "Chamadas à API do Google Drive que falharam, por método."),
+    "painelgestor_drive_bytes_baixados_total": ("counter", "Bytes baixados do Google Drive."),
+    "painelgestor_drive_latencia_segundos": ("summary", "Latência das chamadas à API do Google Drive, por método."),
+    "painelgestor_dataset_cargas_total": ("counter", "Cargas de cada dataset (execuções do loader, sem contar o cache)."),
+    "painelgestor_dataset_carga_segundos": ("gauge", "Duração da última carga de cada dataset."),
+    "painelgestor_dataset_memoria_bytes": ("gauge", "Memória ocupada pelos DataFrames de cada dataset na última carga."),
+    "painelgestor_cache_total": ("counter", "Consultas aos caches do painel por cache e resultado (acerto ou falha)."),
+    "painelgestor_cache_descartes_total": ("counter", "Itens descartados dos caches do painel para respeitar o limite de memória."),
+    "painelgestor_cache_datasets_bytes": ("gauge", "Memória ocupada pelos datasets mantidos no cache de datasets e pelos caches derivados deles."),
+    "painelgestor_llm_chamadas_total": ("counter", "Chamadas à LLM por modelo."),
+    "painelgestor_llm_erros_total": ("counter", "Chamadas à LLM que falharam, por modelo."),
+    "painelgestor_llm_latencia_segundos": ("summary", "Latência das chamadas à LLM, por modelo."),
+    "painelgestor_llm_tokens_total": ("counter", "Tokens consumidos na LLM por modelo e tipo (entrada ou saida)."),
+    "painelgestor_rerun_segundos": ("summary", "Duração de cada execução (rerun) por página."),
+    "painelgestor_memoria_residente_bytes": ("gauge", "Memória residente (RSS) do processo."),
+}
+
+# Quantis calculados nas métricas do tipo summary, sobre as observações mais recentes
+QUANTIS = (0.5, 0.9, 0.99)
+MAX_OBSERVACOES = 1000
+
+# Arquivo lido pelo coletor textfile do node exporter e intervalo entre as gravações
+ARQUIVO_METRICAS = "metricas/painelgestor.prom"
+INTERVALO_EXPORTACAO = 15
+
+# Permissão do arquivo (METRICAS_PERMISSAO nos secrets, em octal): o coletor costuma rodar com outro usuário
+PERMISSAO_ARQUIVO = 0o644
+
+_logger = logging.getLogger("painelgestor.metricas")
+
+# Valores compartilhados por todas as sessões do processo: (nome, rótulos) -> valor
+_lock = threading.Lock()
+_valores = {}
+_observacoes = {}
+
+# Função para converter os rótulos em uma chave estável
+def _chave(nome, rotulos):
+    return nome, tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+# Função para somar um valor a um contador
+def incrementar(nome, valor=1, **rotulos):
+    chave = _chave(nome, rotulos)
+    with _lock:
+        _valores[chave] = _valores.get(chave, 0) + valor
+
+# Função para definir o valor atual de um gauge
+def definir(nome, valor, **rotulos):
+    with _lock:
+        _valores[_chave(nome, rotulos)] = valor
+
+# Função para registrar uma observação (ex.: uma latência) em um summary
+def observar(nome, valor, **rotulos):
+    chave = _chave(nome, rotulos)
+    with _lock:
+        if chave not in _observacoes:
+            _observacoes[chave] = {"recentes": deque(maxlen=MAX_OBSERVACOES), "quantidade": 0, "soma": 0.0}
+        serie = _observacoes[chave]
+        serie["recentes"].append(valor)
+        serie["quantidade"] += 1
+        serie["soma"] += valor
+
+# Função para registrar se um cache atendeu a consulta (acerto) ou precisou calcular o valor (falha)
+def registrar_cache(cache, acerto):
+    incrementar("painelgestor_cache_total", cache=cache, resultado="acerto" if acerto else "falha")
+
+# Função para obter a memória ocupada pelos DataFrames devolvidos por um loader (DataFrame ou tupla)
+def memoria_dataframes(resultado):
+    dataframes = resultado if isinstance(resultado, tuple) else (resultado,)
+    return sum(int(df.memory_usage(deep=True).sum()) for df in dataframes if hasattr(df, "memory_usage"))
+
+# Decorador para medir as cargas de um dataset (aplicado à função que baixa o dataset, mede apenas as cargas reais)
+def medir_carga(dataset):
+    def decorador(carregar):
+        @functools.wraps(carregar)
+        def carregar_medido(*args, **kwargs):
+            inicio = time.perf_counter()
+            resultado = carregar(*args, **kwargs)
+            incrementar("painelgestor_dataset_cargas_total", dataset=dataset)
+            definir("painelgestor_dataset_carga_segundos", time.perf_counter() - inicio, dataset=dataset)
+            definir("painelgestor_dataset_memoria_bytes", memoria_dataframes(resultado), dataset=dataset)
+            return resultado
+        return carregar_medido
+    return decorador
+
+# Função para obter a memória residente do processo em bytes (None quando não for possível medir)
+def _memoria_residente():
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Função para escapar o valor de um rótulo no formato de texto do Prometheus
+def _escapar(valor):
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+# Função para montar o nome da série com os rótulos (ex.: nome{dataset="despesas"})
+def _serie(nome, rotulos):
+    if not rotulos:
+        return nome
+    return nome + "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in rotulos) + "}"
+
+# Função para calcular um quantil (vizinho mais próximo) de uma lista já ordenada
+def _quantil(ordenados, quantil):
+    return ordenados[min(len(ordenados) - 1, int(quantil * len(ordenados)))]
+
+# Função para gerar o texto de todas as métricas no formato de exposição do Prometheus
+def exportar_texto():
+    memoria = _memoria_residente()
+    if memoria is not None:
+        definir("painelgestor_memoria_residente_bytes", memoria)
+
+    with _lock:
+        valores = dict(_valores)
+        observacoes = {chave: (sorted(serie["recentes"]), serie["quantidade"], serie["soma"]) for chave, serie in _observacoes.items()}
+
+    linhas = []
+    for nome, (tipo, descricao) in METRICAS.items():
+        linhas.append(f"# HELP {nome} {descricao}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+
+        if tipo == "summary":
+            for (nome_serie, rotulos), (ordenados, quantidade, soma) in sorted(observacoes.items()):
+                if nome_serie != nome:
+                    continue
+                for quantil in QUANTIS:
+                    linhas.append(f"{_serie(nome, rotulos + (('quantile', str(quantil)),))} {_quantil(ordenados, quantil)}")
+                linhas.append(f"{_serie(nome + '_sum', rotulos)} {soma}")
+                linhas.append(f"{_serie(nome + '_count', rotulos)} {quantidade}")
+        else:
+            for (nome_serie, rotulos), valor in sorted(valores.items()):
+                if nome_serie == nome:
+                    linhas.append(f"{_serie(nome, rotulos)} {valor}")
+
+    return "\n".join(linhas) + "\n"
+
+# Função para gravar as métricas no arquivo (troca atômica, o coletor nunca lê um arquivo pela metade)
+def gravar_arquivo(caminho=ARQUIVO_METRICAS, permissao=PERMISSAO_ARQUIVO):
+    """O arquivo temporário é criado com permissão 0600 e recebe a permissão informada antes da troca."""
+    pasta = os.path.dirname(caminho) or "."
+    os.makedirs(pasta, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=pasta, suffix=".tmp", delete=False) as arquivo:
+        try:
+            arquivo.write(exportar_texto())
+        except BaseException:
+            arquivo.close()
+            os.remove(arquivo.name)
+            raise
+    try:
+        os.chmod(arquivo.name, permissao)
+        os.replace(arquivo.name, caminho)
+    except OSError:
+        os.remove(arquivo.name)
+        raise
+
+# Função executada na thread de exportação: grava o arquivo periodicamente
+def _exportar_periodicamente(caminho, intervalo, permissao):
+    falhando = False
+    while True:
+        try:
+            gravar_arquivo(caminho, permissao)
+            if falhando:
+                _logger.warning("Exportação das métricas para %s restabelecida", caminho)
+            falhando = False
+        except OSError:
+            # Falha de disco não deve derrubar a thread; registrada apenas na primeira tentativa de uma sequência de falhas
+            if not falhando:
+                _logger.warning("Falha ao gravar as métricas em %s; o arquivo fica desatualizado até a próxima gravação", caminho, exc_info=True)
+            falhando = True
+        time.sleep(intervalo)
+
+# Função para iniciar a exportação das métricas em segundo plano (executada uma única vez por processo)
+@st.cache_resource
+def iniciar_exportacao():
+    caminho = st.secrets.get("METRICAS_ARQUIVO", ARQUIVO_METRICAS)
+    intervalo = st.secrets.get("METRICAS_INTERVALO", INTERVALO_EXPORTACAO)
+    permissao = int(str(st.secrets.get("METRICAS_PERMISSAO", f"{PERMISSAO_ARQUIVO:o}")), 8)
+    thread = threading.Thread(target=_exportar_periodicamente, args=(caminho, intervalo, permissao), name="metricas-exportacao", daemon=True)
+    thread.start()
+    return thread
@@ -3,7 +3,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from sidebar import load_sidebar
-from data_loader import load_dotacao_data, load_data, load_restos_data   # Importa bases de DOTAÇÃO e DESPESAS
+from orcamento_modelo import (
+    carregar_dotacao_orcamento, carregar_fatos_execucao, carregar_restos_anual, carregar_cubo_ug_ano,
+    calcular_ranking_ugs, INDICADORES_RANKING
+)
+from aquecimento import em_carregamento, aguardar_datasets
+from calculos.orcamento import percentuais_execucao, indicadores_execucao
+from graficos import grafico_em_cache, versao_dataset
+from instrumentacao import medir, registrar_contexto
 
 # Função para formatar valores abreviados
 def format_value_abbr(value):
@@ -39,75 +46,52 @@ colunas_formatadas = {
 }
 
 def run_dashboard():
-    # Carregar dados de dotação orçamentária e despesas
-    df_dotacao = load_dotacao_data()
-    df_despesas = load_data().copy()
-    df_restos = load_restos_data()
+    # Carregar as bases do Orçamento já normalizadas e tipadas (UG, ANO e MES inteiros)
+    with medir("carga dos dados"):
+        df_dotacao = carregar_dotacao_orcamento()
+        df_fatos = carregar_fatos_execucao()  # Dotação e execução das despesas por (UG, ANO, MES)
 
+        # Restos a pagar é secundário nesta página: se ainda estiver em carregamento, a página é exibida sem ele
+        restos_em_carregamento = em_carregamento('restos')
+        df_restos_anual = pd.DataFrame() if restos_em_carregamento else carregar_restos_anual()  # Totais por (UG, ANO)
 
-    if df_dotacao.empty or df_despesas.empty or df_restos.empty:
+    if df_dotacao.empty or df_fatos.empty or (df_restos_anual.empty and not restos_em_carregamento):
         st.error("Erro: Dados não carregados corretamente. Verifique se os arquivos .parquet estão na pasta correta no Google Drive.")
         return
 
-    # Normalizar os nomes das colunas (mantendo maiúsculas para evitar erro)
-    df_dotacao.columns = df_dotacao.columns.str.strip().str.upper()
-    df_despesas.columns = df_despesas.columns.str.strip().str.upper()
-    df_restos.columns = df_restos.columns.str.strip().str.upper()
-
-    # Garantir que as colunas necessárias existem
-    required_columns_dotacao = {"ANO", "UG", "PODER", "UO", "FUNCAO", "VALOR_DOTACAO_INICIAL"}
-    required_columns_despesas = {"ANO", "UG", "VALOR_EMPENHADO", "VALOR_LIQUIDADO", "VALOR_PAGO"}
-
-    if not required_columns_dotacao.issubset(df_dotacao.columns):
-        st.error(f"Erro: O dataset de dotação não contém todas as colunas necessárias: {required_columns_dotacao}")
-        return
-
-    if not required_columns_despesas.issubset(df_despesas.columns):
-        st.error(f"Erro: O dataset de despesas não contém todas as colunas necessárias: {required_columns_despesas}")
-        return
-
     # Carregar os filtros do sidebar
-    filtros_sidebar = load_sidebar(df_dotacao, "Orçamento")
+    with medir("sidebar"):
+        filtros_sidebar = load_sidebar(df_dotacao, "Orçamento")
 
     if filtros_sidebar is None:
         st.error("Erro: Nenhuma UG foi selecionada. Selecione pelo menos uma UG no sidebar.")
         return
 
     selected_ugs_orcamento, selected_ano, selected_mes = filtros_sidebar
+    selected_ugs_orcamento = [int(ug) for ug in selected_ugs_orcamento]
+    selected_ano = [int(selected_ano[0]), int(selected_ano[1])]
+    registrar_contexto(ugs=selected_ugs_orcamento, anos=selected_ano, meses=selected_mes)
 
-    # Garantir que MES seja numérico para evitar erros de comparação
-    df_restos["MES"] = pd.to_numeric(df_restos["MES"], errors="coerce")
+    # Chave do cache de gráficos: filtros que definem o conteúdo dos gráficos e versão dos dados
+    filtros_graficos = (selected_ugs_orcamento, selected_ano)
+    versao_dados = versao_dataset(df_dotacao, df_fatos)
 
-    # Garantir que UG está no mesmo formato (string)
-    df_restos["UG"] = df_restos["UG"].astype(str)
-    df_dotacao["UG"] = df_dotacao["UG"].astype(str)
-    selected_ugs_orcamento = [str(ug) for ug in selected_ugs_orcamento]
+    # Filtrar os dados conforme os filtros do sidebar
+    with medir("filtro"):
+        df_dotacao_filtered = df_dotacao[
+            (df_dotacao["UG"].isin(selected_ugs_orcamento)) &
+            (df_dotacao["ANO"] >= selected_ano[0]) &
+            (df_dotacao["ANO"] <= selected_ano[1])
+        ]
 
-    # Garantir que ANO é numérico
-    df_restos["ANO"] = pd.to_numeric(df_restos["ANO"], errors="coerce")
-    df_dotacao["ANO"] = pd.to_numeric(df_dotacao["ANO"], errors="coerce")
-    selected_ano = [int(selected_ano[0]), int(selected_ano[1])]
+        df_fatos_filtered = df_fatos[
+            (df_fatos["UG"].isin(selected_ugs_orcamento)) &
+            (df_fatos["ANO"] >= selected_ano[0]) &
+            (df_fatos["ANO"] <= selected_ano[1])
+        ]
 
-    # Filtrar os dados conforme os filtros do sidebar
-    df_dotacao_filtered = df_dotacao[df_dotacao["UG"].isin(selected_ugs_orcamento)]
-    df_dotacao_filtered = df_dotacao_filtered[
-        (df_dotacao_filtered["ANO"] >= selected_ano[0]) & 
-        (df_dotacao_filtered["ANO"] <= selected_ano[1])
-    ]
-
-    df_despesas_filtered = df_despesas[df_despesas["UG"].isin(selected_ugs_orcamento)]
-    df_despesas_filtered = df_despesas_filtered[
-        (df_despesas_filtered["ANO"] >= selected_ano[0]) & 
-        (df_despesas_filtered["ANO"] <= selected_ano[1])
-    ]
-
-    # Filtrar os datasets conforme os filtros selecionados, incluindo o mês 0
-    df_restos_filtered = df_restos[df_restos["UG"].isin(selected_ugs_orcamento)]
-    df_restos_filtered = df_restos_filtered[
-        (df_restos_filtered["ANO"] >= selected_ano[0]) & 
-        (df_restos_filtered["ANO"] <= selected_ano[1]) & 
-        (df_restos_filtered["MES"].between(0, 12))  # Inclui mês 0 até 12
-    ]
+        # Linhas da tabela de execução que vieram da dotação (base dos totais das abas 1 e 5)
+        df_fatos_dotacao = df_fatos_filtered[df_fatos_filtered["TEM_DOTACAO"]]
 
     # Definir um valor padrão para evitar erro caso a condição não seja atendida
     selected_ug_description = "Descrição não encontrada"
@@ -121,19 +105,23 @@ def run_dashboard():
     # Exibir o subtítulo sem os colchetes
     st.markdown(f'<h3 style="font-size:20px;"> {selected_ug_description}</h3>', unsafe_allow_html=True)
 
+    # Atualizar a página automaticamente quando os restos a pagar terminarem de carregar
+    if restos_em_carregamento:
+        aguardar_datasets(('restos',))
+
     # Criar TABS para organizar os gráficos
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "Visão Geral", "Distribuição da Dotação", "Restos a Pagar", 
-        "Execução Orçamentária", "Indicadores Orçamentários"
+        "Execução Orçamentária", "Indicadores Orçamentários", "Ranking das UGs"
     ])
 
        # ================= TAB 1: VISÃO GERAL =================
-    with tab1:
+    with tab1, medir("aba Visão Geral"):
         # Calcular os valores totais da dotação
-        total_dotacao_inicial = df_dotacao_filtered["VALOR_DOTACAO_INICIAL"].sum()
-        total_adicional = df_dotacao_filtered["VALOR_CREDITO_ADICIONAL"].sum()
-        total_reduzido = df_dotacao_filtered["VALOR_REMANEJAMENTO"].sum()
-        total_dotacao_atualizada = df_dotacao_filtered["VALOR_ATUALIZADO"].sum()
+        total_dotacao_inicial = df_fatos_dotacao["VALOR_DOTACAO_INICIAL"].sum()
+        total_adicional = df_fatos_dotacao["VALOR_CREDITO_ADICIONAL"].sum()
+        total_reduzido = df_fatos_dotacao["VALOR_REMANEJAMENTO"].sum()
+        total_dotacao_atualizada = df_fatos_dotacao["VALOR_ATUALIZADO"].sum()
 
         # Exibir métricas no layout de colunas
         col1, col2, col3, col4 = st.columns(4)
@@ -142,35 +130,40 @@ def run_dashboard():
         col3.metric("Reduzido", f"R$ {total_reduzido:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
         col4.metric("Dotação Atualizada", f"R$ {total_dotacao_atualizada:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
 
-        # Agregar valores por ano
-        df_execucao = df_dotacao_filtered.groupby("ANO")[["VALOR_ATUALIZADO", "VALOR_EMPENHADO", "VALOR_LIQUIDADO", "VALOR_PAGO"]].sum().reset_index()
+        # Agregação e gráfico reaproveitados do cache quando os filtros não mudaram
+        def construir_grafico_execucao():
+            # Agregar valores por ano
+            df_execucao = df_fatos_dotacao.groupby("ANO")[["VALOR_ATUALIZADO", "VALOR_EMPENHADO", "VALOR_LIQUIDADO", "VALOR_PAGO"]].sum().reset_index()
 
-        # Criar coluna formatada para exibição na barra
-        df_execucao_melted = df_execucao.melt(id_vars=["ANO"], var_name="Tipo", value_name="Valor")
-        df_execucao_melted["Valor_Abrev"] = df_execucao_melted["Valor"].apply(format_value_abbr)
+            # Criar coluna formatada para exibição na barra
+            df_execucao_melted = df_execucao.melt(id_vars=["ANO"], var_name="Tipo", value_name="Valor")
+            df_execucao_melted["Valor_Abrev"] = df_execucao_melted["Valor"].apply(format_value_abbr)
 
-        # Mapeamento dos nomes das colunas para legendas mais amigáveis
-        nome_legenda = {
-            "VALOR_ATUALIZADO": "Dotação Atualizada",
-            "VALOR_EMPENHADO": "Empenhado",
-            "VALOR_LIQUIDADO": "Liquidado",
-            "VALOR_PAGO": "Pago"
-        }
+            # Mapeamento dos nomes das colunas para legendas mais amigáveis
+            nome_legenda = {
+                "VALOR_ATUALIZADO": "Dotação Atualizada",
+                "VALOR_EMPENHADO": "Empenhado",
+                "VALOR_LIQUIDADO": "Liquidado",
+                "VALOR_PAGO": "Pago"
+            }
 
-        # Renomear os valores na coluna 'Tipo' usando o dicionário
-        df_execucao_melted["Tipo"] = df_execucao_melted["Tipo"].map(nome_legenda)
-
-        # Criar gráfico de barras agrupadas
-        fig_execucao_completa = px.bar(
-            df_execucao_melted, x="ANO", y="Valor", color="Tipo",
-            text="Valor_Abrev",
-            title="Comparação da Dotação e Execução Financeira por Ano",
-            labels={"Valor": "Valor (R$)", "ANO": "Ano", "Tipo": "Execução"},
-            barmode="group",
-            color_discrete_sequence=px.colors.sequential.Turbo
-        )
+            # Renomear os valores na coluna 'Tipo' usando o dicionário
+            df_execucao_melted["Tipo"] = df_execucao_melted["Tipo"].map(nome_legenda)
+
+            # Criar gráfico de barras agrupadas
+            fig_execucao_completa = px.bar(
+                df_execucao_melted, x="ANO", y="Valor", color="Tipo",
+                text="Valor_Abrev",
+                title="Comparação da Dotação e Execução Financeira por Ano",
+                labels={"Valor": "Valor (R$)", "ANO": "Ano", "Tipo": "Execução"},
+                barmode="group",
+                color_discrete_sequence=px.colors.sequential.Turbo
+            )
 
-        fig_execucao_completa.update_traces(textposition="outside")
+            fig_execucao_completa.update_traces(textposition="outside")
+            return fig_execucao_completa, df_execucao
+
+        fig_execucao_completa, df_execucao = grafico_em_cache('orcamento', 'execucao_por_ano', filtros_graficos, versao_dados, construir_grafico_execucao)
 
         # Exibir gráfico no Streamlit
         st.plotly_chart(fig_execucao_completa, use_container_width=True)
@@ -214,7 +207,7 @@ def run_dashboard():
 
 
     # ================= TAB 2: DISTRIBUIÇÃO DA DOTAÇÃO =================
-    with tab2:
+    with tab2, medir("aba Distribuição da Dotação"):
        
         # Calcular total da dotação apenas considerando valores na NATUREZA3
         total_natureza3 = df_dotacao_filtered["VALOR_DOTACAO_INICIAL"].sum()
@@ -337,176 +330,150 @@ def run_dashboard():
 
 
     # ================= TAB 3: RESTOS A PAGAR =================
-    with tab3:
-        # Converter colunas para numérico
-        for col in ["VALOR_INSCRITO", "VALOR_INSCRITO_EXE_ANTERIOR", "VALOR_CANCELADO", "VALOR_BLOQUEADO", "VALOR_PAGO", "VALOR_A_PAGAR"]:
-            df_restos_filtered[col] = pd.to_numeric(df_restos_filtered[col], errors="coerce").fillna(0)
-
-        # Criar uma cópia do DataFrame excluindo o mês 12 SOMENTE para VALOR_INSCRITO
-        df_restos_filtered_no_dezembro = df_restos_filtered[df_restos_filtered["MES"] != 12]
-
-        # Calcular valores agregados por ano (para todas as colunas, sem exceções)
-        df_restos_aggregated = df_restos_filtered.groupby("ANO").agg({
-            "VALOR_INSCRITO_EXE_ANTERIOR": "sum",
-            "VALOR_CANCELADO": "sum",
-            "VALOR_BLOQUEADO": "sum",
-            "VALOR_PAGO": "sum",
-            "VALOR_A_PAGAR": "sum"
-        }).reset_index()
-
-        # Agora adicionamos a soma de VALOR_INSCRITO apenas com meses 1 a 11
-        valor_inscrito_sem_mes_12 = df_restos_filtered_no_dezembro.groupby("ANO")["VALOR_INSCRITO"].sum().reset_index()
-
-        # Mesclar as informações corretas no dataframe final
-        df_restos_aggregated = df_restos_aggregated.merge(valor_inscrito_sem_mes_12, on="ANO", how="left")
-
-        # Criar colunas formatadas para exibição NO TOPO DAS BARRAS (ABREVIADO)
-        df_restos_aggregated["Inscrito Abrev"] = df_restos_aggregated["VALOR_INSCRITO"].apply(format_value_abbr)
-        df_restos_aggregated["Pago Abrev"] = df_restos_aggregated["VALOR_PAGO"].apply(format_value_abbr)
-        df_restos_aggregated["A Pagar Abrev"] = df_restos_aggregated["VALOR_A_PAGAR"].apply(format_value_abbr)
-
-        # Criar colunas formatadas como moeda para HOVER
-        df_restos_aggregated["VALOR_INSCRITO_FORMATADO"] = df_restos_aggregated["VALOR_INSCRITO"].apply(formatar_moeda)
-        df_restos_aggregated["VALOR_PAGO_FORMATADO"] = df_restos_aggregated["VALOR_PAGO"].apply(formatar_moeda)
-        df_restos_aggregated["VALOR_A_PAGAR_FORMATADO"] = df_restos_aggregated["VALOR_A_PAGAR"].apply(formatar_moeda)
-
-        # Mapeamento de legendas para nomes amigáveis
-        legenda_mapeada = {
-            "VALOR_INSCRITO": "Valor Inscrito",
-            "VALOR_PAGO": "Valor Pago",
-            "VALOR_A_PAGAR": "Valor a Pagar"
-        }
-
-        # Criar gráfico de barras com valores formatados
-        fig_restos = px.bar(
-            df_restos_aggregated, 
-            x="ANO", 
-            y=["VALOR_INSCRITO", "VALOR_PAGO", "VALOR_A_PAGAR"],  
-            labels={
-                "value": "Valor (R$)", 
-                "ANO": "Ano", 
-                "variable": "Categoria"
-            },
-            barmode="group",
-            title="Restos a Pagar: Valor Inscrito vs Pago vs A Pagar",
-            text_auto=False,
-            color_discrete_sequence=px.colors.sequential.PuBu_r
-        )
+    with tab3, medir("aba Restos a Pagar"):
+        if restos_em_carregamento:
+            st.info("Os dados de restos a pagar ainda estão sendo carregados. Esta aba será atualizada automaticamente.")
+        else:
+            # Selecionar os totais anuais pré-calculados (meses 0 a 12; valor inscrito sem o mês 12)
+            df_restos_filtered = df_restos_anual[
+                (df_restos_anual["UG"].isin(selected_ugs_orcamento)) &
+                (df_restos_anual["ANO"] >= selected_ano[0]) &
+                (df_restos_anual["ANO"] <= selected_ano[1])
+            ]
 
-        # Atualizar rótulos das barras com valores ABREVIADOS
-        for trace, column in zip(fig_restos.data, ["Inscrito Abrev", "Pago Abrev", "A Pagar Abrev"]):
-            trace.text = df_restos_aggregated[column]  # Exibir apenas o valor abreviado correto
-            trace.textposition = "outside"
-
-        # Ajustar o hover para exibir APENAS o valor correto da barra onde o mouse está passando
-        for trace, column, hover_column in zip(
-            fig_restos.data, 
-            ["VALOR_INSCRITO", "VALOR_PAGO", "VALOR_A_PAGAR"],
-            ["VALOR_INSCRITO_FORMATADO", "VALOR_PAGO_FORMATADO", "VALOR_A_PAGAR_FORMATADO"]
-        ):
-            trace.customdata = df_restos_aggregated[hover_column]  # Cada barra recebe apenas seu próprio valor formatado
-            trace.hovertemplate = "<b>Ano:</b> %{x}<br><b>Valor:</b> %{customdata}<extra></extra>"
-
-        # Atualizar a legenda com os nomes amigáveis
-        fig_restos.for_each_trace(lambda t: t.update(name=legenda_mapeada[t.name]))
-
-        # Exibir gráfico atualizado
-        st.plotly_chart(fig_restos, use_container_width=True)
-
-        # ================= Tabela reordenada =================
-        st.subheader("Tabela Completa de Restos a Pagar por Ano")
-
-        # Selecionar apenas as colunas relevantes e reordená-las
-        df_restos_table = df_restos_aggregated[[
-            "ANO",
-            "VALOR_INSCRITO",
-            "VALOR_INSCRITO_EXE_ANTERIOR",
-            "VALOR_BLOQUEADO",
-            "VALOR_CANCELADO",
-            "VALOR_PAGO",
-            "VALOR_A_PAGAR"
-        ]].copy()
-
-        # Formatar valores para exibição como moeda, exceto a coluna "ANO"
-        for col in df_restos_table.columns:
-            if col != "ANO":
-                df_restos_table[col] = df_restos_table[col].apply(formatar_moeda)
-
-        # Renomear colunas para exibição final
-        df_restos_table = df_restos_table.rename(columns={
-            "ANO": "Ano",
-            "VALOR_INSCRITO": "Valor Inscrito",
-            "VALOR_INSCRITO_EXE_ANTERIOR": "Valor Inscrito Exercício Anterior",
-            "VALOR_BLOQUEADO": "Valor Bloqueado",
-            "VALOR_CANCELADO": "Valor Cancelado",
-            "VALOR_PAGO": "Valor Pago",
-            "VALOR_A_PAGAR": "Valor a Pagar"
-        })
+            # Somar as UGs selecionadas em cada ano
+            df_restos_aggregated = (
+                df_restos_filtered.drop(columns=["UG", "VALOR_INSCRITO"])
+                .groupby("ANO", as_index=False).sum()
+                .rename(columns={"VALOR_INSCRITO_SEM_DEZEMBRO": "VALOR_INSCRITO"})
+            )
 
-        #  Remover linhas vazias no final da tabela
-        df_restos_table = df_restos_table.loc[df_restos_table.iloc[:, 1:].notna().any(axis=1)]
+            # Criar colunas formatadas para exibição NO TOPO DAS BARRAS (ABREVIADO)
+            df_restos_aggregated["Inscrito Abrev"] = df_restos_aggregated["VALOR_INSCRITO"].apply(format_value_abbr)
+            df_restos_aggregated["Pago Abrev"] = df_restos_aggregated["VALOR_PAGO"].apply(format_value_abbr)
+            df_restos_aggregated["A Pagar Abrev"] = df_restos_aggregated["VALOR_A_PAGAR"].apply(format_value_abbr)
+
+            # Criar colunas formatadas como moeda para HOVER
+            df_restos_aggregated["VALOR_INSCRITO_FORMATADO"] = df_restos_aggregated["VALOR_INSCRITO"].apply(formatar_moeda)
+            df_restos_aggregated["VALOR_PAGO_FORMATADO"] = df_restos_aggregated["VALOR_PAGO"].apply(formatar_moeda)
+            df_restos_aggregated["VALOR_A_PAGAR_FORMATADO"] = df_restos_aggregated["VALOR_A_PAGAR"].apply(formatar_moeda)
+
+            # Mapeamento de legendas para nomes amigáveis
+            legenda_mapeada = {
+                "VALOR_INSCRITO": "Valor Inscrito",
+                "VALOR_PAGO": "Valor Pago",
+                "VALOR_A_PAGAR": "Valor a Pagar"
+            }
+
+            # Criar gráfico de barras com valores formatados
+            fig_restos = px.bar(
+                df_restos_aggregated, 
+                x="ANO", 
+                y=["VALOR_INSCRITO", "VALOR_PAGO", "VALOR_A_PAGAR"],  
+                labels={
+                    "value": "Valor (R$)", 
+                    "ANO": "Ano", 
+                    "variable": "Categoria"
+                },
+                barmode="group",
+                title="Restos a Pagar: Valor Inscrito vs Pago vs A Pagar",
+                text_auto=False,
+                color_discrete_sequence=px.colors.sequential.PuBu_r
+            )
 
-        #  Exibir a tabela formatada ocupando toda a largura
-        st.dataframe(
-            df_restos_table.style.set_properties(**{'width': '100%'}),
-            use_container_width=True
-        )
+            # Atualizar rótulos das barras com valores ABREVIADOS
+            for trace, column in zip(fig_restos.data, ["Inscrito Abrev", "Pago Abrev", "A Pagar Abrev"]):
+                trace.text = df_restos_aggregated[column]  # Exibir apenas o valor abreviado correto
+                trace.textposition = "outside"
+
+            # Ajustar o hover para exibir APENAS o valor correto da barra onde o mouse está passando
+            for trace, column, hover_column in zip(
+                fig_restos.data, 
+                ["VALOR_INSCRITO", "VALOR_PAGO", "VALOR_A_PAGAR"],
+                ["VALOR_INSCRITO_FORMATADO", "VALOR_PAGO_FORMATADO", "VALOR_A_PAGAR_FORMATADO"]
+            ):
+                trace.customdata = df_restos_aggregated[hover_column]  # Cada barra recebe apenas seu próprio valor formatado
+                trace.hovertemplate = "<b>Ano:</b> %{x}<br><b>Valor:</b> %{customdata}<extra></extra>"
+
+            # Atualizar a legenda com os nomes amigáveis
+            fig_restos.for_each_trace(lambda t: t.update(name=legenda_mapeada[t.name]))
+
+            # Exibir gráfico atualizado
+            st.plotly_chart(fig_restos, use_container_width=True)
+
+            # ================= Tabela reordenada =================
+            st.subheader("Tabela Completa de Restos a Pagar por Ano")
+
+            # Selecionar apenas as colunas relevantes e reordená-las
+            df_restos_table = df_restos_aggregated[[
+                "ANO",
+                "VALOR_INSCRITO",
+                "VALOR_INSCRITO_EXE_ANTERIOR",
+                "VALOR_BLOQUEADO",
+                "VALOR_CANCELADO",
+                "VALOR_PAGO",
+                "VALOR_A_PAGAR"
+            ]].copy()
+
+            # Formatar valores para exibição como moeda, exceto a coluna "ANO"
+            for col in df_restos_table.columns:
+                if col != "ANO":
+                    df_restos_table[col] = df_restos_table[col].apply(formatar_moeda)
 
+            # Renomear colunas para exibição final
+            df_restos_table = df_restos_table.rename(columns={
+                "ANO": "Ano",
+                "VALOR_INSCRITO": "Valor Inscrito",
+                "VALOR_INSCRITO_EXE_ANTERIOR": "Valor Inscrito Exercício Anterior",
+                "VALOR_BLOQUEADO": "Valor Bloqueado",
+                "VALOR_CANCELADO": "Valor Cancelado",
+                "VALOR_PAGO": "Valor Pago",
+                "VALOR_A_PAGAR": "Valor a Pagar"
+            })
 
-    # ================= TAB 4: EXECUÇÃO ORÇAMENTÁRIA =================
-    with tab4:
+            #  Remover linhas vazias no final da tabela
+            df_restos_table = df_restos_table.loc[df_restos_table.iloc[:, 1:].notna().any(axis=1)]
 
-        # Garantir que UG e ANO são do mesmo tipo nos dataframes
-        df_despesas["UG"] = df_despesas["UG"].astype(str)
-        df_despesas["ANO"] = pd.to_numeric(df_despesas["ANO"], errors="coerce")
+            #  Exibir a tabela formatada ocupando toda a largura
+            st.dataframe(
+                df_restos_table.style.set_properties(**{'width': '100%'}),
+                use_container_width=True
+            )
 
-        df_dotacao["UG"] = df_dotacao["UG"].astype(str)
-        df_dotacao["ANO"] = pd.to_numeric(df_dotacao["ANO"], errors="coerce")
 
-        selected_ugs_orcamento = [str(ug) for ug in selected_ugs_orcamento]
-        selected_ano = [int(selected_ano[0]), int(selected_ano[1])]
+    # ================= TAB 4: EXECUÇÃO ORÇAMENTÁRIA =================
+    with tab4, medir("aba Execução Orçamentária"):
 
-        # Verificar se os filtros realmente estão funcionando corretamente
-        df_despesas_filtered = df_despesas[
-            (df_despesas["UG"].isin(selected_ugs_orcamento)) & 
-            (df_despesas["ANO"] >= selected_ano[0]) & 
-            (df_despesas["ANO"] <= selected_ano[1])
-        ]
+        # Verificar se há dotação e despesas para os filtros aplicados
+        possui_dotacao = df_fatos_filtered["TEM_DOTACAO"].any()
+        possui_despesas = df_fatos_filtered["TEM_DESPESA"].any()
 
         # Se ainda estiver vazio, mostrar quais UGs e ANOs deveriam ser filtrados
-        if df_despesas_filtered.empty:
+        if not possui_despesas:
             st.warning("⚠️ Não há dados disponíveis para exibição com os filtros aplicados.")
             st.write("🔍 Debug: Nenhum dado encontrado para UGs e ANO selecionados")
  
         # Verificar se os DataFrames filtrados estão vazios
-        if df_dotacao_filtered.empty or df_despesas_filtered.empty:
+        if not possui_dotacao or not possui_despesas:
             st.warning("⚠️ Não há dados disponíveis para exibição com os filtros aplicados.")
         else:
-            # Agregar valores por ano para cálculo da execução financeira
-            df_execucao_financeira = df_dotacao_filtered.groupby("ANO").agg({
-                "VALOR_DOTACAO_INICIAL": "sum",
-                "VALOR_CREDITO_ADICIONAL": "sum",
-                "VALOR_REMANEJAMENTO": "sum",
-                "VALOR_ATUALIZADO": "sum"
-            }).reset_index()
-
-            df_despesas_agg = df_despesas_filtered.groupby("ANO").agg({
-                "VALOR_EMPENHADO": "sum",
-                "VALOR_LIQUIDADO": "sum",
-                "VALOR_PAGO": "sum"
-            }).reset_index()
-
-            # Mesclar os dados de execução financeira com os dados de despesas
-            df_execucao_financeira = df_execucao_financeira.merge(df_despesas_agg, on="ANO", how="left").fillna(0)
-
-            # Calcular percentuais de execução
-            df_execucao_financeira["% Execução Empenhada"] = (df_execucao_financeira["VALOR_EMPENHADO"] / df_execucao_financeira["VALOR_ATUALIZADO"]) * 100
-            df_execucao_financeira["% Liquidação"] = (df_execucao_financeira["VALOR_LIQUIDADO"] / df_execucao_financeira["VALOR_ATUALIZADO"]) * 100
-            df_execucao_financeira["% Pagamento"] = (df_execucao_financeira["VALOR_PAGO"] / df_execucao_financeira["VALOR_ATUALIZADO"]) * 100
-
-            # Evitar divisão por zero e corrigir valores infinitos
-            df_execucao_financeira.replace([float('inf'), float('-inf')], 0, inplace=True)
-            df_execucao_financeira.fillna(0, inplace=True)
+            # Agregar a tabela de execução por ano (dotação e execução das despesas já estão unidas)
+            df_execucao_financeira = df_fatos_filtered.groupby("ANO").agg(
+                VALOR_DOTACAO_INICIAL=("VALOR_DOTACAO_INICIAL", "sum"),
+                VALOR_CREDITO_ADICIONAL=("VALOR_CREDITO_ADICIONAL", "sum"),
+                VALOR_REMANEJAMENTO=("VALOR_REMANEJAMENTO", "sum"),
+                VALOR_ATUALIZADO=("VALOR_ATUALIZADO", "sum"),
+                VALOR_EMPENHADO=("VALOR_EMPENHADO_DESPESA", "sum"),
+                VALOR_LIQUIDADO=("VALOR_LIQUIDADO_DESPESA", "sum"),
+                VALOR_PAGO=("VALOR_PAGO_DESPESA", "sum"),
+                TEM_DOTACAO=("TEM_DOTACAO", "any")
+            ).reset_index()
+
+            # Manter apenas os anos com dotação
+            df_execucao_financeira = df_execucao_financeira[df_execucao_financeira["TEM_DOTACAO"]].drop(columns="TEM_DOTACAO")
+
+            # Calcular percentuais de execução (divisão por zero resulta em 0)
+            df_execucao_financeira = percentuais_execucao(df_execucao_financeira).fillna(0)
 
             # Criar um DataFrame para o gráfico de barras
             df_execucao_melted = df_execucao_financeira.melt(
@@ -579,22 +546,17 @@ def run_dashboard():
             )
 
     # ================= TAB 5: INDICADORES =================
-    with tab5:
+    with tab5, medir("aba Indicadores Orçamentários"):
 
         st.subheader("Indicadores Orçamentários")
 
-        # Garantir que os valores não sejam zero para evitar divisão por zero
-        valor_dotacao_atualizada = df_dotacao_filtered["VALOR_ATUALIZADO"].sum() or 1  # Se for 0, define como 1
-        valor_empenhado = df_dotacao_filtered["VALOR_EMPENHADO"].sum() or 1
-        valor_liquidado = df_dotacao_filtered["VALOR_LIQUIDADO"].sum()
-        valor_pago = df_dotacao_filtered["VALOR_PAGO"].sum()
-
-        # Cálculo dos percentuais
-        empenho_dotacao = (valor_empenhado / valor_dotacao_atualizada) * 100
-        credito_disponivel = ((valor_dotacao_atualizada - valor_empenhado) / valor_dotacao_atualizada) * 100
-        pagamento_empenho = (valor_pago / valor_empenhado) * 100
-        liquidacao_empenho = (valor_liquidado / valor_empenhado) * 100
-        dotacao_paga = (valor_pago / valor_dotacao_atualizada) * 100
+        # Calcular os indicadores a partir dos totais do período
+        indicadores = indicadores_execucao(
+            df_fatos_dotacao["VALOR_ATUALIZADO"].sum(),
+            df_fatos_dotacao["VALOR_EMPENHADO"].sum(),
+            df_fatos_dotacao["VALOR_LIQUIDADO"].sum(),
+            df_fatos_dotacao["VALOR_PAGO"].sum()
+        )
 
         # Criar colunas para os velocímetros
         col1, col2, col3 = st.columns(3)
@@ -620,23 +582,97 @@ def run_dashboard():
             ))
 
 
-        # Criar e exibir os gráficos nos respectivos lugares
+        # Criar os velocímetros uma única vez para cada combinação de filtros
+        def construir_velocimetros():
+            return (
+                criar_gauge(indicadores["empenho_dotacao"], indicadores["empenhado"], "Empenho da Dotação", "#FFD700"),
+                criar_gauge(indicadores["credito_disponivel_pct"], indicadores["credito_disponivel"], "Crédito Disponível", "#00FFFF"),
+                criar_gauge(indicadores["pagamento_empenho"], indicadores["pago"], "Pagamento do Empenho", "#32CD32"),
+                criar_gauge(indicadores["liquidacao_empenho"], indicadores["liquidado"], "Liquidação do Empenho", "#FF4500"),
+                criar_gauge(indicadores["dotacao_paga"], indicadores["pago"], "Dotação Atualizada Paga", "#9400D3")
+            )
+
+        fig_empenho, fig_credito, fig_pagamento, fig_liquidacao, fig_dotacao_paga = grafico_em_cache('orcamento', 'velocimetros', filtros_graficos, versao_dados, construir_velocimetros)
+
+        # Exibir os gráficos nos respectivos lugares
         with col1:
-            st.plotly_chart(criar_gauge(empenho_dotacao, valor_empenhado, "Empenho da Dotação", "#FFD700"), use_container_width=True)
+            st.plotly_chart(fig_empenho, use_container_width=True)
 
         with col2:
-            st.plotly_chart(criar_gauge(credito_disponivel, valor_dotacao_atualizada - valor_empenhado, "Crédito Disponível", "#00FFFF"), use_container_width=True)
+            st.plotly_chart(fig_credito, use_container_width=True)
 
         with col3:
-            st.plotly_chart(criar_gauge(pagamento_empenho, valor_pago, "Pagamento do Empenho", "#32CD32"), use_container_width=True)
+            st.plotly_chart(fig_pagamento, use_container_width=True)
 
         col4, col5 = st.columns(2)
 
         with col4:
-            st.plotly_chart(criar_gauge(liquidacao_empenho, valor_liquidado, "Liquidação do Empenho", "#FF4500"), use_container_width=True)
+            st.plotly_chart(fig_liquidacao, use_container_width=True)
 
         with col5:
-            st.plotly_chart(criar_gauge(dotacao_paga, valor_pago, "Dotação Atualizada Paga", "#9400D3"), use_container_width=True)        
+            st.plotly_chart(fig_dotacao_paga, use_container_width=True)
+
+    # ================= TAB 6: RANKING DAS UGs =================
+    with tab6, medir("aba Ranking das UGs"):
+        st.subheader("Ranking de Execução Orçamentária entre as UGs")
+        st.caption(f"Indicadores de todas as UGs no período de {selected_ano[0]} a {selected_ano[1]}.")
+
+        col1, col2 = st.columns([3, 1])
+        indicador_ordem = col1.selectbox("Ordenar o ranking por:", list(INDICADORES_RANKING.keys()), key="ranking_indicador")
+        ordem_crescente = col2.checkbox("Ordem crescente", value=False, key="ranking_crescente")
+
+        # Calcular os indicadores de todas as UGs a partir do cubo pré-calculado por (UG, ANO) e montar o gráfico
+        def construir_grafico_ranking():
+            df_ranking = calcular_ranking_ugs(carregar_cubo_ug_ano(), selected_ano)
+
+            # Ordenar e numerar as posições (UGs sem dados no período ficam no final)
+            df_ranking = df_ranking.sort_values(indicador_ordem, ascending=ordem_crescente, na_position="last").reset_index(drop=True)
+            df_ranking.insert(0, "Posição", range(1, len(df_ranking) + 1))
+            df_ranking["Selecionada"] = df_ranking["UG"].isin(selected_ugs_orcamento)
+
+            # Gráfico de barras destacando as UGs selecionadas no sidebar
+            df_grafico = df_ranking.dropna(subset=[indicador_ordem])
+            fig_ranking = px.bar(
+                df_grafico,
+                x=indicador_ordem,
+                y="SIGLA_UG",
+                orientation="h",
+                color="Selecionada",
+                color_discrete_map={True: "#FFD700", False: "#636EFA"},
+                text=df_grafico[indicador_ordem].apply(lambda x: f"{x:.1f}%"),
+                hover_data={"DESCRICAO_UG": True, "Selecionada": False},
+                labels={"SIGLA_UG": "UG", indicador_ordem: f"{indicador_ordem} (%)", "DESCRICAO_UG": "Descrição"},
+                title=f"{indicador_ordem} por UG"
+            )
+            fig_ranking.update_layout(
+                yaxis={"categoryorder": "array", "categoryarray": df_grafico["SIGLA_UG"].tolist()[::-1]},
+                height=max(400, 22 * len(df_grafico)),
+                showlegend=False
+            )
+            return fig_ranking, df_ranking
+
+        fig_ranking, df_ranking = grafico_em_cache(
+            'orcamento', 'ranking_ugs', (filtros_graficos, indicador_ordem, ordem_crescente), versao_dados, construir_grafico_ranking
+        )
+        st.plotly_chart(fig_ranking, use_container_width=True)
+
+        # Tabela completa com os três indicadores e a posição percentual de cada UG
+        df_ranking_table = df_ranking[
+            ["Posição", "UG", "SIGLA_UG", "DESCRICAO_UG", "VALOR_ATUALIZADO"]
+            + list(INDICADORES_RANKING.keys())
+            + [f"Percentil - {indicador_ordem}"]
+        ].rename(columns={
+            "SIGLA_UG": "Sigla",
+            "DESCRICAO_UG": "Descrição",
+            "VALOR_ATUALIZADO": "Dotação Atualizada",
+            f"Percentil - {indicador_ordem}": "Percentil"
+        })
+
+        df_ranking_table["Dotação Atualizada"] = df_ranking_table["Dotação Atualizada"].fillna(0).apply(formatar_moeda)
+        for coluna in list(INDICADORES_RANKING.keys()) + ["Percentil"]:
+            df_ranking_table[coluna] = df_ranking_table[coluna].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "-")
+
+        st.dataframe(df_ranking_table, use_container_width=True, hide_index=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+import pandas as pd
+import streamlit as st
+from data_loader import load_dotacao_data, load_parquet_data_from_drive, load_restos_data
+from cache_datasets import registrar_dependente, contabilizar_derivado
+from calculos.orcamento import (
+    COLUNAS_DOTACAO, COLUNAS_DESPESAS, INDICADORES_RANKING,
+    normalizar_colunas, preparar_dotacao, agregar_execucao_despesas, preparar_restos,
+    totais_anuais_restos, montar_fatos_execucao, cubo_ug_ano, ranking_ugs
+)
+
+# Função para obter a dotação orçamentária tipada (UG e ANO inteiros), preparada uma vez por carga
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('dotacao')
+def carregar_dotacao_orcamento():
+    df = load_dotacao_data()
+    if df.empty:
+        return df
+
+    df = normalizar_colunas(df)
+    if not COLUNAS_DOTACAO.issubset(df.columns):
+        st.error(f"Erro: O dataset de dotação não contém todas as colunas necessárias: {COLUNAS_DOTACAO}")
+        return pd.DataFrame()
+
+    return preparar_dotacao(df)
+
+# Função para obter a execução das despesas agregada por (UG, ANO, MES), sem copiar a base completa
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('despesas')
+def carregar_execucao_despesas():
+    df = load_parquet_data_from_drive()
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    if not COLUNAS_DESPESAS.issubset(coluna.strip().upper() for coluna in df.columns):
+        st.error(f"Erro: O dataset de despesas não contém todas as colunas necessárias: {COLUNAS_DESPESAS}")
+        return pd.DataFrame()
+
+    return agregar_execucao_despesas(df)
+
+# Função para obter os restos a pagar tipados (UG, ANO e MES inteiros), preparados uma vez por carga
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('restos')
+def carregar_restos_orcamento():
+    df = load_restos_data()
+    if df.empty:
+        return df
+
+    return preparar_restos(df)
+
+# Função para obter os totais anuais de restos a pagar por (UG, ANO), preparados uma vez por carga
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('restos')
+def carregar_restos_anual():
+    df_restos = carregar_restos_orcamento()
+    if df_restos.empty:
+        return pd.DataFrame()
+
+    return totais_anuais_restos(df_restos)
+
+# Função para obter a tabela de execução orçamentária por (UG, ANO, MES), unindo dotação e despesas uma vez por carga
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('dotacao')
+def carregar_fatos_execucao():
+    df_dotacao = carregar_dotacao_orcamento()
+    df_despesas = carregar_execucao_despesas()
+    if df_dotacao.empty or df_despesas.empty:
+        return pd.DataFrame()
+
+    return montar_fatos_execucao(df_dotacao, df_despesas)
+
+# Função para carregar a lista de UGs de interesse (código, descrição e sigla)
+@st.cache_resource(show_spinner=False)
+def carregar_ugs_interesse():
+    df_ugs = pd.read_csv("./database/UGS-COD-NOME-SIGLA.csv")
+    return df_ugs[["UG", "DESCRICAO_UG", "SIGLA_UG"]].astype({"UG": "int64"})
+
+# Função para obter o cubo de execução por (UG, ANO), base do ranking entre todas as UGs
+@st.cache_resource(show_spinner=False)
+@contabilizar_derivado('dotacao')
+def carregar_cubo_ug_ano():
+    df_fatos = carregar_fatos_execucao()
+    if df_fatos.empty:
+        return pd.DataFrame()
+
+    return cubo_ug_ano(df_fatos)
+
+# Função para calcular os indicadores de execução de todas as UGs de interesse no período informado
+def calcular_ranking_ugs(cubo, anos):
+    return ranking_ugs(cubo, anos, carregar_ugs_interesse())
+
+# Caches calculados sobre cada dataset: liberados quando o dataset de origem for descartado da memória
+registrar_dependente('dotacao', carregar_dotacao_orcamento.clear)
+registrar_dependente('despesas', carregar_execucao_despesas.clear)
+registrar_dependente('restos', carregar_restos_orcamento.clear)
+registrar_dependente('restos', carregar_restos_anual.clear)
+for nome in ('dotacao', 'despesas'):
+    registrar_dependente(nome, carregar_fatos_execucao.clear)
+    registrar_dependente(nome, carregar_cubo_ug_ano.clear)
@@ -0,0 +1,35 @@
+import importlib
+import time
+import metricas
+
+# Mapeamento do nome exibido na navegação para o módulo do dashboard correspondente.
+# Os módulos só são importados na primeira visita, evitando carregar bibliotecas pesadas
+# (wordcloud, matplotlib, langchain, etc.) na inicialização e na tela de login.
+PAGINAS = {
+    'Início': 'home',
+    'Despesas Detalhado': 'despesas_ug',
+    'Diárias': 'diarias',
+    'Contratos': 'contratos',
+    'Servidores': 'servidores',
+    'Orçamento': 'orcamento',
+    'Adiantamentos': 'adiantamentos',
+    'Combustível': 'combustivel',
+}
+
+# Função para importar (apenas na primeira visita) o módulo de uma página
+def carregar_pagina(nome_pagina):
+    nome_modulo = PAGINAS.get(nome_pagina)
+    if nome_modulo is None:
+        return None
+    # importlib mantém o módulo em sys.modules, então as próximas visitas não reimportam
+    return importlib.import_module(nome_modulo)
+
+# Função para executar o dashboard da página selecionada
+def executar_pagina(nome_pagina):
+    modulo = carregar_pagina(nome_pagina)
+    if modulo is not None:
+        inicio = time.perf_counter()
+        modulo.run_dashboard()
+
+        # Duração da execução da página (execuções interrompidas por st.rerun ou st.stop não entram)
+        metricas.observar("painelgestor_rerun_segundos", time.perf_counter() - inicio, pagina=nome_pagina)
@@ -6,7 +6,13 @@ import plotly.graph_objects as go
 import locale
 from sidebar import load_sidebar  # Agora você usa a função centralizada do sidebar
 from data_loader import load_servidores_data
-from chatbot import render_chatbot  # Importar a função do chatbot
+from tabela_paginada import exibir_tabela_paginada, formatar_moeda, mascarar_cpf
+from exportacao import exibir_exportacao
+from instrumentacao import medir, registrar_contexto
+from calculos.servidores import (
+    preparar_servidores, distribuicao_grau_sexo, calcular_idades, contagem_por_idade,
+    valores_por_verba, media_salarial_por_funcao, buscar_servidores
+)
 
 # Configurar o locale para português do Brasil
 #locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
@@ -23,12 +29,16 @@ colunas_exibicao = {
     'Financ_Valor_Calculado': 'Valor Calculado (R$)'
 }
 
-# Função para formatar valores em Real
-def formatar_valores(df):
-    df['Financ_Valor_Calculado'] = df['Financ_Valor_Calculado'].apply(
-        lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+# Função para exibir a tabela paginada de servidores (CPF e valores formatados apenas nas linhas da página)
+def exibir_tabela_servidores(df, chave):
+    exibir_tabela_paginada(
+        df,
+        chave=chave,
+        colunas=colunas_exibicao,
+        formatos={'CPF': mascarar_cpf, 'Financ_Valor_Calculado': formatar_moeda},
+        totais={'Valor total calculado': ('Financ_Valor_Calculado', formatar_moeda)}
     )
-    return df
+    exibir_exportacao(df, chave, 'servidores', colunas=colunas_exibicao, mascarar=['CPF'])
 
 # Tente definir o locale para pt_BR. Se falhar, use o locale padrão do sistema
 try:
@@ -38,39 +48,24 @@ except locale.Error:
 
 def run_dashboard():
     # Carregar dados usando o módulo centralizado
-    df = load_servidores_data()
+    with medir("carga dos dados"):
+        df = load_servidores_data()
 
     if df is None:
         st.error("Nenhum dado foi carregado. Por favor, verifique os arquivos de entrada.")
         return
 
-    # Ajustar a coluna 'Unidade' para ter zeros à esquerda usando .loc para evitar SettingWithCopyWarning
-    df['Unidade'] = df['Unidade'].astype(str).str.zfill(8)
-
-    # Remover aspas dos CPFs e ajustar a coluna para string
-    df['CPF'] = df['CPF'].astype(str).str.replace('"', '').str.zfill(11)
-
-    # Tratamento de dados para selecionar o menor código de vínculo (Vinculo) para cada CPF
-    #df_sorted = df.sort_values(by=['CPF', 'Vinculo'])  # Ordena primeiro pelo CPF e depois pelo código de vínculo
-    #df = df_sorted.drop_duplicates(subset=['CPF'], keep='first').copy()  # Adiciona .copy() após a remoção de duplicatas
-
-    # Ordena o DataFrame para garantir que "TOTAL VANTAGENS" seja priorizado
-    df_sorted = df.sort_values(by=['CPF', 'Financ_Verba_Desc'], ascending=[True, False])
-
-    # Filtrar as linhas onde 'Financ_Verba_Desc' é 'TOTAL VANTAGENS'
-    df_total_vantagens = df_sorted[df_sorted['Financ_Verba_Desc'] == 'TOTAL VANTAGENS'].copy()
-
-    # Agora selecionamos o menor código de vínculo (Vinculo) para cada CPF, garantindo que as linhas de "TOTAL VANTAGENS" sejam mantidas
-    df = df_sorted.drop_duplicates(subset=['CPF'], keep='first').copy()
-
-    # Unimos o DataFrame original com as informações de "TOTAL VANTAGENS" para garantir que essa informação seja preservada
-    df = pd.merge(df, df_total_vantagens[['CPF', 'Financ_Valor_Calculado']], on='CPF', suffixes=('', '_salario_bruto'), how='left')
-
+    # Normalizar Unidade e CPF e manter uma linha por CPF, preservando o valor de "TOTAL VANTAGENS"
+    with medir("preparação"):
+        df = preparar_servidores(df)
 
     # Carregar o sidebar para "Servidores" e obter a Unidade
-    selected_unidade = load_sidebar(df, "Servidores")
+    with medir("sidebar"):
+        selected_unidade = load_sidebar(df, "Servidores")
+    registrar_contexto(unidade=selected_unidade)
 
-    # Chame o chatbot para renderizar no sidebar
+    # Chame o chatbot para renderizar no sidebar (importado só quando usado)
+    from chatbot import render_chatbot
     render_chatbot()
 
     # Verifique se nenhuma Unidade foi selecionada
@@ -82,7 +77,8 @@ def run_dashboard():
         selected_unidade = str(selected_unidade).zfill(8)
 
         # Filtrar o DataFrame com base na Unidade selecionada
-        filtered_df = df[df['Unidade'] == selected_unidade].copy()  # Adiciona .copy() após o filtro
+        with medir("filtro"):
+            filtered_df = df[df['Unidade'] == selected_unidade].copy()  # Adiciona .copy() após o filtro
 
         if filtered_df.empty:
             st.warning(f"Nenhum dado encontrado para a Unidade {selected_unidade}.")
@@ -95,17 +91,13 @@ def run_dashboard():
     # Dividindo em abas
     tab1, tab2, tab3, tab4 = st.tabs(["Instrução", "Idade/Verbas", "Salários","Pesquisa"])
 
-    with tab1:
+    with tab1, medir("aba Instrução"):
         # Gráficos 1 e 2 em uma linha
         col1, col2 = st.columns([3, 1])
 
         # Gráfico de Distribuição por Grau de Instrução, agrupado por Sexo
         with col1:
-            grau_instrucao_sexo_counts = filtered_df.groupby(['Grau_Instrucao_Desc', 'Sexo_Desc']).size().reset_index(name='Quantidade')
-            total_counts = grau_instrucao_sexo_counts.groupby('Grau_Instrucao_Desc')['Quantidade'].sum().reset_index()
-            total_counts = total_counts.sort_values(by='Quantidade', ascending=False)
-            grau_instrucao_sexo_counts['Grau_Instrucao_Desc'] = pd.Categorical(grau_instrucao_sexo_counts['Grau_Instrucao_Desc'], categories=total_counts['Grau_Instrucao_Desc'], ordered=True)
-            grau_instrucao_sexo_counts = grau_instrucao_sexo_counts.sort_values('Grau_Instrucao_Desc')
+            grau_instrucao_sexo_counts = distribuicao_grau_sexo(filtered_df)
             
             fig1 = px.bar(
                 grau_instrucao_sexo_counts,
@@ -151,41 +143,22 @@ def run_dashboard():
 
         if selected_graus:
             filtered_table = filtered_df[filtered_df['Grau_Instrucao_Desc'].isin(selected_graus)].copy()
-            filtered_table['CPF'] = filtered_table['CPF'].apply(lambda x: x[:-4] + '****' if pd.notnull(x) else x)
-            filtered_table = formatar_valores(filtered_table)
-            
             st.header('Servidores por Grau de Instrução Selecionado')
-            st.write(filtered_table[['Nome_Funcionario', 'CPF', 'Vinculo_Desc', 'Funcao_Efetiva_Desc', 'Funcao_Gratificada_Comissao_Desc', 'Setor_Desc', 'Carga_Horaria', 'Financ_Valor_Calculado']].rename(columns=colunas_exibicao))
+            exibir_tabela_servidores(filtered_table, 'servidores_grau')
             
             st.write(f"Total de servidores exibidos: {len(filtered_table)}")
-            # Soma do valor total da coluna 'Financ_Valor_Calculado'
-            # Remover o símbolo "R$ " e aplicar o formato adequado para conversão
-            total_valor = (
-                filtered_table['Financ_Valor_Calculado']
-                .str.replace('R\$', '', regex=True)  # Remover o símbolo "R$" usando regex
-                .str.replace('.', '', regex=False)   # Remover pontos (separador de milhares)
-                .str.replace(',', '.', regex=False)  # Converter vírgula para ponto (para formato float)
-                .astype(float)
-                .sum()
-            )
-
-            # Exibir o valor total formatado em reais
-            st.write(f"Valor total calculado: R$ {total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
 
-    with tab2:
+    with tab2, medir("aba Idade/Verbas"):
         # Gráficos 3 e 4 em uma linha
         col3, col4 = st.columns([4, 1])
 
         # Gráfico de Distribuição por Faixa Etária
         with col3:
             # Calcular idade para cada funcionário e garantir que a coluna Idade esteja precisa
-            filtered_df['Data_Nascimento'] = pd.to_datetime(filtered_df['Data_Nascimento'], format='%Y%m%d')
-            filtered_df['Idade'] = pd.to_datetime('today').year - filtered_df['Data_Nascimento'].dt.year
+            filtered_df['Data_Nascimento'], filtered_df['Idade'] = calcular_idades(filtered_df)
 
             # Agrupar por idade para obter a quantidade de funcionários em cada faixa etária
-            idade_counts = filtered_df['Idade'].value_counts().reset_index()
-            idade_counts.columns = ['Idade', 'Quantidade']
-            idade_counts = idade_counts.sort_values(by='Idade')  # Organizar por idade
+            idade_counts = contagem_por_idade(filtered_df['Idade'])
 
             # Criar o histograma usando os valores calculados
             fig3 = px.bar(
@@ -211,14 +184,12 @@ def run_dashboard():
 
         # Gráfico de Distribuição de Valores Financeiros por Tipo de Verba
         with col4:
-            # Remover valores NaN nas colunas de interesse
+            # Remover valores NaN nas colunas de interesse e garantir o formato numérico
             filtered_df = filtered_df.dropna(subset=['Financ_Verba_Desc', 'Financ_Valor_Calculado'])
-            
-            # Certificar que Financ_Valor_Calculado está em formato numérico
             filtered_df['Financ_Valor_Calculado'] = pd.to_numeric(filtered_df['Financ_Valor_Calculado'], errors='coerce')
-            
+
             # Agrupar dados por tipo de verba
-            valores_verba = filtered_df.groupby('Financ_Verba_Desc')['Financ_Valor_Calculado'].sum().reset_index()
+            valores_verba = valores_por_verba(filtered_df)
             
             fig4 = px.bar(
                 valores_verba,
@@ -260,53 +231,34 @@ def run_dashboard():
             (filtered_df['Idade'] <= selected_age_range[1])
         ].copy()  # Adiciona `.copy()` para evitar o erro
 
-        # Ocultar os últimos 4 dígitos do CPF e formatar a coluna `Financ_Valor_Calculado`
-        filtered_table['CPF'] = filtered_table['CPF'].apply(lambda x: x[:-4] + '****' if pd.notnull(x) else x)
-
-        # Aplicar a formatação de valores em Real e renomear as colunas para exibição
-        formatar_valores(filtered_table)
-    
         # Exibir a tabela formatada apenas se houver uma faixa de idade selecionada
         if not filtered_table.empty:
             st.header(f"Servidores com idade entre {selected_age_range[0]} e {selected_age_range[1]}")
-            st.write(filtered_table[['Nome_Funcionario', 'CPF', 'Vinculo_Desc', 'Funcao_Efetiva_Desc', 'Funcao_Gratificada_Comissao_Desc', 'Setor_Desc', 'Carga_Horaria', 'Financ_Valor_Calculado']].rename(columns=colunas_exibicao))
+            exibir_tabela_servidores(filtered_table, 'servidores_idade')
 
             # Contagem de servidores exibidos
             st.write(f"Total de servidores exibidos: {len(filtered_table)}")
 
-            # Soma do valor total da coluna 'Financ_Valor_Calculado'
-            # Remover o símbolo "R$ " e aplicar o formato adequado para conversão
-            total_valor = (
-                filtered_table['Financ_Valor_Calculado']
-                .str.replace('R\$', '', regex=True)  # Remover o símbolo "R$" usando regex
-                .str.replace('.', '', regex=False)   # Remover pontos (separador de milhares)
-                .str.replace(',', '.', regex=False)  # Converter vírgula para ponto (para formato float)
-                .astype(float)
-                .sum()
-            )
-
-            # Exibir o valor total formatado em reais
-            st.write(f"Valor total calculado: R$ {total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
         else:
             st.write("Nenhum servidor encontrado para o intervalo de idade selecionado.")
 
 
-    with tab3:
+    with tab3, medir("aba Salários"):
         # Gráfico de Média Salarial por Função
-        media_salarial_por_funcao = filtered_df.groupby('Funcao_Efetiva_Desc')['Financ_Valor_Calculado'].mean().reset_index()
+        media_salarial = media_salarial_por_funcao(filtered_df)
 
         # Normalizar os valores para definir a intensidade das cores
-        norm = (media_salarial_por_funcao['Financ_Valor_Calculado'] - media_salarial_por_funcao['Financ_Valor_Calculado'].min()) / (media_salarial_por_funcao['Financ_Valor_Calculado'].max() - media_salarial_por_funcao['Financ_Valor_Calculado'].min())
+        norm = (media_salarial['Financ_Valor_Calculado'] - media_salarial['Financ_Valor_Calculado'].min()) / (media_salarial['Financ_Valor_Calculado'].max() - media_salarial['Financ_Valor_Calculado'].min())
 
         # Criar a figura usando o gráfico de barras do Plotly
         fig8 = go.Figure(data=[
             go.Bar(
-                x=media_salarial_por_funcao['Funcao_Efetiva_Desc'],
-                y=media_salarial_por_funcao['Financ_Valor_Calculado'],
+                x=media_salarial['Funcao_Efetiva_Desc'],
+                y=media_salarial['Financ_Valor_Calculado'],
                 marker=dict(
                     color=['#E55115' if np.isnan(v) else f'rgba(229, 81, 21, {v + 0.3})' for v in norm]  # Ajusta transparência baseada na normalização
                 ),
-                text=[f'R$ {y:,.2f}' for y in media_salarial_por_funcao['Financ_Valor_Calculado']],
+                text=[f'R$ {y:,.2f}' for y in media_salarial['Financ_Valor_Calculado']],
                 textposition='outside'
             )
         ])
@@ -325,7 +277,7 @@ def run_dashboard():
         # Multiselect para selecionar funções específicas
         selected_funcoes = st.multiselect(
             'Selecione a(s) Função(ões) para visualizar os servidores:',
-            options=media_salarial_por_funcao['Funcao_Efetiva_Desc'].unique(),
+            options=media_salarial['Funcao_Efetiva_Desc'].unique(),
             help="Escolha uma ou mais funções para exibir a tabela de servidores.",
             placeholder="Escolha uma opção"
         )
@@ -335,44 +287,22 @@ def run_dashboard():
             # Filtrar o DataFrame para as funções selecionadas
             filtered_table = filtered_df[filtered_df['Funcao_Efetiva_Desc'].isin(selected_funcoes)].copy()
             
-            # Ocultar os últimos 4 dígitos do CPF visualmente usando .loc para evitar o aviso
-            filtered_table.loc[:, 'CPF'] = filtered_table['CPF'].apply(lambda x: x[:-4] + '****' if pd.notnull(x) else x)
-            
-            # Aplicar a formatação de valores em Real e renomear as colunas para exibição
-            formatar_valores(filtered_table)
-
             # Exibir a tabela com os servidores filtrados e colunas renomeadas
             st.header('Servidores por Função Selecionada')
-            st.write(filtered_table[['Nome_Funcionario', 'CPF', 'Vinculo_Desc', 'Funcao_Efetiva_Desc', 'Funcao_Gratificada_Comissao_Desc', 'Setor_Desc', 'Carga_Horaria', 'Financ_Valor_Calculado']].rename(columns=colunas_exibicao))
+            exibir_tabela_servidores(filtered_table, 'servidores_funcao')
 
             # Contagem de servidores exibidos
             st.write(f"Total de servidores exibidos: {len(filtered_table)}")
 
-            # Soma do valor total da coluna 'Financ_Valor_Calculado'
-            # Remover o símbolo "R$ " e aplicar o formato adequado para conversão
-            total_valor = (
-                filtered_table['Financ_Valor_Calculado']
-                .str.replace('R\$', '', regex=True)  # Remover o símbolo "R$" usando regex
-                .str.replace('.', '', regex=False)   # Remover pontos (separador de milhares)
-                .str.replace(',', '.', regex=False)  # Converter vírgula para ponto (para formato float)
-                .astype(float)
-                .sum()
-            )
-
-            # Exibir o valor total formatado em reais
-            st.write(f"Valor total calculado: R$ {total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
 
 
-    with tab4:
+    with tab4, medir("aba Pesquisa"):
         # Campo de pesquisa por palavra-chave
         search_term = st.text_input('Pesquisar Servidores por Nome ou CPF:')
 
         # Filtrar DataFrame baseado no termo de pesquisa (case-insensitive)
         if search_term:
-            filtered_table = filtered_df[
-                filtered_df['Nome_Funcionario'].astype(str).str.contains(search_term, case=False, na=False) |
-                filtered_df['CPF'].astype(str).str.contains(search_term, case=False, na=False)
-            ].copy()  # Adiciona .copy() para evitar o alerta
+            filtered_table = buscar_servidores(filtered_df, search_term).copy()  # Adiciona .copy() para evitar o alerta
         else:
             filtered_table = filtered_df.copy()  # Adiciona .copy() para manter consistência
 
@@ -380,32 +310,13 @@ def run_dashboard():
         if filtered_table.empty:
             st.warning("Nenhum dado encontrado com o termo de pesquisa informado.")
         else:
-            # Ocultar os últimos 4 dígitos do CPF visualmente
-            filtered_table['CPF'] = filtered_table['CPF'].apply(lambda x: x[:-4] + '****' if pd.notnull(x) else x)
-
-            # Aplicar a formatação de valores em Real e renomear as colunas para exibição
-            formatar_valores(filtered_table)
-
             # Exibir a tabela com os servidores filtrados e colunas renomeadas
             st.header('Servidores da Unidade Selecionada')
-            st.write(filtered_table[['Nome_Funcionario', 'CPF', 'Vinculo_Desc', 'Funcao_Efetiva_Desc', 'Funcao_Gratificada_Comissao_Desc', 'Setor_Desc', 'Carga_Horaria', 'Financ_Valor_Calculado']].rename(columns=colunas_exibicao).reset_index(drop=True))
+            exibir_tabela_servidores(filtered_table, 'servidores_unidade')
 
             # Contagem de servidores exibidos
             st.write(f"Total de servidores exibidos: {len(filtered_table)}")
 
-            # Soma do valor total da coluna 'Financ_Valor_Calculado'
-            # Remover o símbolo "R$ " e aplicar o formato adequado para conversão
-            total_valor = (
-                filtered_table['Financ_Valor_Calculado']
-                .str.replace('R\$', '', regex=True)  # Remover o símbolo "R$" usando regex
-                .str.replace('.', '', regex=False)   # Remover pontos (separador de milhares)
-                .str.replace(',', '.', regex=False)  # Converter vírgula para ponto (para formato float)
-                .astype(float)
-                .sum()
-            )
-
-            # Exibir o valor total formatado em reais
-            st.write(f"Valor total calculado: R$ {total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
 
 
 if __name__ == "__main__":
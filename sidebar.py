@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
-from chatbot import render_chatbot
 from datetime import datetime, timedelta
+from contratos_modelo import carregar_indice_vigencia
+from calculos.contratos import extremos_vigencia
 #from streamlit_option_menu import option_menu
 
 def render_logout_button():
@@ -82,9 +83,7 @@ def load_sidebar(df, dashboard_name):
     #     return selected_ugs, selected_ano, selected_mes
     # ========= FILTROS DO DASHBOARD DE ADIANTAMENTOS =========
     if dashboard_name == "Adiantamentos":
-        # Normalizar os nomes das colunas para evitar problemas de case sensitivity
-        df.columns = df.columns.str.strip().str.upper()
-
+        # Colunas e tipos (UG, ANO e NUM_MES inteiros) já são normalizados no carregamento dos dados
         required_columns = {"ANO", "UG", "DESCRICAO_UG", "NUM_MES"}
 
         # Verifica se todas as colunas necessárias existem no dataset
@@ -146,8 +145,6 @@ def load_sidebar(df, dashboard_name):
         # ==========================
         # SLIDER PARA MÊS
         # ==========================
-        df["NUM_MES"] = df["NUM_MES"].astype(int)
-
         min_mes = 1
         max_mes = 12
 
@@ -627,10 +624,9 @@ def load_sidebar(df, dashboard_name):
                 int(option.split(" - ")[0]) for option in selected_ug_sigla_contratos
             ]
 
-        # Conversão de timestamps para datetime
-        df['DATA_INICIO_VIGENCIA'] = pd.to_datetime(df['DATA_INICIO_VIGENCIA'], unit='ms')
-        df['DATA_FIM_VIGENCIA'] = pd.to_datetime(df['DATA_FIM_VIGENCIA'], unit='ms')
-
+        # As datas de vigência já são convertidas para datetime no carregamento dos contratos
+        # e os limites dos sliders vêm do índice ordenado por vigência
+        indice_vigencia = carregar_indice_vigencia()
         today = datetime.today().date()
 
         # Opções para filtros rápidos de períodos
@@ -658,26 +654,32 @@ def load_sidebar(df, dashboard_name):
         if selected_periodos_inicio:
             selected_data_inicio = (min([periodo_opcoes[p] for p in selected_periodos_inicio]), today)
         else:
-            min_data_inicio = df['DATA_INICIO_VIGENCIA'].min().date()
-            max_data_inicio = df['DATA_INICIO_VIGENCIA'].max().date()
-            selected_data_inicio = st.sidebar.slider(
-                'Selecione o período de início da vigência:',
-                min_value=min_data_inicio,
-                max_value=max_data_inicio,
-                value=(min_data_inicio, max_data_inicio)
-            )
+            extremos_inicio = extremos_vigencia(indice_vigencia, 'DATA_INICIO_VIGENCIA')
+            if extremos_inicio is None:
+                selected_data_inicio = None  # Sem datas válidas: a página exibe o aviso
+            else:
+                min_data_inicio, max_data_inicio = extremos_inicio
+                selected_data_inicio = st.sidebar.slider(
+                    'Selecione o período de início da vigência:',
+                    min_value=min_data_inicio,
+                    max_value=max_data_inicio,
+                    value=(min_data_inicio, max_data_inicio)
+                )
 
         if selected_periodos_fim:
             selected_data_fim = (today, max([today + timedelta(days=int(p.split(" ")[1])) for p in selected_periodos_fim]))
         else:
-            min_data_fim = df['DATA_FIM_VIGENCIA'].min().date()
-            max_data_fim = df['DATA_FIM_VIGENCIA'].max().date()
-            selected_data_fim = st.sidebar.slider(
-                'Selecione o período de fim da vigência:',
-                min_value=min_data_fim,
-                max_value=max_data_fim,
-                value=(min_data_fim, max_data_fim)
-            )
+            extremos_fim = extremos_vigencia(indice_vigencia, 'DATA_FIM_VIGENCIA')
+            if extremos_fim is None:
+                selected_data_fim = None  # Sem datas válidas: a página exibe o aviso
+            else:
+                min_data_fim, max_data_fim = extremos_fim
+                selected_data_fim = st.sidebar.slider(
+                    'Selecione o período de fim da vigência:',
+                    min_value=min_data_fim,
+                    max_value=max_data_fim,
+                    value=(min_data_fim, max_data_fim)
+                )
 
         # Novo filtro para a Situação do Contrato (DSC_SITUACAO)
         situacoes_disponiveis = df['DSC_SITUACAO'].dropna().unique().tolist()
@@ -745,7 +747,8 @@ def load_sidebar(df, dashboard_name):
         return selected_ugs, selected_ano, selected_mes
     
 
-    # Chamada para renderizar o chatbot abaixo de todos os filtros
+    # Chamada para renderizar o chatbot abaixo de todos os filtros (importado só quando usado)
+    from chatbot import render_chatbot
     render_chatbot()
 
 def navigate_pages():
@@ -0,0 +1,92 @@
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+from instrumentacao import medir
+
+# Opções de quantidade de linhas por página
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+
+# Função para formatar valores como moeda no padrão brasileiro
+def formatar_moeda(valor):
+    if pd.notnull(valor):
+        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return "R$ 0,00"
+
+# Função para ocultar os últimos 4 dígitos do CPF (mesma máscara nas telas e nas exportações)
+def mascarar_cpf(cpf):
+    return cpf[:-4] + '****' if pd.notnull(cpf) else cpf
+
+# Função para filtrar as linhas que contêm a palavra-chave em alguma das colunas (sem percorrer linha a linha)
+def filtrar_por_palavra(df, palavra, colunas=None):
+    colunas = list(df.columns) if colunas is None else colunas
+    mascara = np.zeros(len(df), dtype=bool)
+    for coluna in colunas:
+        mascara |= df[coluna].astype(str).str.contains(palavra, case=False, regex=False, na=False).to_numpy()
+    return df[mascara]
+
+# Função para obter as posições das linhas ordenadas por uma coluna (valores vazios ficam no final)
+def ordenar_posicoes(df, coluna, crescente):
+    valores = pd.Series(df[coluna].to_numpy())
+    return valores.sort_values(ascending=crescente, kind="stable", na_position="last").index.to_numpy()
+
+# Função para exibir uma tabela paginada, formatando apenas as linhas da página visível
+def exibir_tabela_paginada(df, chave, colunas, formatos=None, ordenar_por=None, totais=None, busca=False):
+    """
+    - colunas: {coluna de df: título exibido}, na ordem de exibição;
+    - formatos: {coluna de df: função} aplicada apenas às linhas da página;
+    - ordenar_por: {coluna de df: coluna tipada usada na ordenação} para colunas já formatadas como texto;
+    - totais: {rótulo: (coluna tipada, função de formatação)} somados sobre todas as linhas filtradas;
+    - busca: exibe um campo de palavra-chave que filtra as colunas exibidas.
+    A chave identifica os controles da tabela no estado da sessão.
+    """
+    formatos = formatos or {}
+    ordenar_por = ordenar_por or {}
+    totais = totais or {}
+
+    if busca:
+        palavra = st.text_input("Filtrar a tabela por palavra-chave:", key=f"{chave}_busca")
+        if palavra:
+            df = filtrar_por_palavra(df, palavra, list(colunas))
+
+    # Controles de ordenação e tamanho da página
+    titulos = {titulo: coluna for coluna, titulo in colunas.items()}
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        ordenar_titulo = st.selectbox("Ordenar por:", options=["(sem ordenação)"] + list(titulos), key=f"{chave}_ordem")
+    with col2:
+        sentido = st.radio("Sentido:", options=["Crescente", "Decrescente"], horizontal=True, key=f"{chave}_sentido")
+    with col3:
+        tamanho_pagina = st.selectbox("Linhas por página:", options=TAMANHOS_PAGINA, index=1, key=f"{chave}_tamanho")
+
+    total_linhas = len(df)
+    total_paginas = max(1, math.ceil(total_linhas / tamanho_pagina))
+
+    # Voltar para a primeira página quando o filtro reduzir a quantidade de páginas
+    chave_pagina = f"{chave}_pagina"
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = 1
+    pagina = st.number_input(f"Página (de {total_paginas}):", min_value=1, max_value=total_paginas, step=1, key=chave_pagina)
+
+    # Ordenar apenas as posições e recortar a página visível
+    inicio = (pagina - 1) * tamanho_pagina
+    fim = inicio + tamanho_pagina
+    with medir(f"tabela {chave} (ordenação e página)"):
+        if ordenar_titulo in titulos:
+            coluna = titulos[ordenar_titulo]
+            posicoes = ordenar_posicoes(df, ordenar_por.get(coluna, coluna), sentido == "Crescente")[inicio:fim]
+            df_pagina = df.iloc[posicoes]
+        else:
+            df_pagina = df.iloc[inicio:fim]
+
+        df_pagina = df_pagina[list(colunas)].assign(**{
+            coluna: df_pagina[coluna].map(funcao) for coluna, funcao in formatos.items()
+        })
+        st.dataframe(df_pagina.rename(columns=colunas), use_container_width=True, hide_index=True)
+
+    # Rodapé com os totais de todas as linhas filtradas (não apenas da página)
+    rodape = [f"Linhas {min(inicio + 1, total_linhas)}–{min(fim, total_linhas)} de {total_linhas}"]
+    rodape += [f"{rotulo}: {formatar(df[coluna].sum())}" for rotulo, (coluna, formatar) in totais.items()]
+    st.markdown(" | ".join(f"**{item}**" for item in rodape))
+
+    return df
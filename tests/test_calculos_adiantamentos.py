@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculos.adiantamentos import ordenar_por_ug, montar_cubo, fatiar_cubo, fatiar_por_ug, eficiencia_por
+
+ANOS = (2023, 2024)
+MESES = (2, 11)
+
+
+# Função para montar os adiantamentos de teste (valores determinísticos, UGs fora de ordem)
+def _adiantamentos():
+    gerador = np.random.default_rng(0)
+    quantidade = 200
+    ugs = gerador.choice([30, 10, 20], quantidade)
+    return pd.DataFrame({
+        'UG': ugs,
+        'DESCRICAO_UG': [f'UG {ug}' for ug in ugs],
+        'ANO': gerador.choice([2022, 2023, 2024], quantidade),
+        'NUM_MES': gerador.integers(1, 13, quantidade),
+        'NOM_CREDOR': gerador.choice(['ANA', 'BRUNO', 'CARLA'], quantidade),
+        'EMPENHO_PRODUTO': gerador.choice(['PASSAGENS', 'MATERIAL'], quantidade),
+        'VALOR_ADIANTAMENTOS_COMPROVADOS': gerador.integers(0, 1000, quantidade).astype(float),
+        'VALOR_ADIANTAMENTOS_A_COMPROVAR': gerador.integers(0, 1000, quantidade).astype(float),
+    })
+
+
+# Função para aplicar o filtro anterior da página de adiantamentos (UGs comparadas como texto)
+def _filtro_anterior(df, ugs):
+    filtro = df['ANO'].between(*ANOS) & df['NUM_MES'].between(*MESES)
+    if ugs is not None:
+        filtro &= df['UG'].astype(str).isin(map(str, ugs))
+    return df[filtro]
+
+
+@pytest.mark.parametrize('ugs', [None, [10, 30], [99]])
+def test_fatiar_por_ug_igual_ao_filtro_anterior(ugs):
+    df = _adiantamentos()
+    df_ordenado, indice = ordenar_por_ug(df)
+
+    obtido = fatiar_por_ug(df_ordenado, indice, ugs, ANOS, MESES)
+    esperado = _filtro_anterior(df, ugs)
+
+    colunas = list(df.columns)
+    pd.testing.assert_frame_equal(
+        obtido.sort_values(colunas).reset_index(drop=True),
+        esperado.sort_values(colunas).reset_index(drop=True)
+    )
+
+
+def test_cubo_igual_aos_agrupamentos_anteriores():
+    df = _adiantamentos()
+    cubo = montar_cubo(ordenar_por_ug(df)[0])
+    df_filtrado = _filtro_anterior(df, [10, 20])
+
+    # Eficiência por UG (aba "Eficiência"): comprovados / (comprovados + a comprovar)
+    obtido = eficiencia_por(fatiar_cubo(cubo, 'base', [10, 20], ANOS, MESES), ['UG', 'DESCRICAO_UG'])
+    esperado = df_filtrado.groupby(['UG', 'DESCRICAO_UG'])[['VALOR_ADIANTAMENTOS_COMPROVADOS', 'VALOR_ADIANTAMENTOS_A_COMPROVAR']].sum().reset_index()
+    esperado['Eficiência (%)'] = esperado.apply(
+        lambda row: (row['VALOR_ADIANTAMENTOS_COMPROVADOS'] / (row['VALOR_ADIANTAMENTOS_A_COMPROVAR'] + row['VALOR_ADIANTAMENTOS_COMPROVADOS']) * 100)
+        if (row['VALOR_ADIANTAMENTOS_A_COMPROVAR'] + row['VALOR_ADIANTAMENTOS_COMPROVADOS']) > 0 else 0, axis=1
+    )
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+    # Totais por credor (aba "Órgãos & Credores")
+    df_credor = fatiar_cubo(cubo, 'credor', [10, 20], ANOS, MESES)
+    pd.testing.assert_series_equal(
+        df_credor.groupby('NOM_CREDOR')['VALOR_ADIANTAMENTOS_COMPROVADOS'].sum(),
+        df_filtrado.groupby('NOM_CREDOR')['VALOR_ADIANTAMENTOS_COMPROVADOS'].sum()
+    )
@@ -0,0 +1,77 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from calculos.contratos import indexar_vigencia, filtrar_vigencia, contar_vencimentos, indexar_aditivos, aditivos_dos_contratos
+
+DATA_REFERENCIA = datetime.date(2024, 6, 1)
+
+
+# Função para montar a lista de contratos de teste (um contrato sem fim da vigência e limites exatos das faixas)
+def _contratos():
+    fins = [
+        '2024-05-31',  # Vencido
+        '2024-06-01',  # Vence na data de referência
+        '2024-07-01',  # 30 dias
+        '2024-07-02',  # 31 dias
+        '2024-07-31',  # 60 dias
+        '2024-08-30',  # 90 dias
+        '2024-08-31',  # 91 dias
+        None,
+    ]
+    return pd.DataFrame({
+        'CODIGO_CONTRATO': range(1, len(fins) + 1),
+        'UG': [10, 10, 20, 10, 20, 20, 10, 20],
+        'VALOR_TOTAL': [100.0] * len(fins),
+        'DATA_INICIO_VIGENCIA': pd.to_datetime(['2023-01-01', '2023-06-15', '2024-01-01', None, '2022-03-01', '2024-02-01', '2023-12-31', '2023-05-05']),
+        'DATA_FIM_VIGENCIA': pd.to_datetime(fins),
+    })
+
+
+def test_contar_vencimentos_igual_as_mascaras_por_faixa():
+    df_contratos = _contratos()
+    df_vencimentos = contar_vencimentos(df_contratos, indexar_vigencia(df_contratos), DATA_REFERENCIA).set_index('UG')
+
+    referencia = pd.Timestamp(DATA_REFERENCIA)
+    fim = df_contratos['DATA_FIM_VIGENCIA']
+    mascaras = {'VENCIDOS': fim < referencia}
+    for nome, dias in (('VENCE_30_DIAS', 30), ('VENCE_60_DIAS', 60), ('VENCE_90_DIAS', 90)):
+        mascaras[nome] = (fim >= referencia) & (fim <= referencia + pd.Timedelta(days=dias))
+
+    for nome, mascara in mascaras.items():
+        esperado = df_contratos[mascara].groupby('UG').size()
+        obtido = df_vencimentos[nome]
+        assert obtido[obtido > 0].to_dict() == esperado.to_dict(), nome
+
+
+@pytest.mark.parametrize('periodo_inicio, periodo_fim', [
+    ((datetime.date(2023, 1, 1), datetime.date(2023, 12, 31)), (datetime.date(2024, 1, 1), datetime.date(2024, 12, 31))),
+    ((datetime.date(2022, 1, 1), datetime.date(2024, 12, 31)), (datetime.date(2024, 6, 1), datetime.date(2024, 7, 31))),
+])
+def test_filtrar_vigencia_igual_ao_filtro_anterior(periodo_inicio, periodo_fim):
+    df_contratos = _contratos()
+    obtido = filtrar_vigencia(df_contratos, indexar_vigencia(df_contratos), periodo_inicio, periodo_fim)
+
+    # Filtro anterior da página de contratos (datas vazias ficam de fora nas duas versões)
+    esperado = df_contratos[(df_contratos['DATA_INICIO_VIGENCIA'] >= pd.to_datetime(periodo_inicio[0])) &
+                            (df_contratos['DATA_INICIO_VIGENCIA'] <= pd.to_datetime(periodo_inicio[1]))]
+    esperado = esperado[(esperado['DATA_FIM_VIGENCIA'] >= pd.to_datetime(periodo_fim[0])) &
+                        (esperado['DATA_FIM_VIGENCIA'] <= pd.to_datetime(periodo_fim[1]))]
+
+    assert not esperado.empty
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_aditivos_dos_contratos_igual_ao_filtro_por_isin():
+    df_aditivos = pd.DataFrame({
+        'COD_CONTRATO': [3, 1, 3, np.nan, 2, 1],
+        'VALOR': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+    })
+    df_aditivos_ordenados, indice, resumo = indexar_aditivos(df_aditivos, _contratos())
+
+    obtido = aditivos_dos_contratos(df_aditivos_ordenados, indice, pd.Series([3, 1, 99]))
+    esperado = df_aditivos[df_aditivos['COD_CONTRATO'].isin([3, 1])]
+
+    assert sorted(obtido['VALOR']) == sorted(esperado['VALOR'])
+    assert resumo.loc[1, 'QTD_ADITIVOS'] == 2
+    assert resumo.loc[3, 'PERCENTUAL_ADITIVOS'] == pytest.approx(40.0)  # (10 + 30) / 100
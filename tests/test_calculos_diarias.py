@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calculos.diarias import calcular_sequencias, classificar_consecutivos
+from benchmarks.legado import consecutivos_legado
+
+# Último mês dos dados: fevereiro de 2024, então as sequências atravessam a virada dezembro -> janeiro
+MESES_POR_FAVORECIDO = {
+    'SEIS_OU_MAIS': [(2023, 7), (2023, 8), (2023, 9), (2023, 10), (2023, 11), (2023, 12), (2024, 1), (2024, 2)],
+    'CINCO': [(2023, 10), (2023, 11), (2023, 12), (2024, 1), (2024, 2)],
+    'QUATRO': [(2023, 11), (2023, 12), (2024, 1), (2024, 2)],
+    'TRES': [(2023, 12), (2024, 1), (2024, 2)],
+    'DOIS': [(2024, 1), (2024, 2)],
+    'FALHA_EM_JANEIRO': [(2023, 10), (2023, 11), (2023, 12), (2024, 2)],
+    'MESMO_MES_ANO_ANTERIOR': [(2023, 1), (2023, 2), (2024, 2)],
+    'SEM_ULTIMO_MES': [(2023, 11), (2023, 12), (2024, 1)],
+}
+
+
+# Função para montar as diárias de teste (dois pagamentos em alguns meses e um valor vazio)
+def _diarias():
+    linhas = []
+    for indice, (nome, meses) in enumerate(MESES_POR_FAVORECIDO.items()):
+        for ano, mes in meses:
+            linhas.append({'NOME_FAVORECIDO': nome, 'ANO': ano, 'MES': mes, 'VALOR_PAGO': 100.0 * (indice + 1) + mes})
+            if mes == 1:
+                linhas.append({'NOME_FAVORECIDO': nome, 'ANO': ano, 'MES': mes, 'VALOR_PAGO': 10.0})
+    linhas.append({'NOME_FAVORECIDO': 'TRES', 'ANO': 2024, 'MES': 2, 'VALOR_PAGO': np.nan})
+
+    # Embaralhar as linhas: o resultado não pode depender da ordem de ANO e MES
+    return pd.DataFrame(linhas).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def test_classificar_consecutivos_igual_ao_algoritmo_anterior():
+    df_diarias = _diarias()
+    faixas = classificar_consecutivos(df_diarias)
+    esperado = consecutivos_legado(df_diarias)
+
+    assert set(faixas) == set(esperado)
+    for faixa, detalhes in esperado.items():
+        df_esperado = pd.DataFrame(detalhes, columns=['Nome do Servidor', 'Valor Total Pago'])
+        assert faixas[faixa]['Nome do Servidor'].tolist() == df_esperado['Nome do Servidor'].tolist(), faixa
+        np.testing.assert_allclose(faixas[faixa]['Valor Total Pago'].to_numpy(dtype=float), df_esperado['Valor Total Pago'].to_numpy(dtype=float))
+
+
+def test_classificar_consecutivos_faixas_esperadas():
+    faixas = classificar_consecutivos(_diarias())
+
+    assert set(faixas['6_ou_mais']['Nome do Servidor']) == {'SEIS_OU_MAIS'}
+    assert set(faixas['4_5']['Nome do Servidor']) == {'CINCO', 'QUATRO'}
+    assert set(faixas['3']['Nome do Servidor']) == {'TRES'}
+
+
+def test_calcular_sequencias_atravessa_a_virada_do_ano():
+    sequencias = calcular_sequencias(_diarias()).set_index('NOME_FAVORECIDO')['SEQUENCIA']
+
+    assert sequencias['SEIS_OU_MAIS'] == 6  # Limitada a max_meses
+    assert sequencias['FALHA_EM_JANEIRO'] == 1
+    assert sequencias['MESMO_MES_ANO_ANTERIOR'] == 1
+    assert sequencias['SEM_ULTIMO_MES'] == 0
+
+
+def test_calcular_sequencias_sem_diarias():
+    df_vazio = pd.DataFrame(columns=['NOME_FAVORECIDO', 'ANO', 'MES', 'VALOR_PAGO'])
+
+    assert calcular_sequencias(df_vazio).empty
+    assert all(df_faixa.empty for df_faixa in classificar_consecutivos(df_vazio).values())
+
+
+@pytest.mark.parametrize('max_meses', [3, 12])
+def test_calcular_sequencias_valores_acumulados(max_meses):
+    sequencias = calcular_sequencias(_diarias(), max_meses=max_meses)
+    colunas_valor = [f'VALOR_{k}' for k in range(1, max_meses + 1)]
+
+    # VALOR_k acumula os k meses mais recentes, então nunca diminui
+    assert (sequencias[colunas_valor].diff(axis=1).fillna(0) >= 0).all().all()
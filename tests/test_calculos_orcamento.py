@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from calculos.orcamento import VALORES_DOTACAO, montar_fatos_execucao, totais_anuais_restos, cubo_ug_ano, ranking_ugs
+
+
+# Função para montar a dotação de teste: UG 1 com dotação e despesas, UG 2 apenas com dotação
+def _dotacao():
+    linhas = [
+        (1, 2023, 1, 100.0), (1, 2023, 1, 50.0), (1, 2023, 2, 80.0), (1, 2024, 1, 200.0),
+        (2, 2023, 1, 40.0),
+    ]
+    df = pd.DataFrame(linhas, columns=['UG', 'ANO', 'MES', 'VALOR_ATUALIZADO'])
+    for coluna in VALORES_DOTACAO:
+        if coluna != 'VALOR_ATUALIZADO':
+            df[coluna] = df['VALOR_ATUALIZADO'] / 10
+    return df
+
+
+# Função para montar a execução das despesas de teste: UG 3 apenas com despesas
+def _despesas():
+    linhas = [
+        (1, 2023, 1, 30.0, 20.0, 10.0), (1, 2023, 1, 5.0, 5.0, 5.0), (1, 2024, 3, 60.0, 40.0, 40.0),
+        (3, 2023, 2, 9.0, 9.0, 9.0),
+    ]
+    return pd.DataFrame(linhas, columns=['UG', 'ANO', 'MES', 'VALOR_EMPENHADO', 'VALOR_LIQUIDADO', 'VALOR_PAGO'])
+
+
+def test_montar_fatos_execucao_indica_a_base_de_cada_linha():
+    df_fatos = montar_fatos_execucao(_dotacao(), _despesas()).set_index(['UG', 'ANO', 'MES'])
+
+    assert df_fatos.loc[(1, 2023, 1), ['TEM_DOTACAO', 'TEM_DESPESA']].tolist() == [True, True]
+    assert df_fatos.loc[(1, 2023, 2), ['TEM_DOTACAO', 'TEM_DESPESA']].tolist() == [True, False]
+    assert df_fatos.loc[(1, 2024, 3), ['TEM_DOTACAO', 'TEM_DESPESA']].tolist() == [False, True]
+    assert df_fatos.loc[(3, 2023, 2), ['TEM_DOTACAO', 'TEM_DESPESA']].tolist() == [False, True]
+    assert df_fatos.loc[(1, 2023, 1), 'VALOR_ATUALIZADO'] == 150.0
+    assert df_fatos.loc[(1, 2023, 1), 'VALOR_PAGO_DESPESA'] == 15.0
+    assert df_fatos.loc[(1, 2024, 3), 'VALOR_ATUALIZADO'] == 0  # Sem dotação no mês: vazio vira 0
+
+
+def test_montar_fatos_execucao_igual_a_execucao_financeira_anterior():
+    df_dotacao, df_despesas = _dotacao(), _despesas()
+    df_fatos = montar_fatos_execucao(df_dotacao, df_despesas)
+
+    # Cálculo anterior da aba "Execução Financeira": agregação por ano e merge à esquerda na dotação
+    df_execucao_financeira = df_dotacao.groupby('ANO').agg({'VALOR_ATUALIZADO': 'sum'}).reset_index()
+    df_despesas_agg = df_despesas.groupby('ANO').agg({'VALOR_EMPENHADO': 'sum', 'VALOR_PAGO': 'sum'}).reset_index()
+    esperado = df_execucao_financeira.merge(df_despesas_agg, on='ANO', how='left').fillna(0)
+
+    obtido = (
+        df_fatos.groupby('ANO')
+        .agg(VALOR_ATUALIZADO=('VALOR_ATUALIZADO', 'sum'), VALOR_EMPENHADO=('VALOR_EMPENHADO_DESPESA', 'sum'),
+             VALOR_PAGO=('VALOR_PAGO_DESPESA', 'sum'), TEM_DOTACAO=('TEM_DOTACAO', 'any'))
+        .reset_index()
+    )
+    obtido = obtido[obtido['TEM_DOTACAO']].drop(columns='TEM_DOTACAO').reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+
+def test_montar_fatos_execucao_sem_mes_em_uma_das_bases():
+    df_fatos = montar_fatos_execucao(_dotacao().drop(columns='MES'), _despesas())
+
+    assert 'MES' not in df_fatos.columns
+    assert df_fatos.set_index(['UG', 'ANO']).loc[(1, 2023), 'VALOR_EMPENHADO_DESPESA'] == 35.0
+
+
+def test_totais_anuais_restos_igual_ao_calculo_anterior():
+    linhas = [
+        (1, 2023, 0, 10.0, 1.0), (1, 2023, 5, 20.0, 2.0), (1, 2023, 12, 30.0, 3.0), (1, 2023, 13, 99.0, 99.0),
+        (1, 2024, 12, 40.0, 4.0),  # Ano apenas com dezembro: inscrito sem dezembro igual a 0
+        (2, 2023, 3, 7.0, 0.5),
+    ]
+    df_restos = pd.DataFrame(linhas, columns=['UG', 'ANO', 'MES', 'VALOR_INSCRITO', 'VALOR_PAGO'])
+    df_anual = totais_anuais_restos(df_restos).set_index(['UG', 'ANO'])
+
+    # Cálculo anterior da aba "Restos a Pagar", por UG: meses 0 a 12, inscrito sem o mês 12
+    df_filtrado = df_restos[df_restos['MES'].between(0, 12)]
+    esperado_pago = df_filtrado.groupby(['UG', 'ANO'])['VALOR_PAGO'].sum()
+    esperado_inscrito = df_filtrado[df_filtrado['MES'] != 12].groupby(['UG', 'ANO'])['VALOR_INSCRITO'].sum()
+
+    pd.testing.assert_series_equal(df_anual['VALOR_PAGO'], esperado_pago)
+    pd.testing.assert_series_equal(
+        df_anual['VALOR_INSCRITO_SEM_DEZEMBRO'],
+        esperado_inscrito.reindex(df_anual.index, fill_value=0).rename('VALOR_INSCRITO_SEM_DEZEMBRO')
+    )
+    assert df_anual.loc[(1, 2024), 'VALOR_INSCRITO_SEM_DEZEMBRO'] == 0
+    assert df_anual.loc[(1, 2023), 'VALOR_INSCRITO'] == 60.0  # Com dezembro, sem o mês 13
+
+
+def test_ranking_ugs_inclui_ugs_sem_dados_no_periodo():
+    cubo = cubo_ug_ano(montar_fatos_execucao(_dotacao(), _despesas()))
+    df_ugs = pd.DataFrame({'UG': [1, 2, 4], 'SIGLA_UG': ['A', 'B', 'D']})
+    df_ranking = ranking_ugs(cubo, (2023, 2023), df_ugs).set_index('UG')
+
+    # Empenho / Dotação: VALOR_EMPENHADO (da dotação) sobre VALOR_ATUALIZADO no período
+    dotacao_2023 = _dotacao()[_dotacao()['ANO'] == 2023].groupby('UG')[['VALOR_EMPENHADO', 'VALOR_ATUALIZADO']].sum()
+    esperado = dotacao_2023['VALOR_EMPENHADO'] / dotacao_2023['VALOR_ATUALIZADO'] * 100
+
+    np.testing.assert_allclose(df_ranking.loc[[1, 2], 'Empenho / Dotação'], esperado.loc[[1, 2]])
+    assert np.isnan(df_ranking.loc[4, 'Empenho / Dotação'])  # UG sem dados: indicador vazio
+    assert df_ranking.loc[[1, 2], 'Percentil - Empenho / Dotação'].notna().all()
@@ -0,0 +1,41 @@
+import pandas as pd
+from calculos.servidores import preparar_servidores, buscar_servidores
+
+
+# Função para montar a folha de teste: uma linha por verba, CPFs com aspas e sem zeros à esquerda
+def _folha():
+    return pd.DataFrame({
+        'CPF': ['"12345678901"', '"12345678901"', '"2345678901"', '"2345678901"', '"345"'],
+        'Unidade': [1234, 1234, 55, 55, 7],
+        'Nome_Funcionario': ['ANA SILVA', 'ANA SILVA', 'BRUNO COSTA', 'BRUNO COSTA', 'CARLA DIAS'],
+        'Financ_Verba_Desc': ['TOTAL VANTAGENS', 'GRATIFICACAO', 'VENCIMENTO', 'TOTAL VANTAGENS', 'VENCIMENTO'],
+        'Financ_Valor_Calculado': [5000.0, 800.0, 3000.0, 3500.0, 1200.0],
+    })
+
+
+# Preparação anterior da página de servidores
+def _preparar_anterior(df):
+    df = df.copy()
+    df['Unidade'] = df['Unidade'].astype(str).str.zfill(8)
+    df['CPF'] = df['CPF'].astype(str).str.replace('"', '').str.zfill(11)
+    df_sorted = df.sort_values(by=['CPF', 'Financ_Verba_Desc'], ascending=[True, False])
+    df_total_vantagens = df_sorted[df_sorted['Financ_Verba_Desc'] == 'TOTAL VANTAGENS'].copy()
+    df = df_sorted.drop_duplicates(subset=['CPF'], keep='first').copy()
+    return pd.merge(df, df_total_vantagens[['CPF', 'Financ_Valor_Calculado']], on='CPF', suffixes=('', '_salario_bruto'), how='left')
+
+
+def test_preparar_servidores_igual_a_preparacao_anterior():
+    df = _folha()
+    obtido = preparar_servidores(df)
+
+    pd.testing.assert_frame_equal(obtido, _preparar_anterior(df))
+    assert obtido['CPF'].tolist() == ['00000000345', '02345678901', '12345678901']
+    assert obtido['Unidade'].str.len().eq(8).all()
+    assert df['CPF'].iloc[0] == '"12345678901"'  # A folha original não é alterada
+
+
+def test_buscar_servidores_por_nome_ou_cpf():
+    df = preparar_servidores(_folha())
+
+    assert buscar_servidores(df, 'silva')['Nome_Funcionario'].tolist() == ['ANA SILVA']
+    assert buscar_servidores(df, '0234')['Nome_Funcionario'].tolist() == ['BRUNO COSTA']